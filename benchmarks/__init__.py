@@ -0,0 +1,3 @@
+# coding=utf-8
+"""benchmarks - Reproducible benchmarks of pd2ml, see `python -m benchmarks --help`.
+"""
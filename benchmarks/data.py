@@ -0,0 +1,44 @@
+# coding=utf-8
+"""data.py - Generation of the dataframes and tables that the benchmarks run on.
+"""
+
+import pandas as pd
+from typing import List
+from pd2ml.testing import ColumnSpec, make_frame as make_table_frame, make_ddl as make_table_ddl
+
+MIXES = ('ints', 'floats', 'strings', 'datetimes', 'mixed', 'nulls')
+
+_KINDS = {
+    'ints': ['int'],
+    'floats': ['float'],
+    'strings': ['str'],
+    'datetimes': ['datetime'],
+    'mixed': ['int', 'float', 'str', 'datetime'],
+    'nulls': ['int', 'float', 'str', 'datetime'],
+}
+
+
+def get_columns(columns: int, mix: str) -> List[ColumnSpec]:
+    """Get the columns of a mix, an `id` primary key first and then the kinds of the mix in turn.
+    The 'nulls' mix is 'mixed' with half of the values NULL."""
+
+    kinds = _KINDS[mix]
+    null_ratio = 0.5 if mix == 'nulls' else 0.0
+    specs = [ColumnSpec('id', 'int', unique=True)]
+    for i in range(columns):
+        kind = kinds[i % len(kinds)]
+        specs.append(ColumnSpec('c{}'.format(i), kind, null_ratio=null_ratio, low=-10 ** 9, high=10 ** 9,
+                                max_length=32))
+    return specs
+
+
+def make_frame(rows: int, columns: int, mix: str, seed: int = 0) -> pd.DataFrame:
+    """Make a dataframe of random values of a mix, see `get_columns`."""
+
+    return make_table_frame(get_columns(columns, mix), rows, seed)
+
+
+def make_ddl(table_name: str, columns: int, mix: str) -> str:
+    """Make the `CREATE TABLE` statement of the table of `make_frame`."""
+
+    return make_table_ddl(table_name, get_columns(columns, mix), if_not_exists=False)
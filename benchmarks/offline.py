@@ -0,0 +1,68 @@
+# coding=utf-8
+"""offline.py - Micro-benchmarks of the encode and parse stages, which need no database.
+"""
+
+import os
+import tempfile
+from typing import List
+import pandas as pd
+from pd2ml.codec import encode_frame, decode_csv
+from pd2ml.common import STRING_PREFIX
+from .data import make_frame
+from .timer import measure, make_result
+
+SUITE = 'offline'
+
+
+def _get_columns(df: pd.DataFrame) -> List[tuple]:
+    """Get the columns that `decode_csv` reads the exported frame into, as `SHOW COLUMNS` would resolve them."""
+
+    columns = []
+    for name, dtype in df.dtypes.items():
+        dtype = str(dtype)
+        columns.append((name, 'object' if dtype in ('object', 'str') else dtype))
+    return columns
+
+
+def _export(df: pd.DataFrame, path: str) -> None:
+    """Write the frame like `SELECT INTO OUTFILE` does, with strings prefixed."""
+
+    exported = df.copy()
+    for name, dtype in _get_columns(df):
+        if dtype == 'object':
+            exported[name] = STRING_PREFIX + exported[name]
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        encode_frame(exported, f)
+
+
+def run(rows: int, columns: int, mix: str, repeat: int) -> List[dict]:
+    """Run the offline cases on one dataframe.
+
+    Cases:
+        encode: `encode_frame` into a file, as every upload does.
+        encode_to_csv: `DataFrame.to_csv` into a file, the encoder before `encode_frame`.
+        parse: `decode_csv` of an exported file into typed columns, as every download does.
+        parse_read_csv: `pandas.read_csv` of the same data with type inference, for reference.
+    """
+
+    df = make_frame(rows, columns, mix)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frame.csv')
+
+        def _encode():
+            with open(path, 'w', newline='', encoding='utf-8') as f:
+                encode_frame(df, f)
+
+        results.append(make_result(SUITE, 'encode', rows, columns, mix, measure(_encode, repeat),
+                                   bytes=os.path.getsize(path)))
+        results.append(make_result(SUITE, 'encode_to_csv', rows, columns, mix, measure(
+            lambda: df.to_csv(path, index=False, header=False, na_rep='\\N'), repeat)))
+
+        _export(df, path)
+        columns_ = _get_columns(df)
+        results.append(make_result(SUITE, 'parse', rows, columns, mix, measure(
+            lambda: decode_csv(path, columns_), repeat), bytes=os.path.getsize(path)))
+        results.append(make_result(SUITE, 'parse_read_csv', rows, columns, mix, measure(
+            lambda: pd.read_csv(path, header=None, escapechar='\\', na_values=['\\N']), repeat)))
+    return results
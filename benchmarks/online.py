@@ -0,0 +1,90 @@
+# coding=utf-8
+"""online.py - End-to-end benchmarks against a MySQL database.
+"""
+
+from typing import List
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import text
+from pd2ml import Loader
+from .data import make_frame, make_ddl
+from .timer import measure, make_result
+
+SUITE = 'online'
+
+TABLE_NAME = 'pd2ml_bench'
+
+UPLOAD_CASES = {
+    'pd2ml': {},
+    'pd2ml_stream': {'stream': True},
+    'pd2ml_parallel': {'workers': 4},
+    'pd2ml_fast_load': {},
+    'pd2ml_swap': {'mode': 'swap'},
+}
+
+DOWNLOAD_CASES = {
+    'pd2ml': {},
+    'pd2ml_parallel': {'workers': 4},
+}
+
+
+def _execute(engine: sqlalchemy.engine.Engine, *statements: str) -> None:
+    conn = engine.connect()
+    try:
+        with conn.begin():
+            for statement in statements:
+                conn.execute(text(statement))
+    finally:
+        conn.close()
+
+
+def _executemany(engine: sqlalchemy.engine.Engine, df: pd.DataFrame) -> None:
+    """Insert the rows by the `executemany` of the DBAPI cursor, the usual way without pd2ml."""
+
+    rows = df.astype(object).where(df.notna(), None).values.tolist()
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(TABLE_NAME, ', '.join(df.columns),
+                                                   ', '.join(['%s'] * len(df.columns)))
+    conn = engine.raw_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.executemany(sql, rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def run(engine: sqlalchemy.engine.Engine, rows: int, columns: int, mix: str, repeat: int,
+        max_executemany_rows: int) -> List[dict]:
+    """Run the online cases on one table, which is created and dropped here.
+
+    Upload cases start from an empty table every time. Download cases read the table filled once.
+    """
+
+    df = make_frame(rows, columns, mix)
+    results = []
+    _execute(engine, 'DROP TABLE IF EXISTS {}'.format(TABLE_NAME), make_ddl(TABLE_NAME, columns, mix))
+
+    def _truncate():
+        _execute(engine, 'TRUNCATE TABLE {}'.format(TABLE_NAME))
+
+    def _add(case, func, setup=None):
+        results.append(make_result(SUITE, case, rows, columns, mix, measure(func, repeat, setup)))
+
+    try:
+        if rows <= max_executemany_rows:
+            _add('upload_executemany', lambda: _executemany(engine, df), _truncate)
+            _add('upload_to_sql', lambda: df.to_sql(TABLE_NAME, engine, if_exists='append', index=False,
+                                                    method='multi', chunksize=10000), _truncate)
+        for case, kwargs in UPLOAD_CASES.items():
+            loader = Loader(engine, fast_load=case == 'pd2ml_fast_load')
+            _add('upload_' + case, lambda: loader.load_to(df, TABLE_NAME, **kwargs), _truncate)
+
+        Loader(engine).load_to(df, TABLE_NAME)
+        if rows <= max_executemany_rows:
+            _add('download_read_sql_table', lambda: pd.read_sql_table(TABLE_NAME, engine))
+        for case, kwargs in DOWNLOAD_CASES.items():
+            _add('download_' + case, lambda: Loader(engine).load_from(TABLE_NAME, **kwargs))
+        _add('download_pd2ml_iter', lambda: sum(len(c) for c in Loader(engine).load_from_iter(TABLE_NAME)))
+    finally:
+        _execute(engine, 'DROP TABLE IF EXISTS {}'.format(TABLE_NAME))
+    return results
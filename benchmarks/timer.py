@@ -0,0 +1,39 @@
+# coding=utf-8
+"""timer.py - Timing of benchmark cases and their results.
+"""
+
+import statistics
+import time
+from typing import Callable, Optional
+
+
+def measure(func: Callable, repeat: int, setup: Optional[Callable] = None) -> dict:
+    """Time a function several times.
+
+    Args:
+        func (Callable): The function to time, without arguments.
+        repeat (int): The number of runs.
+        setup (Callable): A function run before every run, which is not timed.
+
+    Returns:
+        dict: The seconds of every run, their minimum and their median.
+    """
+
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return {'seconds': seconds, 'best': min(seconds), 'median': statistics.median(seconds)}
+
+
+def make_result(suite: str, case: str, rows: int, columns: int, mix: str, timing: dict, **extra) -> dict:
+    """Make the record of one case."""
+
+    result = {'suite': suite, 'case': case, 'rows': rows, 'columns': columns, 'mix': mix}
+    result.update(timing)
+    result['rows_per_second'] = rows / timing['best'] if timing['best'] > 0 else None
+    result.update(extra)
+    return result
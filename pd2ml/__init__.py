@@ -1,6 +1,8 @@
 # coding=utf-8
 
 from .loader import Loader
+from .async_loader import AsyncLoader
+from .parallel import ParallelLoader
 from .loader_ext import *
 
 __version__ = '0.1.0'
@@ -0,0 +1,153 @@
+# coding=utf-8
+"""async_loader.py - The loader for asyncio applications.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, List, Optional
+import sqlalchemy
+import pandas
+from .common import UPLOAD_DIR_PREFIX, DOWNLOAD_DIR_PREFIX, READ_CHUNK_ROWS, DECIMAL_MODE
+from .interface import ILoader
+from .loader import UpLoader, DownLoader
+from .manager import FileManager
+from .cache import ResultCache
+from .schema import SchemaCache
+
+__all__ = ['AsyncLoader']
+
+
+class AsyncLoader(ILoader):
+    """The implementation class of the interface `ILoader` whose methods are coroutines.
+
+    Every transfer runs in a thread of its own executor, where its statements run over pooled
+    connections of the engine and its encoding and parsing run as usual, so the event loop
+    is never blocked. Up to `concurrency` transfers run at once, each in its own temporary folder.
+
+    Examples:
+        >>> async def main():  # doctest: +SKIP
+        ...     async with AsyncLoader(engine, concurrency=4) as loader:
+        ...         await asyncio.gather(loader.load_to(df1, 'stock'), loader.load_to(df2, 'fund'))
+        ...         async for chunk in loader.load_from_iter('stock', chunksize=100000):
+        ...             print(len(chunk))
+
+    Notes:
+        The pool of the engine should hold at least `concurrency` connections (or `concurrency * workers`
+        with `workers`), e.g. `create_engine(url, pool_size=8, max_overflow=0, pool_pre_ping=True)`.
+    """
+
+    def __init__(self, engine: sqlalchemy.engine = None, concurrency: int = 4, fast_load: bool = False,
+                 disable_binlog: bool = False, result_cache: Optional[ResultCache] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, hooks: Optional[List[Callable]] = None,
+                 schema_cache: Optional[SchemaCache] = None, decimal: str = DECIMAL_MODE):
+        """
+        Args:
+            engine (sqlalchemy.base.Engine): engine instance by `create_engine` function.
+            concurrency (int): The maximum number of transfers at a time.
+            fast_load, disable_binlog: See `UpLoader`.
+            result_cache (ResultCache): See `DownLoader`.
+            executor (ThreadPoolExecutor): The executor of the transfers. If None, one of
+                `concurrency` threads is created, and shut down by `close`.
+            hooks (List[Callable]): Functions called with the `LoadStats` of every transfer, see `UpLoader`.
+            schema_cache (SchemaCache): See `DownLoader`.
+            decimal (str): How to read `DECIMAL` columns, see `DownLoader`.
+        """
+
+        self.engine = engine
+        self.concurrency = concurrency
+        self.fast_load = fast_load
+        self.disable_binlog = disable_binlog
+        self.result_cache = result_cache
+        self.schema_cache = schema_cache
+        self.decimal = decimal
+        self.hooks = list(hooks or [])
+        self.manager = FileManager()
+        self.__own_executor = executor is None
+        self.__executor = executor or ThreadPoolExecutor(concurrency, thread_name_prefix='pd2ml')
+        self.__semaphore = None
+
+    def __get_semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore of the transfers, created in the running event loop."""
+
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.concurrency)
+        return self.__semaphore
+
+    def __make_work_dir(self, prefix: str) -> str:
+        """Get a temporary folder that no other transfer uses."""
+
+        return self.manager.get_unique_path(self.manager.get_dir(prefix))
+
+    async def __run(self, func, *args, **kwargs):
+        """Run a blocking function in the executor."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(func, *args, **kwargs))
+
+    def __upload(self, df: pandas.DataFrame, table_name: str, **kwargs) -> None:
+        """Upload in a new `UpLoader` in its own temporary folder."""
+
+        up_loader = UpLoader(self.engine, self.fast_load, self.disable_binlog,
+                             work_dir=self.__make_work_dir(UPLOAD_DIR_PREFIX), hooks=self.hooks)
+        try:
+            up_loader.load_to(df, table_name, **kwargs)
+        finally:
+            up_loader.clear()
+
+    def __make_down_loader(self) -> DownLoader:
+        """Create a `DownLoader` in its own temporary folder."""
+
+        return DownLoader(self.engine, self.schema_cache, self.decimal, result_cache=self.result_cache,
+                          work_dir=self.__make_work_dir(DOWNLOAD_DIR_PREFIX), hooks=self.hooks)
+
+    def __download(self, table_name: str, **kwargs) -> pandas.DataFrame:
+        """Download in a new `DownLoader` in its own temporary folder."""
+
+        return self.__make_down_loader().load_from(table_name, **kwargs)
+
+    async def load_to(self, df: pandas.DataFrame, table_name: str, **kwargs) -> None:
+        """Upload the dataframe. See `UpLoader.load_to` for the keyword arguments."""
+
+        async with self.__get_semaphore():
+            await self.__run(self.__upload, df, table_name, **kwargs)
+
+    async def load_from(self, table_name: str, **kwargs) -> pandas.DataFrame:
+        """Download the table. See `DownLoader.load_from` for the keyword arguments."""
+
+        async with self.__get_semaphore():
+            return await self.__run(self.__download, table_name, **kwargs)
+
+    async def load_from_iter(self, table_name: str, chunksize: int = READ_CHUNK_ROWS,
+                             **kwargs) -> AsyncIterator[pandas.DataFrame]:
+        """Download the table as typed dataframes of bounded size, see `DownLoader.load_from_iter`.
+
+        The table is exported once, and every fragment is parsed in the executor when it is requested.
+        The transfer counts against `concurrency` until the iteration finishes or is closed.
+        """
+
+        down_loader = self.__make_down_loader()
+        chunks = down_loader.load_from_iter(table_name, chunksize, **kwargs)
+        done = object()
+        async with self.__get_semaphore():
+            try:
+                while True:
+                    chunk = await self.__run(next, chunks, done)
+                    if chunk is done:
+                        break
+                    yield chunk
+            finally:
+                await self.__run(chunks.close)
+                down_loader.clear()
+
+    async def close(self) -> None:
+        """Shut down the executor, if it was created by this instance, after the running transfers."""
+
+        if self.__own_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -0,0 +1,159 @@
+# coding=utf-8
+"""cache.py - Persistent local cache of the results of downloads.
+"""
+
+import hashlib
+import os
+import uuid
+import pandas
+from sqlalchemy import text
+from typing import Any, Optional
+from .common import RESULT_CACHE_DIR, RESULT_CACHE_BYTES
+from .delta import get_state_dir
+from .schema import get_table_version
+
+__all__ = ['ResultCache']
+
+
+class ResultCache:
+    """A cache of typed results on disk, shared by all processes that use the same directory.
+
+    Each result is an uncompressed Feather file (which needs `pyarrow`), so that a hit is
+    memory-mapped instead of being read and parsed. The version of the table it was downloaded
+    at is stored in the metadata of the file, and a hit is only served if the table still has
+    that version. Beyond `max_bytes`, the least recently used results are removed.
+    """
+
+    SUFFIX = '.feather'
+    VERSION_KEY = b'pd2ml.version'
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = RESULT_CACHE_BYTES,
+                 validate: str = 'checksum'):
+        """
+        Args:
+            root (str): The directory of the cache. If None, a sub-directory of `delta.get_state_dir()`.
+            max_bytes (int): The maximum size of the cache on disk.
+            validate (str): How to get the version of a table: 'checksum' for `CHECKSUM TABLE`,
+                'information_schema' for its `UPDATE_TIME`, or any other string as a query
+                whose result is the version, in which `{table}` is replaced with the table name,
+                e.g. 'SELECT MAX(updated_at), COUNT(*) FROM {table}'.
+
+        Notes:
+            'checksum' reads the whole table on every call, which is still much cheaper than exporting
+            and parsing it, but a query on an indexed column of updates is cheaper yet.
+            'information_schema' is the cheapest and may serve stale results: MySQL 8 caches `UPDATE_TIME`
+            for `information_schema_stats_expiry` seconds (a day by default, set it to 0 to avoid this),
+            it has a granularity of one second, and MySQL 5.7 loses it on restart.
+        """
+
+        self.root = root or os.path.join(get_state_dir(), RESULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.validate = validate
+
+    def get_version(self, conn, table_name: str) -> str:
+        """Get the version of the table as a string.
+
+        Args:
+            conn (sqlalchemy.engine.Connection): An open connection.
+            table_name (str): Name of table in database.
+
+        Returns:
+            str: The version, which is only meant to be compared for equality.
+        """
+
+        if self.validate in ('information_schema', 'checksum'):
+            return repr(get_table_version(conn, table_name, self.validate))
+        return repr([tuple(row) for row in conn.execute(text(self.validate.format(table=table_name)))])
+
+    def get_path(self, key: Any) -> str:
+        """Get the path of the result of a key, whose `repr` must be stable."""
+
+        digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.root, digest + ResultCache.SUFFIX)
+
+    def get(self, key: Any, version: str) -> Optional[pandas.DataFrame]:
+        """Get the result of the key if it was downloaded at the version.
+
+        Args:
+            key: Anything that determines the result, e.g. the engine URL, the table and the projection.
+            version (str): The current version of the table, see `get_version`.
+
+        Returns:
+            pandas.DataFrame: The result, or None on a miss.
+        """
+
+        from pyarrow import feather
+
+        path = self.get_path(key)
+        try:
+            table = feather.read_table(path, memory_map=True)
+        except (FileNotFoundError, OSError):
+            return None
+        if (table.schema.metadata or {}).get(ResultCache.VERSION_KEY) != version.encode('utf-8'):
+            return None
+        try:
+            os.utime(path)  # Mark it as recently used
+        except OSError:
+            pass
+        return table.to_pandas(split_blocks=True)
+
+    def put(self, key: Any, version: str, df: pandas.DataFrame) -> None:
+        """Store the result of the key at the version, and evict the least recently used results.
+
+        Args:
+            key: See `get`.
+            version (str): The version of the table before the result was downloaded.
+            df (pandas.DataFrame): The result.
+        """
+
+        import pyarrow
+        from pyarrow import feather
+
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[ResultCache.VERSION_KEY] = version.encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+        os.makedirs(self.root, exist_ok=True)
+        path = self.get_path(key)
+        tmp_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex[:8])
+        try:
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise e
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used results until the cache fits into `max_bytes`."""
+
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(ResultCache.SUFFIX):
+                try:
+                    stat = os.stat(os.path.join(self.root, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(e[1] for e in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        """Remove all results."""
+
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                if name.endswith(ResultCache.SUFFIX):
+                    try:
+                        os.remove(os.path.join(self.root, name))
+                    except FileNotFoundError:
+                        pass
@@ -0,0 +1,297 @@
+# coding=utf-8
+"""codec.py - Column-wise encoding and typed decoding of dataframes in the text format of
+`LOAD DATA INFILE` and `SELECT INTO OUTFILE`.
+"""
+
+import contextlib
+import mmap
+import os
+import re
+import numpy as np
+import pandas
+from pandas.api import types
+from typing import IO, Callable, Iterator, List, Optional, Tuple, Union
+from .common import NULL_VALUE, FIELD_SEPARATOR, ENCLOSED_CHAR, ESCAPED_CHAR, ENCODE_BLOCK_ROWS, STRING_PREFIX
+from .dtypes import is_string_dtype, get_parse_dtype
+
+__all__ = ['encode_frame', 'get_formatter', 'decode_csv']
+
+_US_PER_SECOND = 1000000
+_US_PER_MINUTE = 60 * _US_PER_SECOND
+_US_PER_HOUR = 60 * _US_PER_MINUTE
+
+_ESCAPE_PAIR = re.compile(rb'\\(.)', re.S)  # An escape character and the character it escapes
+
+
+def _format_bool(s: pandas.Series, float_precision: Optional[int]) -> np.ndarray:
+    """Format booleans as `1` and `0`."""
+
+    values = s.to_numpy(dtype=bool, na_value=False)
+    return np.where(values, '1', '0')
+
+
+def _format_int(s: pandas.Series, float_precision: Optional[int]) -> np.ndarray:
+    """Format signed and unsigned integers, including the nullable extension types."""
+
+    if isinstance(s.dtype, np.dtype):
+        return s.to_numpy().astype(str)
+    return s.to_numpy(dtype=s.dtype.numpy_dtype, na_value=0).astype(str)
+
+
+def _format_float(s: pandas.Series, float_precision: Optional[int]) -> np.ndarray:
+    """Format floats with a fixed number of decimals, or with the shortest round-trip repr by default."""
+
+    dtype = s.dtype if isinstance(s.dtype, np.dtype) else np.float64
+    values = s.to_numpy(dtype=dtype, na_value=np.nan)
+    if float_precision is None:
+        return values.astype(str)
+    return np.char.mod('%.{}f'.format(float_precision), values)
+
+
+def _format_datetime(s: pandas.Series, float_precision: Optional[int]) -> np.ndarray:
+    """Format datetimes as `YYYY-MM-DD[ HH:MM:SS[.ffffff]]`, using the coarsest unit that loses nothing.
+
+    Notes:
+        Timezone-aware values are written as their local wall time, since MySQL `DATETIME` has no timezone.
+    """
+
+    if getattr(s.dt, 'tz', None) is not None:
+        s = s.dt.tz_localize(None)
+    values = s.to_numpy(dtype='datetime64[us]')
+    ticks = values[~np.isnat(values)].astype(np.int64)
+    if not (ticks % (24 * _US_PER_HOUR)).any():
+        unit = 'D'
+    elif not (ticks % _US_PER_SECOND).any():
+        unit = 's'
+    else:
+        unit = 'us'
+    return np.char.replace(np.datetime_as_string(values, unit=unit), 'T', ' ')
+
+
+def _format_timedelta(s: pandas.Series, float_precision: Optional[int]) -> np.ndarray:
+    """Format timedeltas as MySQL `TIME` values, i.e. `[-]HH:MM:SS[.ffffff]`."""
+
+    ticks = s.to_numpy(dtype='timedelta64[us]').astype(np.int64)
+    ticks = np.where(s.isna().to_numpy(), 0, ticks)
+    sign = np.where(ticks < 0, '-', '')
+    ticks = np.abs(ticks)
+    hours = np.char.zfill((ticks // _US_PER_HOUR).astype(str), 2)
+    minutes = np.char.zfill((ticks // _US_PER_MINUTE % 60).astype(str), 2)
+    seconds = np.char.zfill((ticks // _US_PER_SECOND % 60).astype(str), 2)
+    out = np.char.add(np.char.add(np.char.add(np.char.add(np.char.add(sign, hours), ':'), minutes), ':'), seconds)
+    micros = ticks % _US_PER_SECOND
+    if micros.any():
+        out = np.char.add(np.char.add(out, '.'), np.char.zfill(micros.astype(str), 6))
+    return out
+
+
+def _format_str(s: pandas.Series, float_precision: Optional[int]) -> pandas.Series:
+    """Format any other value as an enclosed string, escaping the escape and the enclosing characters."""
+
+    s = s.astype(object).where(s.notna(), '').astype(str)
+    s = s.str.replace(ESCAPED_CHAR, ESCAPED_CHAR * 2, regex=False)
+    s = s.str.replace(ENCLOSED_CHAR, ESCAPED_CHAR + ENCLOSED_CHAR, regex=False)
+    return ENCLOSED_CHAR + s + ENCLOSED_CHAR
+
+
+def get_formatter(dtype) -> Callable:
+    """Get the column formatter for a dtype.
+
+    Args:
+        dtype: The dtype of a dataframe column.
+
+    Returns:
+        function: A function that takes a series and the float precision, and returns the formatted values.
+    """
+
+    if types.is_bool_dtype(dtype):
+        return _format_bool
+    if types.is_integer_dtype(dtype):
+        return _format_int
+    if types.is_float_dtype(dtype):
+        return _format_float
+    if types.is_datetime64_any_dtype(dtype):
+        return _format_datetime
+    if types.is_timedelta64_dtype(dtype):
+        return _format_timedelta
+    return _format_str
+
+
+def _encode_column(s: pandas.Series, formatter: Callable, float_precision: Optional[int]) -> List[str]:
+    """Format one column of a block and write the NULL values as `\\N`."""
+
+    values = np.asarray(formatter(s, float_precision), dtype=object)
+    mask = s.isna().to_numpy()
+    if mask.any():
+        values[mask] = NULL_VALUE
+    return values.tolist()
+
+
+def _phase(stats, name: str):
+    """Time a phase into the statistics if there are any, see `stats.LoadStats`."""
+
+    return stats.phase(name) if stats is not None else contextlib.nullcontext()
+
+
+def encode_frame(df: pandas.DataFrame, f: IO, terminate: str = '\n', float_precision: Optional[int] = None,
+                 block_rows: int = ENCODE_BLOCK_ROWS, stats=None) -> int:
+    """Write the dataframe into a text stream, one block of rows at a time.
+
+    Each column is formatted as a whole by the formatter of its dtype, so that the frame is never
+    upcast to an object ndarray, and NaN/NaT are written as `\\N` without any help of the server.
+
+    Args:
+        df (pandas.DataFrame): The dataframe to be written.
+        f (IO): A text stream opened with `newline=''`.
+        terminate (str): Line terminator.
+        float_precision (int): Number of decimals of floats. If None, use the shortest repr that round-trips.
+        block_rows (int): Number of rows that are formatted at a time.
+        stats (LoadStats): If given, the time of formatting and writing is added to its phases
+            'encode' and 'write'.
+
+    Returns:
+        int: The number of rows written.
+    """
+
+    formatters = [get_formatter(dtype) for dtype in df.dtypes]
+    if not formatters:
+        return 0
+
+    for start in range(0, len(df), block_rows):
+        with _phase(stats, 'encode'):
+            block = df.iloc[start:start + block_rows]
+            columns = [_encode_column(block.iloc[:, i], formatter, float_precision)
+                       for i, formatter in enumerate(formatters)]
+            text = terminate.join(map(FIELD_SEPARATOR.join, zip(*columns)))
+        with _phase(stats, 'write'):
+            f.write(text)
+            f.write(terminate)
+
+    return len(df)
+
+
+def _convert_column(s: pandas.Series, dtype: str, nul: Optional[str] = None) -> pandas.Series:
+    """Convert a column parsed as text into its final dtype.
+
+    Args:
+        s (pandas.Series): The parsed column.
+        dtype (str): The resolved dtype of the column.
+        nul (str): The character that stands for NUL in strings, see `_replace_nul`.
+
+    Returns:
+        pandas.Series: The converted column.
+    """
+
+    if is_string_dtype(dtype):
+        s = s.str.slice(len(STRING_PREFIX))
+        if nul is not None:
+            s = s.str.replace(nul, '\x00', regex=False)
+        return s.astype(dtype) if dtype != 'object' else s
+    if dtype.startswith('datetime64'):
+        # Zero dates such as `0000-00-00` become NaT.
+        return pandas.to_datetime(s, errors='coerce').astype(dtype)
+    if dtype.startswith('timedelta64'):
+        return pandas.to_timedelta(s, errors='coerce').astype(dtype)
+    return s.astype(dtype)
+
+
+def _replace_nul(path: str) -> Optional[str]:
+    """Replace the escaped NUL characters of an exported file by a character that the file does not contain.
+
+    `SELECT INTO OUTFILE` writes NUL as `\\0`, which the escape character of the parser would turn
+    into `0`, and the parser can not keep a NUL character in a value either, so the file is rewritten
+    with another character that `_convert_column` turns back into NUL.
+
+    Args:
+        path (str): Path to file, which is not empty.
+
+    Returns:
+        str: The character that stands for NUL, or None if the file has no NUL and is left as it is.
+    """
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data.find(b'\\0') < 0:
+            return None
+        # A character of the private use area, which is most likely not in the file.
+        nul = next((chr(c) for c in range(0xE000, 0xF900) if data.find(chr(c).encode('utf-8')) < 0), None)
+    if nul is None:
+        raise ValueError('The file {} has NUL characters and no character to stand for them.'.format(path))
+
+    nul_bytes = nul.encode('utf-8')
+
+    def _replace(m):
+        return nul_bytes if m.group(1) == b'0' else m.group(0)
+
+    # An escape pair never spans two lines, since an escaped line terminator ends the line itself.
+    tmp_path = path + '.nul'
+    with open(path, 'rb') as src, open(tmp_path, 'wb') as dst:
+        for line in src:
+            dst.write(_ESCAPE_PAIR.sub(_replace, line))
+    os.replace(tmp_path, path)
+    return nul
+
+
+def decode_csv(path: str, columns: List[Tuple], chunksize: Optional[int] = None, stats=None) \
+        -> Union[pandas.DataFrame, Iterator[pandas.DataFrame]]:
+    """Parse a file written by `SELECT INTO OUTFILE` straight into typed columns.
+
+    Numeric columns are built by the C parser with their final dtype and `\\N` read as NULL,
+    so the frame never exists as strings in between. Datetime and time columns are parsed
+    from text column by column, booleans from integers, and string columns carry `STRING_PREFIX`
+    to keep an empty or `N` string apart from NULL.
+
+    Args:
+        path (str): Path to file.
+        columns (List[Tuple]): A list of tuples that start with the column name and its resolved dtype,
+            see `dtypes.resolve_columns`.
+        chunksize (int): If given, return an iterator of dataframes of at most `chunksize` rows.
+        stats (LoadStats): If given, the time of parsing and converting is added to its phases
+            'parse' and 'convert'.
+
+    Returns:
+        pandas.DataFrame or iterator: The typed dataframe, or an iterator of typed dataframes.
+
+    Notes:
+        A file with NUL characters, which the server writes as `\\0`, is rewritten before it is parsed,
+        see `_replace_nul`, and the NUL characters are restored in the string columns.
+    """
+
+    names = [c[0] for c in columns]
+    if os.path.getsize(path) == 0:
+        df = pandas.DataFrame({c[0]: pandas.Series(dtype=c[1]) for c in columns}, columns=names)
+        return df if chunksize is None else iter([])
+
+    dtypes = {c[0]: get_parse_dtype(c[1]) for c in columns}
+    converters = {c[0]: c[1] for c in columns if is_string_dtype(c[1]) or dtypes[c[0]] != c[1]}
+    with _phase(stats, 'parse'):
+        nul = _replace_nul(path)
+
+    # The escape character turns `\N` into `N`, which no value of a non-string column can be,
+    # and every non-NULL value of a string column starts with `STRING_PREFIX`.
+    with _phase(stats, 'parse'):
+        reader = pandas.read_csv(path, header=None, names=names, dtype=dtypes, sep=FIELD_SEPARATOR,
+                                 quotechar=ENCLOSED_CHAR, escapechar=ESCAPED_CHAR, doublequote=False,
+                                 keep_default_na=False, na_values={name: [NULL_VALUE[-1]] for name in names},
+                                 encoding='utf-8', chunksize=chunksize)
+
+    def _convert(df: pandas.DataFrame) -> pandas.DataFrame:
+        with _phase(stats, 'convert'):
+            for name, dtype in converters.items():
+                df[name] = _convert_column(df[name], dtype, nul)
+        return df
+
+    if chunksize is None:
+        return _convert(reader)
+    return _iter_chunks(reader, _convert, stats)
+
+
+def _iter_chunks(reader, convert: Callable, stats=None) -> Iterator[pandas.DataFrame]:
+    """Convert the chunks of a reader, and close the file as soon as the iteration stops."""
+
+    with reader:
+        while True:
+            with _phase(stats, 'parse'):
+                df = next(reader, None)
+            if df is None:
+                break
+            yield convert(df)
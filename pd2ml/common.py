@@ -6,31 +6,148 @@ UPLOAD_DIR_PREFIX = '__tmp__to__'
 
 DOWNLOAD_DIR_PREFIX = '__tmp_from__'
 
+SPOOL_DIR_ENV = 'PD2ML_SPOOL_DIR'  # Environment variable of the root directory of temporary folders
+
+SPOOL_STALE_SECONDS = 3600  # Temporary folders untouched for this long, whose writers are dead, are swept
+
+SPOOL_JOURNAL_STALE_SECONDS = 7 * 24 * 3600  # The same for upload folders with a journal, kept for `resume`
+
+UNIQUE_SEP = '@'  # Separates the table name and the unique token in temporary file names
+
+TRASH_SUFFIX = '.trash.'  # Temporary folders are renamed with this suffix before they are removed
+
+STATE_DIR_ENV = 'PD2ML_STATE_DIR'  # Environment variable of the directory of persistent local state
+
+STATE_DIR = '~/.pd2ml'  # Default directory of persistent local state
+
+DELTA_DIR = 'delta'  # Sub-directory of the state directory for the indexes of delta sync
+
+INCREMENTAL_DIR = 'incremental'  # Sub-directory of the state directory for the copies of incremental download
+
+INCREMENTAL_FORMAT = 'feather'  # File format of the copies of incremental download, 'feather' or 'parquet'
+
+RESULT_CACHE_DIR = 'results'  # Sub-directory of the state directory for the cached results of downloads
+
+RESULT_CACHE_BYTES = 1 << 30  # Maximum size of the cached results on disk, beyond which the least recently used go
+
+DELETE_BATCH_ROWS = 1000  # Number of rows deleted per statement by delta sync
+
+SWAP_STAGING_SUFFIX = '__pd2ml_new'  # Suffix of the staging table of swap loads
+
+SWAP_OLD_SUFFIX = '__pd2ml_old'  # Suffix of the replaced table of swap loads, until it is dropped
+
+SWAP_LOCK_SECONDS = 3600  # Seconds a swap load waits for another swap of the same table to finish
+
 UPLOAD_MODE = 'REPLACE'
 
 LOAD_FILE_SUFFIX = '.csv'
 
-COLUMNS_FILENAME = 'str_columns'
+COLUMNS_FILENAME = 'str_columns'  # Prefix of the column manifests of an upload folder, one per table and column set
+
+BATCH_FILE_BYTES = 64 << 20  # Size beyond which a batch upload starts a new file of the table, so files can load concurrently
+
+JOURNAL_FILENAME = 'journal'  # Journal of the load status of the files of an upload folder, see `journal.LoadJournal`
+
+POOL_SIZE = 8  # Default number of pooled connections of `session.make_engine`, at least the number of workers
+
+POOL_RECYCLE = 3600  # Seconds after which pooled connections are replaced, below `wait_timeout` of the server
+
+RETRY_TRIES = 5  # Number of attempts of loading a file, of which only transient errors are retried
+
+RETRY_DELAY = 1  # Seconds of the first backoff between attempts, doubled after every attempt
+
+RETRY_MAX_DELAY = 30  # Maximum seconds of backoff between attempts
+
+# MySQL error codes of failures that may succeed when retried: too many connections, shutdown in progress,
+# aborted connection, network read and write errors, lock wait timeout, deadlock, and lost connections.
+TRANSIENT_ERROR_CODES = frozenset([1040, 1053, 1152, 1158, 1159, 1160, 1161, 1205, 1213,
+                                   2002, 2003, 2006, 2013, 2055])
+
+NULL_VALUE = '\\N'  # How NULL is written in the files of `LOAD DATA` and `SELECT INTO OUTFILE`
+
+FIELD_SEPARATOR = ','
+
+ENCLOSED_CHAR = '"'
 
+ESCAPED_CHAR = '\\'
+
+FLOAT_PRECISION = None  # Number of decimals when writing floats, None means the shortest repr that round-trips
+
+ENCODE_BLOCK_ROWS = 65536  # Number of rows that are encoded at a time
+
+UPLOAD_CHUNK_ROWS = 100000  # Default number of rows of each chunk of a parallel upload
+
+READ_CHUNK_ROWS = 100000  # Default number of rows of each dataframe of a chunked download
+
+STRING_PREFIX = '~'  # Prepended to exported strings, so that a string is never read as NULL
+
+SCHEMA_CACHE_TTL = 300  # Seconds the columns of a table are cached
+
+SCHEMA_CACHE_SIZE = 1024  # The maximum number of tables whose columns are cached
+
+DECIMAL_MODE = 'float'  # How to read `DECIMAL`: 'float', 'str' or 'scaled'
+
+# Integer base types -> (signed dtype, unsigned dtype), see `dtypes.resolve_dtype` for NULL and booleans.
+INT_TYPE_MAPPING = {
+    'tinyint': ('int8', 'uint8'),
+    'smallint': ('int16', 'uint16'),
+    'mediumint': ('int32', 'uint32'),
+    'int': ('int32', 'uint32'),
+    'integer': ('int32', 'uint32'),
+    'bigint': ('int64', 'uint64'),
+    'year': ('int16', 'int16'),
+}
+
+# Other base types -> dtype, the rest (char, varchar, text, json, set, blob, ...) are read as 'object'.
 TYPE_MAPPING = {
-    'int8': ('tinyint', ),
-    'int16': ('int', 'smallint', ),
-    'int32': ('mediumint', 'int'),
-    'int64': ('bigint', ),
-    'float64': ('float', 'double', 'decimal', 'real', 'numeric'),
-    'timedeleta64[ns]': ('time', ),
-    'datetime64[ns]': ('datetime', 'timestamp')
+    'float': 'float32',
+    'double': 'float64',
+    'real': 'float64',
+    'decimal': 'float64',
+    'numeric': 'float64',
+    'date': 'datetime64[ns]',
+    'datetime': 'datetime64[ns]',
+    'timestamp': 'datetime64[ns]',
+    'time': 'timedelta64[ns]',
+    'enum': 'category',
 }
-# TODO:
-# SET autocommit = 0;
-# SET unique_checks = 0;
-# SET foreign_key_checks = 0;
-# SET sql_log_bin=0;
-# COMMIT;
+
+# Session variables that are set to 0 under the fast load profile of `UpLoader`, and `sql_log_bin` optionally
+FAST_LOAD_VARIABLES = ('autocommit', 'unique_checks', 'foreign_key_checks')
+
+SESSION_STATE_COMMAND = """SELECT {}"""
+
+SET_SESSION_COMMAND = """SET SESSION {} = {}"""
+
 UPLOAD_COMMAND = """LOAD DATA LOCAL INFILE '{}' {} INTO TABLE {} FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' 
-                    LINES TERMINATED BY '{}' {} SET {};"""
+                    LINES TERMINATED BY '{}' {};"""
+
+FILE_UPLOAD_COMMAND = """LOAD DATA LOCAL INFILE '{}' {} INTO TABLE {} FIELDS TERMINATED BY '{}' OPTIONALLY ENCLOSED BY '{}'
+                         ESCAPED BY '{}' LINES TERMINATED BY '{}' IGNORE {} LINES {};"""
 
 DOWNLOAD_COMMAND = """SELECT {} INTO OUTFILE '{}' FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
-                      LINES TERMINATED BY '{}' FROM {};"""
+                      LINES TERMINATED BY '{}' FROM {}{};"""
+
+COLUMNS_COMMAND = """SHOW COLUMNS FROM {}"""
+
+TABLE_VERSION_COMMAND = """SELECT CREATE_TIME, UPDATE_TIME FROM information_schema.TABLES
+                           WHERE TABLE_SCHEMA = {} AND TABLE_NAME = :name"""
+
+CHECKSUM_COMMAND = """CHECKSUM TABLE {}"""
+
+DELETE_COMMAND = """DELETE FROM {} WHERE {} IN ({})"""
+
+CREATE_LIKE_COMMAND = """CREATE TABLE {} LIKE {}"""
+
+DROP_TABLE_COMMAND = """DROP TABLE IF EXISTS {}"""
+
+SWAP_COMMAND = """RENAME TABLE {0} TO {2}, {1} TO {0}"""  # live -> old, staging -> live, in one atomic statement
+
+# Named locks of swap loads, per database and table, hashed to fit the 64 characters of a lock name
+SWAP_LOCK_COMMAND = """SELECT GET_LOCK(CONCAT('pd2ml:', SHA1(CONCAT(DATABASE(), '.', :name))), :timeout)"""
+
+SWAP_UNLOCK_COMMAND = """SELECT RELEASE_LOCK(CONCAT('pd2ml:', SHA1(CONCAT(DATABASE(), '.', :name))))"""
+
+KEYS_COMMAND = """SHOW KEYS FROM {}"""
 
-COLUMNS_COMMAND = """SHOW COLUMNS FROM {}"""
\ No newline at end of file
+RANGE_COMMAND = """SELECT MIN({0}), MAX({0}) FROM {1}{2}"""
\ No newline at end of file
@@ -0,0 +1,55 @@
+# coding=utf-8
+"""dedup.py - Client-side removal of the rows that a `REPLACE` load would replace within the same upload.
+"""
+
+import numpy as np
+import pandas
+from typing import Dict, List, Tuple
+
+__all__ = ['drop_duplicate_keys']
+
+
+def drop_duplicate_keys(df: pandas.DataFrame, keys: Dict[str, List[str]]) -> Tuple[pandas.DataFrame, int]:
+    """Drop the rows that a later row of the dataframe has the same value of every unique key as.
+
+    Under `REPLACE`, the server deletes such a row when it inserts the later one, and updates every
+    secondary index twice. The later row replaces every row that the dropped one would have replaced,
+    so dropping it beforehand leaves the same table. Rows that share some unique keys but not all
+    are left for the server, since which rows survive then depends on the rows in between.
+
+    Args:
+        df (pandas.DataFrame): The dataframe to be uploaded.
+        keys (Dict[str, List[str]]): The unique indexes of the table and their columns, see `schema.get_unique_keys`.
+
+    Returns:
+        tuple: The dataframe without the dropped rows (the same object if none is dropped),
+        and the number of dropped rows.
+
+    Notes:
+        Values are compared exactly, while the server compares strings by the collation of the column,
+        which may ignore case or trailing spaces, so such rows are left for the server to replace.
+        A row is only dropped if the later row collides with it on an index whose columns are all in the
+        dataframe and not NULL, as NULL never collides on the server. Columns of an index that are not in
+        the dataframe are assumed to be filled the same for both rows, or by `AUTO_INCREMENT`.
+
+    Examples:
+        >>> df = pandas.DataFrame({'code': ['a', 'b', 'a'], 'time': [1, 1, 1], 'v': [1.0, 2.0, 3.0]})
+        >>> drop_duplicate_keys(df, {'PRIMARY': ['code', 'time']})[0]['v'].tolist()
+        [2.0, 3.0]
+        >>> df['isin'] = ['x', 'y', 'z']
+        >>> drop_duplicate_keys(df, {'PRIMARY': ['code', 'time'], 'uk_isin': ['isin']})[1]
+        0
+    """
+
+    complete = [columns for columns in keys.values() if columns and all(c in df.columns for c in columns)]
+    if not complete or df.empty:
+        return df, 0
+
+    collides = np.zeros(len(df), dtype=bool)
+    for columns in complete:
+        collides |= df[columns].notna().all(axis=1).to_numpy()
+    subset = list(dict.fromkeys(c for columns in keys.values() for c in columns if c in df.columns))
+    drop = df.duplicated(subset=subset, keep='last').to_numpy() & collides
+
+    dropped = int(drop.sum())
+    return (df[~drop] if dropped else df), dropped
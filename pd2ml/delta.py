@@ -0,0 +1,211 @@
+# coding=utf-8
+"""delta.py - Local hash index of uploaded rows, for uploading only the rows that changed.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+import numpy as np
+import pandas
+from typing import List, Optional, Tuple
+from .common import STATE_DIR_ENV, STATE_DIR, DELTA_DIR, DELETE_COMMAND
+
+__all__ = ['DeltaIndex', 'hash_rows', 'get_state_dir', 'make_delete_batches']
+
+
+def get_state_dir() -> str:
+    """Get the directory of persistent local state, i.e. `PD2ML_STATE_DIR` or '~/.pd2ml'."""
+
+    return os.path.expanduser(os.environ.get(STATE_DIR_ENV) or STATE_DIR)
+
+
+def hash_rows(df: pandas.DataFrame) -> np.ndarray:
+    """Hash every row of the dataframe into an uint64, vectorized over columns.
+
+    Args:
+        df (pandas.DataFrame): The dataframe.
+
+    Returns:
+        numpy.ndarray: The hashes, one per row. Equal rows of equal dtypes have equal hashes.
+    """
+
+    return pandas.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+class DeltaIndex:
+    """The hashes of the rows of a table as of its last successful sync, keyed by the hashes of their primary keys.
+
+    The index is saved as sorted numpy arrays next to a pickle of the key values, and the arrays
+    are memory-mapped when they are compared, so that a large index is not read into memory.
+    Every save writes the three files into a folder of a new version, and then switches the pointer
+    `CURRENT_FN` to it with one rename, so that a crash never leaves files of different versions together.
+    """
+
+    KEYS_FN = 'keys.npy'  # Sorted hashes of the primary keys
+    ROWS_FN = 'rows.npy'  # Hashes of the rows, in the order of `KEYS_FN`
+    VALUES_FN = 'values.pkl'  # The primary keys, in the order of `KEYS_FN`, for deleting vanished rows
+    CURRENT_FN = 'CURRENT'  # The name of the folder of the current version
+    VERSION_PREFIX = 'v_'  # Prefix of the folders of versions
+
+    def __init__(self, url: str, table_name: str, state_dir: Optional[str] = None):
+        """
+        Args:
+            url (str): The engine URL, i.e. `str(engine.url)`.
+            table_name (str): Name of table in database.
+            state_dir (str): The directory of persistent local state, see `get_state_dir`.
+        """
+
+        digest = hashlib.sha1('{}|{}'.format(url, table_name).encode('utf-8')).hexdigest()[:16]
+        self.dir = os.path.join(state_dir or get_state_dir(), DELTA_DIR, '{}_{}'.format(table_name, digest))
+        self.__version_dir = None  # The version read by the last `diff`, see `get_entries`
+
+    def __get_version_dir(self) -> Optional[str]:
+        """Get the folder of the current version, or None if the table has not been synced before.
+
+        Indexes saved by older versions keep their files in `dir` itself.
+        """
+
+        try:
+            with open(os.path.join(self.dir, DeltaIndex.CURRENT_FN), encoding='utf-8') as f:
+                return os.path.join(self.dir, f.read().strip())
+        except FileNotFoundError:
+            return self.dir if os.path.exists(os.path.join(self.dir, DeltaIndex.ROWS_FN)) else None
+
+    def exists(self) -> bool:
+        """Whether the table has been synced before."""
+
+        return self.__get_version_dir() is not None
+
+    def diff(self, key_hashes: np.ndarray, row_hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Compare the rows with the index.
+
+        Args:
+            key_hashes (numpy.ndarray): The hashes of the primary keys of the new rows.
+            row_hashes (numpy.ndarray): The hashes of the new rows.
+
+        Returns:
+            tuple: A boolean mask of the new rows that are inserted or changed, and the positions
+            in the index of the keys that have vanished.
+        """
+
+        self.__version_dir = self.__get_version_dir()
+        if self.__version_dir is None:
+            return np.ones(len(key_hashes), dtype=bool), np.empty(0, dtype=np.int64)
+
+        old_keys = np.load(os.path.join(self.__version_dir, DeltaIndex.KEYS_FN), mmap_mode='r')
+        old_rows = np.load(os.path.join(self.__version_dir, DeltaIndex.ROWS_FN), mmap_mode='r')
+        if len(old_keys) == 0:
+            return np.ones(len(key_hashes), dtype=bool), np.empty(0, dtype=np.int64)
+
+        pos = np.minimum(np.searchsorted(old_keys, key_hashes), len(old_keys) - 1)
+        found = old_keys[pos] == key_hashes
+        changed = ~found | (old_rows[pos] != row_hashes)
+        vanished = np.flatnonzero(~np.isin(old_keys, key_hashes))
+        return changed, vanished
+
+    def get_entries(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, pandas.DataFrame]:
+        """Get the key hashes, the row hashes and the primary key values at positions of the index,
+        in the version that the last `diff` compared with."""
+
+        version_dir = self.__version_dir or self.__get_version_dir()
+        keys = np.load(os.path.join(version_dir, DeltaIndex.KEYS_FN), mmap_mode='r')[positions]
+        rows = np.load(os.path.join(version_dir, DeltaIndex.ROWS_FN), mmap_mode='r')[positions]
+        values = pandas.read_pickle(os.path.join(version_dir, DeltaIndex.VALUES_FN)).iloc[positions]
+        return np.asarray(keys), np.asarray(rows), values
+
+    def save(self, key_hashes: np.ndarray, row_hashes: np.ndarray, keys: pandas.DataFrame) -> None:
+        """Replace the index with the rows that are now in the table.
+
+        The files are written into the folder of a new version, which then becomes current by
+        renaming `CURRENT_FN` over the old pointer. Versions older than the replaced one are removed,
+        the replaced one is left for readers that are still on it.
+
+        Args:
+            key_hashes (numpy.ndarray): The hashes of the primary keys.
+            row_hashes (numpy.ndarray): The hashes of the rows.
+            keys (pandas.DataFrame): The primary key values.
+        """
+
+        old_dir = self.__get_version_dir()
+        version = DeltaIndex.VERSION_PREFIX + uuid.uuid4().hex[:12]
+        version_dir = os.path.join(self.dir, version)
+        os.makedirs(version_dir)
+        order = np.argsort(key_hashes, kind='stable')
+        for name, save in ((DeltaIndex.VALUES_FN, lambda p: keys.iloc[order].reset_index(drop=True).to_pickle(p)),
+                           (DeltaIndex.ROWS_FN, lambda p: np.save(p, row_hashes[order])),
+                           (DeltaIndex.KEYS_FN, lambda p: np.save(p, key_hashes[order]))):
+            with open(os.path.join(version_dir, name), 'wb') as f:
+                save(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+        path = os.path.join(self.dir, DeltaIndex.CURRENT_FN)
+        tmp_path = '{}.{}.tmp'.format(path, version)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self.__remove_versions(keep=(version_dir, old_dir))
+
+    def __remove_versions(self, keep: Tuple = ()) -> None:
+        """Remove the folders of versions except the ones in `keep`, the files of indexes saved by older
+        versions of the package, and the pointers that a crash left unrenamed."""
+
+        keep = {os.path.abspath(d) for d in keep if d is not None}
+        if os.path.abspath(self.dir) not in keep:
+            for name in (DeltaIndex.ROWS_FN, DeltaIndex.KEYS_FN, DeltaIndex.VALUES_FN):
+                try:
+                    os.remove(os.path.join(self.dir, name))
+                except FileNotFoundError:
+                    pass
+        for name in os.listdir(self.dir):
+            path = os.path.join(self.dir, name)
+            if name.startswith(DeltaIndex.VERSION_PREFIX) and os.path.abspath(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)  # A reader may still hold it open on Windows
+        for name in os.listdir(self.dir):
+            # e.g. 'CURRENT.v_1a2b3c4d5e6f.tmp', whose version is gone
+            if name.startswith(DeltaIndex.CURRENT_FN + '.') and name.endswith('.tmp') and \
+                    not os.path.exists(os.path.join(self.dir, name[len(DeltaIndex.CURRENT_FN) + 1:-4])):
+                try:
+                    os.remove(os.path.join(self.dir, name))
+                except FileNotFoundError:
+                    pass
+
+    def reset(self) -> None:
+        """Forget the index, so that the next sync uploads every row."""
+
+        try:
+            os.remove(os.path.join(self.dir, DeltaIndex.CURRENT_FN))
+        except FileNotFoundError:
+            pass
+        self.__version_dir = None
+        if os.path.isdir(self.dir):
+            self.__remove_versions()
+
+
+def make_delete_batches(table_name: str, keys: pandas.DataFrame, batch_rows: int) -> List[Tuple[str, dict]]:
+    """Make parameterized `DELETE` statements of the rows with the given primary keys.
+
+    Args:
+        table_name (str): Name of table in database.
+        keys (pandas.DataFrame): The primary key values, one column per key column.
+        batch_rows (int): The number of rows deleted per statement.
+
+    Returns:
+        list: Tuples of the statement and its parameters.
+        e.g. [("DELETE FROM stock WHERE (code, time) IN ((:p0_0, :p0_1), ...)", {'p0_0': '000101', ...}), ...]
+    """
+
+    columns = '({})'.format(', '.join(keys.columns))
+    batches = []
+    for start in range(0, len(keys), batch_rows):
+        block = keys.iloc[start:start + batch_rows]
+        params, tuples = {}, []
+        for i, row in enumerate(block.itertuples(index=False)):
+            names = ['p{}_{}'.format(i, j) for j in range(len(row))]
+            params.update((n, v.item() if isinstance(v, np.generic) else v) for n, v in zip(names, row))
+            tuples.append('({})'.format(', '.join(':' + n for n in names)))
+        batches.append((DELETE_COMMAND.format(table_name, columns, ', '.join(tuples)), params))
+    return batches
@@ -0,0 +1,142 @@
+# coding=utf-8
+"""dtypes.py - Resolution of MySQL column types into pandas dtypes and export expressions.
+"""
+
+import re
+from typing import List, Tuple
+from .common import INT_TYPE_MAPPING, TYPE_MAPPING, STRING_PREFIX, DECIMAL_MODE
+
+__all__ = ['resolve_dtype', 'resolve_columns', 'is_string_dtype', 'get_parse_dtype']
+
+_TYPE_PATTERN = re.compile(r'^\s*(\w+)\s*(?:\(([^)]*)\))?(.*)$')
+
+_MAX_SCALED_PRECISION = 18  # The most digits a decimal can have to fit into int64
+
+
+def _split_type(column_type: str) -> Tuple[str, List[str], bool]:
+    """Split a column type into its base type, its arguments and whether it is unsigned.
+
+    Examples:
+        >>> _split_type('decimal(10,2) unsigned zerofill')
+        ('decimal', ['10', '2'], True)
+    """
+
+    base, args, attrs = _TYPE_PATTERN.match(column_type.lower()).groups()
+    args = [a.strip() for a in args.split(',')] if args and base not in ('enum', 'set') else []
+    return base, args, 'unsigned' in attrs
+
+
+def resolve_dtype(column_type: str, nullable: bool = True, decimal: str = DECIMAL_MODE) -> str:
+    """Resolve the full type string of a MySQL column into a pandas dtype.
+
+    Args:
+        column_type (str): The type as shown by `SHOW COLUMNS`, e.g. 'int(10) unsigned'.
+        nullable (bool): Whether the column accepts NULL. Integer and boolean columns that do
+            are resolved into the pandas nullable dtypes, e.g. 'Int32' or 'boolean'.
+        decimal (str): How to read `DECIMAL`/`NUMERIC`. 'float' for float64, 'str' for exact strings,
+            or 'scaled' for int64 values multiplied by 10 ** scale (strings if they do not fit).
+
+    Returns:
+        str: The pandas dtype.
+
+    Raises:
+        ValueError: If `decimal` is unknown.
+
+    Examples:
+        >>> resolve_dtype('bigint(20) unsigned', nullable=False)
+        'uint64'
+        >>> resolve_dtype('tinyint(1)')
+        'boolean'
+    """
+
+    base, args, unsigned = _split_type(column_type)
+
+    if (base == 'tinyint' and args == ['1']) or (base == 'bit' and args in ([], ['1'])):
+        dtype = 'bool'
+    elif base == 'bit':
+        dtype = 'uint64'
+    elif base in INT_TYPE_MAPPING:
+        dtype = INT_TYPE_MAPPING[base][unsigned]
+    elif base in ('decimal', 'numeric', 'dec', 'fixed'):
+        if decimal == 'float':
+            return 'float64'
+        if decimal == 'str':
+            return 'object'
+        if decimal != 'scaled':
+            raise ValueError("`decimal` should be 'float', 'str' or 'scaled', not {!r}.".format(decimal))
+        precision = int(args[0]) if args else 10
+        if precision > _MAX_SCALED_PRECISION:
+            return 'object'
+        dtype = 'int64'
+    else:
+        return TYPE_MAPPING.get(base, 'object')
+
+    if not nullable:
+        return dtype
+    if dtype == 'bool':
+        return 'boolean'
+    if dtype.startswith('uint'):
+        return 'UInt' + dtype[len('uint'):]
+    return 'Int' + dtype[len('int'):]
+
+
+def is_string_dtype(dtype: str) -> bool:
+    """Whether a column of the resolved dtype is exported as text with `STRING_PREFIX`."""
+
+    return dtype in ('object', 'category')
+
+
+def get_parse_dtype(dtype: str) -> str:
+    """Get the dtype that the csv parser reads a column of the resolved dtype into.
+
+    Booleans are exported as integers, and strings, datetimes and times are read as text
+    and converted afterwards.
+    """
+
+    if dtype in ('bool', 'boolean'):
+        return 'int8' if dtype == 'bool' else 'Int8'
+    if is_string_dtype(dtype) or dtype.startswith(('datetime64', 'timedelta64')):
+        return 'object'
+    return dtype
+
+
+def _make_select_expr(name: str, column_type: str, dtype: str) -> str:
+    """Make the expression that exports a column in the form its dtype is parsed from.
+
+    Examples:
+        >>> _make_select_expr('price', 'decimal(10,2)', 'int64')
+        'CAST(price * 100 AS SIGNED) AS price'
+    """
+
+    base, args, unsigned = _split_type(column_type)
+    if is_string_dtype(dtype):
+        return "CONCAT('{0}', {1}) AS {1}".format(STRING_PREFIX, name)
+    if base == 'bit':
+        return '{0} + 0 AS {0}'.format(name)
+    if base in ('decimal', 'numeric', 'dec', 'fixed') and dtype.lower() == 'int64':
+        scale = int(args[1]) if len(args) > 1 else 0
+        if scale:
+            return 'CAST({0} * {1} AS SIGNED) AS {0}'.format(name, 10 ** scale)
+    return name
+
+
+def resolve_columns(column_schema: List[Tuple], decimal: str = DECIMAL_MODE) -> List[Tuple]:
+    """Resolve the rows of `SHOW COLUMNS` into the columns to download.
+
+    Args:
+        column_schema (List[Tuple]): Rows of `(Field, Type, Null, Key, Default, Extra)`.
+        decimal (str): How to read `DECIMAL`/`NUMERIC`, see `resolve_dtype`.
+
+    Returns:
+        list: A list of tuples `(name, dtype, select expression)`.
+        e.g. [('code', 'object', "CONCAT('~', code) AS code"), ('volume', 'Int64', 'volume'), ...]
+    """
+
+    columns = []
+    for row in column_schema:
+        name, column_type, nullable = row[0], row[1], row[2]
+        if isinstance(column_type, bytes):
+            column_type = column_type.decode()
+        dtype = resolve_dtype(column_type, nullable == 'YES', decimal)
+        columns.append((name, dtype, _make_select_expr(name, column_type, dtype)))
+    return columns
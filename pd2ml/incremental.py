@@ -0,0 +1,117 @@
+# coding=utf-8
+"""incremental.py - Local copies of tables that grow, for downloading only their new rows.
+"""
+
+import hashlib
+import os
+import numpy as np
+import pandas
+from typing import Any, List, Optional
+from .common import INCREMENTAL_DIR, INCREMENTAL_FORMAT
+from .delta import get_state_dir
+
+__all__ = ['IncrementalCache']
+
+
+class IncrementalCache:
+    """A local copy of the rows of a table downloaded so far, in Feather or Parquet.
+
+    The high-water mark is the maximum of the watermark column in the copy, so the copy and
+    its mark are always replaced together, and a copy that is lost or removed simply causes
+    the next download to be a full one.
+    """
+
+    READERS = {'feather': pandas.read_feather, 'parquet': pandas.read_parquet}
+
+    def __init__(self, url: str, table_name: str, column: str, query: Any = None, state_dir: Optional[str] = None,
+                 fmt: str = INCREMENTAL_FORMAT):
+        """
+        Args:
+            url (str): The engine URL, i.e. `str(engine.url)`.
+            table_name (str): Name of table in database.
+            column (str): The watermark column, e.g. an auto-increment id or an update time.
+            query: Anything else that determines the rows and the columns of the copy, e.g. the
+                projection and the filter, as long as its `repr` is stable.
+            state_dir (str): The directory of persistent local state, see `delta.get_state_dir`.
+            fmt (str): 'feather' or 'parquet', both of which need `pyarrow`.
+
+        Raises:
+            ValueError: If `fmt` is unknown.
+        """
+
+        if fmt not in IncrementalCache.READERS:
+            raise ValueError("`fmt` should be 'feather' or 'parquet', not {!r}.".format(fmt))
+        digest = hashlib.sha1(repr((url, table_name, column, query)).encode('utf-8')).hexdigest()[:16]
+        self.column = column
+        self.fmt = fmt
+        self.path = os.path.join(state_dir or get_state_dir(), INCREMENTAL_DIR,
+                                 '{}_{}.{}'.format(table_name, digest, fmt))
+
+    def read(self) -> Optional[pandas.DataFrame]:
+        """Read the copy, or None if there is none."""
+
+        if not os.path.exists(self.path):
+            return None
+        return IncrementalCache.READERS[self.fmt](self.path)
+
+    def get_mark(self, df: Optional[pandas.DataFrame]) -> Any:
+        """Get the high-water mark of the copy as a value that the database driver can bind.
+
+        Args:
+            df (pandas.DataFrame): The copy, see `read`.
+
+        Returns:
+            The maximum of the watermark column, or None if there is no row with a value.
+        """
+
+        if df is None or self.column not in df.columns:
+            return None
+        mark = df[self.column].max()
+        if pandas.isna(mark):
+            return None
+        if isinstance(mark, pandas.Timestamp):
+            return mark.to_pydatetime()
+        if isinstance(mark, pandas.Timedelta):
+            return mark.to_pytimedelta()
+        return mark.item() if isinstance(mark, np.generic) else mark
+
+    def merge(self, old: Optional[pandas.DataFrame], new: pandas.DataFrame,
+              keys: Optional[List[str]] = None) -> pandas.DataFrame:
+        """Merge the new rows into the copy.
+
+        Args:
+            old (pandas.DataFrame): The copy, see `read`.
+            new (pandas.DataFrame): The rows downloaded since the mark.
+            keys (List[str]): The primary key. If given, a new row replaces the old row of the same key,
+                e.g. a row whose update time has changed. Otherwise the new rows are appended.
+
+        Returns:
+            pandas.DataFrame: The merged copy.
+        """
+
+        if old is None:
+            return new.reset_index(drop=True)
+        merged = pandas.concat([old, new], ignore_index=True)
+        if keys:
+            merged = merged.drop_duplicates(keys, keep='last', ignore_index=True)
+        # Keep the declared dtypes, which `concat` may widen, e.g. with empty frames
+        return merged.astype(new.dtypes.to_dict())
+
+    def save(self, df: pandas.DataFrame) -> None:
+        """Replace the copy, by writing aside and then renaming over it."""
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        if self.fmt == 'feather':
+            df.reset_index(drop=True).to_feather(tmp_path)
+        else:
+            df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        """Forget the copy, so that the next download is a full one."""
+
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,190 @@
+# coding=utf-8
+"""journal.py - Journal of the load status of spooled files, and retries of transient errors, for resumable uploads.
+"""
+
+import functools
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+import sqlalchemy
+from .common import RETRY_TRIES, RETRY_DELAY, RETRY_MAX_DELAY, TRANSIENT_ERROR_CODES
+
+__all__ = ['LoadJournal', 'is_transient', 'get_backoff', 'retry_transient']
+
+logger = logging.getLogger('pd2ml')
+
+
+class LoadJournal:
+    """An append-only journal of the spooled files of an upload folder and their load status.
+
+    Every entry is a line of JSON, flushed to disk before the next file is loaded, so that the
+    journal survives the process. Files are recorded relative to the folder, and the last entry
+    of a file is its status.
+
+    Examples:
+        >>> journal = LoadJournal('/tmp/__tmp__to__main/journal')  # doctest: +SKIP
+        >>> journal.record('/tmp/__tmp__to__main/123_456/stock.csv', LoadJournal.DONE)  # doctest: +SKIP
+        >>> journal.is_done('/tmp/__tmp__to__main/123_456/stock.csv')  # doctest: +SKIP
+        True
+    """
+
+    PENDING = 'pending'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the journal file, in the upload folder.
+        """
+
+        self.path = path
+        self.dir = os.path.dirname(path)
+        self.__lock = threading.Lock()
+
+    def exists(self) -> bool:
+        """Whether the journal has any entries."""
+
+        return os.path.exists(self.path)
+
+    def read(self) -> Dict[str, dict]:
+        """Read the last entry of every file, in the order the files were first recorded.
+
+        A line that is cut short, by a crash while it was written, is ignored.
+        """
+
+        entries = OrderedDict()
+        if not self.exists():
+            return entries
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                entries[entry['file']] = entry
+        return entries
+
+    def is_done(self, file_path: str) -> bool:
+        """Whether the file has been loaded and committed."""
+
+        entry = self.read().get(self.__relpath(file_path))
+        return entry is not None and entry['status'] == LoadJournal.DONE
+
+    def get_done(self) -> set:
+        """Get the paths of the files that have been loaded and committed."""
+
+        return {os.path.join(self.dir, k).replace('\\', '/') for k, v in self.read().items()
+                if v['status'] == LoadJournal.DONE}
+
+    def record(self, file_path: str, status: str, error: Optional[BaseException] = None) -> None:
+        """Append the status of a file, and flush it to disk.
+
+        Args:
+            file_path (str): Path of the spooled file.
+            status (str): `PENDING`, `DONE` or `FAILED`.
+            error (BaseException): The error of a failed file.
+        """
+
+        entry = {'file': self.__relpath(file_path), 'status': status, 'time': time.time()}
+        if error is not None:
+            entry['error'] = repr(error)
+        line = (json.dumps(entry) + '\n').encode('utf-8')
+        with self.__lock, open(self.path, 'ab+') as f:
+            # A line cut short by a crash is ended first, so that it does not swallow this entry.
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    line = b'\n' + line
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def summary(self) -> Dict[str, int]:
+        """Count the files by status, e.g. {'done': 40, 'failed': 1, 'pending': 4}."""
+
+        counts = {}
+        for entry in self.read().values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
+
+    def __relpath(self, file_path: str) -> str:
+        return os.path.relpath(file_path, self.dir).replace('\\', '/')
+
+
+def is_transient(e: BaseException) -> bool:
+    """Whether the error may go away when retried, e.g. a lost connection, a deadlock or a lock wait timeout.
+
+    Errors of the statement itself, e.g. a syntax error, a missing table or a denied access, are not
+    transient, and are raised at once instead of being retried.
+
+    Examples:
+        >>> is_transient(ConnectionResetError())
+        True
+        >>> is_transient(ValueError('bad value'))
+        False
+    """
+
+    if isinstance(e, sqlalchemy.exc.DBAPIError) and e.connection_invalidated:
+        return True
+    if isinstance(e, (sqlalchemy.exc.DisconnectionError, sqlalchemy.exc.TimeoutError,
+                      ConnectionError, socket.timeout)):
+        return True
+    orig = getattr(e, 'orig', None) or e
+    args = getattr(orig, 'args', ())
+    return bool(args) and isinstance(args[0], int) and args[0] in TRANSIENT_ERROR_CODES
+
+
+def get_backoff(attempt: int, delay: float = RETRY_DELAY, max_delay: float = RETRY_MAX_DELAY) -> float:
+    """Get the seconds to wait before the next attempt, by exponential backoff with full jitter.
+
+    The wait is drawn uniformly from `[0, min(max_delay, delay * 2 ** attempt)]`, so that loaders
+    that failed together do not retry together.
+
+    Args:
+        attempt (int): The number of failed attempts so far, minus one.
+        delay (float): The upper bound of the first wait.
+        max_delay (float): The upper bound of any wait.
+    """
+
+    return random.uniform(0, min(max_delay, delay * 2 ** attempt))
+
+
+def retry_transient(tries: int = RETRY_TRIES, delay: float = RETRY_DELAY,
+                    max_delay: float = RETRY_MAX_DELAY, on_retry: Optional[Callable] = None) -> Callable:
+    """A decorator that calls the function up to `tries` times while it fails with transient errors.
+
+    Args:
+        tries (int): The maximum number of attempts.
+        delay (float): See `get_backoff`.
+        max_delay (float): See `get_backoff`.
+        on_retry (Callable): A function called with the error and the arguments of the call right
+            before waiting for each retry, e.g. to count the retries. It is not called for the last
+            attempt or for errors that are not retried.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    attempt += 1
+                    if attempt >= tries or not is_transient(e):
+                        raise e
+                    wait = get_backoff(attempt - 1, delay, max_delay)
+                    logger.warning('%r, retrying in %.1f seconds (%d/%d).', e, wait, attempt, tries - 1)
+                    if on_retry is not None:
+                        on_retry(e, *args, **kwargs)
+                    time.sleep(wait)
+        return wrapper
+
+    return decorator
@@ -3,16 +3,74 @@
 """
 
 import os
+import csv
+import hashlib
+import contextlib
+import contextvars
+import itertools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 import sqlalchemy
 import numpy as np
 import pandas
 from sqlalchemy import text
-from retry import retry
-from .common import UPLOAD_DIR_PREFIX, UPLOAD_MODE, LOAD_FILE_SUFFIX, COLUMNS_FILENAME, DOWNLOAD_DIR_PREFIX, \
-    TYPE_MAPPING, UPLOAD_COMMAND, DOWNLOAD_COMMAND, COLUMNS_COMMAND
+from .common import UPLOAD_DIR_PREFIX, UPLOAD_MODE, LOAD_FILE_SUFFIX, COLUMNS_FILENAME, JOURNAL_FILENAME, \
+    DOWNLOAD_DIR_PREFIX, \
+    UPLOAD_COMMAND, FILE_UPLOAD_COMMAND, DOWNLOAD_COMMAND, COLUMNS_COMMAND, FLOAT_PRECISION, READ_CHUNK_ROWS, \
+    UPLOAD_CHUNK_ROWS, DECIMAL_MODE, FAST_LOAD_VARIABLES, SESSION_STATE_COMMAND, SET_SESSION_COMMAND, DELETE_BATCH_ROWS, \
+    SWAP_STAGING_SUFFIX, SWAP_OLD_SUFFIX, SWAP_LOCK_SECONDS, CREATE_LIKE_COMMAND, DROP_TABLE_COMMAND, SWAP_COMMAND, \
+    SWAP_LOCK_COMMAND, SWAP_UNLOCK_COMMAND, \
+    FIELD_SEPARATOR, ENCLOSED_CHAR, ESCAPED_CHAR, UNIQUE_SEP, BATCH_FILE_BYTES
+from .codec import decode_csv
+from .dtypes import resolve_columns
+from .delta import DeltaIndex, hash_rows, make_delete_batches
+from .dedup import drop_duplicate_keys
+from .incremental import IncrementalCache
+from .cache import ResultCache
+from .stats import LoadStats, get_running, running_call, track
+from .journal import LoadJournal, retry_transient
+from .session import SessionPool
+from .scheduler import plan_lanes
+from .shared import SharedFrame, encode_shared
+from .schema import get_key_columns, get_unique_keys, get_column_range, SchemaCache
 from .manager import UpLoadManger, DownLoadManager
 from .interface import ILoader
-from typing import List, Tuple, Union
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger('pd2ml')
+
+
+def make_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Create a pool of worker processes that are not forked from the calling process.
+
+    The pools are used while threads of the loaders hold connections and locks, which a forked
+    child would inherit in whatever state they are, so the workers are started by a fork server,
+    or spawned where there is none, e.g. Windows. Like there, a script that loads in parallel
+    needs the guard `if __name__ == '__main__':`.
+
+    Args:
+        workers (int): The number of worker processes.
+    """
+
+    methods = multiprocessing.get_all_start_methods()
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(
+        'forkserver' if 'forkserver' in methods else 'spawn'))
+
+
+def escape_literal(value: str) -> str:
+    """Escape a string for a quoted literal of a statement that runs through `sqlalchemy.text`.
+
+    Backslashes and quotes are escaped for MySQL, and colons for `text`, which would otherwise
+    take `:name` for a bound parameter, and drops the backslash of the escape again.
+
+    Examples:
+        >>> escape_literal("/tmp/it's:1.csv")
+        "/tmp/it\\\\'s\\\\:1.csv"
+    """
+
+    return value.replace('\\', '\\\\').replace("'", "\\'").replace(':', '\\:')
 
 
 class UpLoader:
@@ -22,11 +80,35 @@ class UpLoader:
     WRITE_MODE = UPLOAD_MODE  # 'REPLACE' or 'IGNORE' on duplicate rows
     FILE_SUFFIX = LOAD_FILE_SUFFIX  # File name suffix, e.g. '.txt' or '.csv'
     COLUMNS_FN = COLUMNS_FILENAME  # Name of file that save dataframe columns
+    FLOAT_PRECISION = FLOAT_PRECISION  # Number of decimals when writing floats
 
-    def __init__(self, engine: sqlalchemy.engine = None):
+    def __init__(self, engine: sqlalchemy.engine = None, fast_load: bool = False, disable_binlog: bool = False,
+                 work_dir: Optional[str] = None, hooks: Optional[List[Callable]] = None, batch_workers: int = 1,
+                 table_workers: int = 1, executor: Optional[ProcessPoolExecutor] = None):
         """
         Args:
             engine (sqlalchemy.base.Engine): engine instance by `create_engine` function.
+            fast_load (bool): If True, load with `autocommit`, `unique_checks` and `foreign_key_checks`
+                disabled for the session, and load all files of one `execute` in one transaction.
+                Without `unique_checks`, InnoDB may not check secondary unique indexes for rows that
+                are buffered, so under `REPLACE` a row can be inserted beside an existing row with the same
+                value of such an index instead of replacing it. Only use it for data without such conflicts.
+            disable_binlog (bool): If True, also disable `sql_log_bin` under `fast_load`,
+                which needs the privilege SUPER (or SYSTEM_VARIABLES_ADMIN).
+            work_dir (str): The temporary folder, which is cleared by `clear`. By default it is shared
+                by all instances of the script, so instances that load at the same time need their own.
+            hooks (List[Callable]): Functions called with the `LoadStats` of every call, in addition
+                to the ones registered by `stats.add_hook`. The stats of the last call are also kept in `stats`.
+            batch_workers (int): The number of files that `execute` loads at once, over as many sessions.
+                Different tables load concurrently. Ignored under `fast_load`, which loads in one transaction.
+            table_workers (int): The number of files that `execute` loads into the same table at once.
+                At 1, the files of a table load one after another in the order they were written.
+                Above 1, they load in any order, so under 'REPLACE' mode a row of an earlier dataframe may
+                overwrite a later one with the same key. Only raise it for batches whose dataframes do not
+                share keys.
+            executor (ProcessPoolExecutor): The processes that encode the chunks of parallel uploads,
+                which are kept for all calls, see `ParallelLoader`. If None, every call starts `workers` processes,
+                see `make_process_pool`.
         Notes:
             The string form of the URL in ` create_engine` is
             dialect[+driver]://user:password@host/dbname[?key=value..]
@@ -38,32 +120,120 @@ class UpLoader:
         """
 
         self.engine = engine
+        self.fast_load = fast_load
+        self.disable_binlog = disable_binlog
         self.manager = UpLoadManger()
-        self.dir = self.manager.get_dir(UpLoader.PREFIX)
+        self.dir = work_dir or self.manager.get_dir(UpLoader.PREFIX)
         self.child_dir = self.manager.get_child_dir(self.dir)
         self.str_columns = ''
         self.terminate = self.manager.get_terminate()
         self.__execute_list = []
         self.__str_col_path = self.manager.format_path(os.path.join(self.dir, UpLoader.COLUMNS_FN))
+        self.hooks = list(hooks or [])
+        self.stats = LoadStats()
+        self.__parts = {}  # The number of the file being written of each column manifest, see `__make_tmp_table_path`
+        self.__last_keys = {}  # The column manifest last written of each table
+        self.__next_part = itertools.count()
+        self.batch_workers = batch_workers
+        self.table_workers = table_workers
+        self.executor = executor
+
+    @property
+    def stats(self) -> LoadStats:
+        """The statistics of the call running in the current context, or else of the last finished call."""
+
+        return get_running(self) or self.__stats
+
+    @stats.setter
+    def stats(self, stats: LoadStats) -> None:
+        self.__stats = stats
+
+    def __connect(self):
+        """Open a connection, counting the time waited for it."""
+
+        with self.stats.phase('connect'):
+            return self.engine.connect()
+
+    @contextlib.contextmanager
+    def __session_scope(self):
+        """Reuse one session per thread for all files that the call loads in the `with` block, instead of one per file.
+
+        Each file then costs one statement round trip on an open session. The sessions belong to the call,
+        which passes them to `__exec_command`, so that concurrent calls on the same instance never share them.
+        They are returned to the pool of the engine at the end of the block.
+
+        Yields:
+            SessionPool: The sessions of the call.
+        """
+
+        sessions = SessionPool(self.__connect)
+        try:
+            yield sessions
+        finally:
+            sessions.close()
 
     def __make_tmp_dir(self):
         """Creating working directories."""
 
         self.manager.mkdirs([self.dir, self.child_dir])
 
-    def __make_tmp_table_path(self, name: str) -> str:
+    @contextlib.contextmanager
+    def __call_dir(self):
+        """Create a temporary folder of its own for the files of one call, and remove it at the end of the call.
+
+        Calls that do not batch never share a folder, with each other or with the batch of `execute`,
+        so that concurrent calls, on the same instance or on instances of the same `work_dir`,
+        can not remove each other's files. The folder sits next to `dir`, so that a crashed
+        process's folder is removed by the sweep of the spool.
+        """
+
+        work_dir = self.manager.format_path(self.manager.get_unique_path(self.dir))
+        child_dir = self.manager.get_child_dir(work_dir)
+        self.manager.mkdirs([work_dir, child_dir])
+        try:
+            yield child_dir
+        finally:
+            self.manager.clear([work_dir])
+
+    def __make_tmp_table_path(self, key: str) -> str:
         """Set and get the path to the temporary csv table.
 
+        Dataframes of the same table and columns are appended to the same file, until it exceeds
+        `BATCH_FILE_BYTES` and the next file is started, so that a large table can load concurrently.
+        A dataframe of the same table with other columns also starts the next file. The files are numbered
+        in the order they are started, across all tables and columns, which is the order `execute` loads them in.
+
         Args:
-            name (str):  table_name.
+            key (str): The key of the column manifest, see `__save_columns`.
 
         Returns:
-            str: the path to the temporary csv table.
+            str: the path to the temporary csv table, e.g. '.../stock@1a2b3c4d@0.csv'.
         """
 
         self.__make_tmp_dir()
 
-        return os.path.join(self.child_dir, name + UpLoader.FILE_SUFFIX)
+        table_name = key.split(UNIQUE_SEP)[0]
+        part = self.__parts.get(key)
+        path = None
+        if part is not None and self.__last_keys.get(table_name) == key:
+            path = os.path.join(self.child_dir, '{}{}{}{}'.format(key, UNIQUE_SEP, part, UpLoader.FILE_SUFFIX))
+        if path is None or os.path.exists(path) and os.path.getsize(path) >= BATCH_FILE_BYTES:
+            part = self.__parts[key] = next(self.__next_part)
+            path = os.path.join(self.child_dir, '{}{}{}{}'.format(key, UNIQUE_SEP, part, UpLoader.FILE_SUFFIX))
+        self.__last_keys[table_name] = key
+        return path
+
+    @staticmethod
+    def __get_file_order(file_name: str) -> Tuple[int, str]:
+        """Get the sort key of a spooled file, by the number of its part, see `__make_tmp_table_path`.
+
+        Examples:
+            'stock@1a2b3c4d@2.csv' sorts before 'stock@1a2b3c4d@10.csv'. Files of older versions,
+            without a number, sort by name before them.
+        """
+
+        part = os.path.splitext(file_name)[0].split(UNIQUE_SEP)[-1]
+        return (int(part), file_name) if file_name.count(UNIQUE_SEP) == 2 and part.isdigit() else (-1, file_name)
 
     def __create_tmp_table(self, obj: pandas.DataFrame) -> None:
         """Write the dataframe into the temporary csv table.
@@ -77,8 +247,8 @@ class UpLoader:
 
         if hasattr(obj, '_table_name_'):
             name = getattr(obj, '_table_name_')
-            tmp_table_name = self.__make_tmp_table_path(name)
-            self.manager.write_to_csv(tmp_table_name, obj)
+            tmp_table_name = self.__make_tmp_table_path(self.__save_columns(obj, name))
+            self.manager.write_to_csv(tmp_table_name, obj, UpLoader.FLOAT_PRECISION, self.stats)
         else:
             raise AttributeError('The returned value should have an attribute value as _table_name_.')
 
@@ -105,111 +275,709 @@ class UpLoader:
 
         self.__create_tmp_table(obj)
 
-        self.__save_columns(obj)
-
-    def __save_columns(self, obj: pandas.DataFrame) -> None:
-        """Save columns into disk by pickling.
+    def __save_columns(self, obj: pandas.DataFrame, table_name: str) -> str:
+        """Save columns into disk by pickling, as the manifest of the table and this set of columns.
         The purpose of saving it is to use it when uploading.
 
         Args:
             obj (pandas.DataFrame): The target dataframe.
+            table_name (str): Name of table in database.
+
+        Returns:
+            str: The key of the manifest, which names the files of these columns, e.g. 'stock@1a2b3c4d'.
 
         Notes:
             The columns of dataframe to be uploaded must be a SUBSET (contains its own)
             of the columns of target table in the database.
         """
 
-        __path = self.manager.format_path(os.path.join(self.dir, 'str_columns'))
+        str_columns = self.__make_str_columns(obj)
+        key = table_name + UNIQUE_SEP + hashlib.sha1(str_columns.encode('utf-8')).hexdigest()[:8]
+        __path = self.__get_manifest_path(key)
 
         if not os.path.exists(__path):
-            str_col = obj.columns.tolist()
-            str_columns = str(str_col).replace('[', '(').replace(']', ')').replace("'", '')
-            self.manager.pickle_to(__path, str_columns)
+            self.__make_tmp_dir()
+            # Other threads or processes of the batch may write the same manifest at the same time.
+            tmp_path = self.manager.get_unique_path(__path + '.tmp')
+            self.manager.pickle_to(tmp_path, str_columns)
+            os.replace(tmp_path, __path)
+        return key
 
-    def __make_null_str(self, str_columns: str) -> Tuple:
-        """Set a NULL value into the database, when the value in dataframe is NaN.
+    def __get_manifest_path(self, key: str) -> str:
+        """Get the path of the column manifest of the key, e.g. '.../str_columns.stock@1a2b3c4d'."""
+
+        return self.manager.format_path(os.path.join(self.dir, UpLoader.COLUMNS_FN + '.' + key))
+
+    def __read_columns(self, file_path: str) -> str:
+        """Read the columns of a spooled file from its manifest.
+
+        Folders spooled by older versions have one manifest `COLUMNS_FILENAME` for all files.
+        """
+
+        key = UNIQUE_SEP.join(os.path.splitext(os.path.basename(file_path))[0].split(UNIQUE_SEP)[:2])
+        path = self.__get_manifest_path(key)
+        return self.manager.pickle_from(path if os.path.exists(path) else self.__str_col_path)
+
+    def __make_str_columns(self, obj: pandas.DataFrame) -> str:
+        """Make the column list of the upload command.
 
         Args:
-            str_columns: The names of columns in string.
+            obj (pandas.DataFrame): The target dataframe.
 
         Returns:
-            tuple: A tuple of two strings such as `(database columns variables, NULLIF expressions)`.
-            e.g. ("(@vcode, @vtime)", "code = NULLIF(@vcode, 'nan'), time = NULLIF(@vtime, 'nan')")
+            str: The names of columns in string, e.g. "(code, open, time)".
         """
 
-        cols = str_columns.replace('(', '').replace(')', '').split(',')
-        modified_str = str(list(map(lambda x: '@v{}'.format(str(x).strip()), cols))).replace('[', '('). \
-            replace(']', ')').replace("'", '')
-        is_null_str = str(list(map(lambda x: "{0} = NULLIF(@v{0}, 'nan')".format(str(x).strip()), cols))). \
-            replace('[', '').replace(']', '').replace('"', '')
+        str_col = obj.columns.tolist()
+        return str(str_col).replace('[', '(').replace(']', ')').replace("'", '')
+
+    @contextlib.contextmanager
+    def __transaction(self, conn, fast_load: Optional[bool] = None):
+        """Run a transaction on the connection, under the fast load profile if it is enabled.
+
+        The session variables are saved before they are changed, and restored after the transaction
+        ends, whether it is committed or rolled back, in a transaction of their own, so that a session
+        reused for the next file can begin its transaction. If they can not be restored, e.g. because the
+        connection was lost, the connection is invalidated instead, so that the pool never hands out
+        a session under the profile, and the error of the transaction, if any, is the one raised.
 
-        return modified_str, is_null_str
+        Args:
+            conn (sqlalchemy.engine.Connection): An open connection.
+            fast_load (bool): Whether to use the fast load profile, `self.fast_load` if None.
+        """
 
-    @retry(tries=5, delay=3)
-    def __exec_command(self, file_path: str, table_name: str, str_columns: str) -> None:
+        saved = {}
+        try:
+            with conn.begin():
+                if self.fast_load if fast_load is None else fast_load:
+                    variables = FAST_LOAD_VARIABLES + (('sql_log_bin', ) if self.disable_binlog else ())
+                    row = conn.execute(text(SESSION_STATE_COMMAND.format(
+                        ', '.join('@@session.' + v for v in variables)))).fetchone()
+                    saved = dict(zip(variables, row))
+                    # `sql_log_bin` can not be changed inside a transaction, so it goes first.
+                    for v in reversed(variables):
+                        conn.execute(text(SET_SESSION_COMMAND.format(v, 0)))
+                yield conn
+        finally:
+            if saved:
+                try:
+                    with conn.begin():
+                        for v, value in saved.items():
+                            conn.execute(text(SET_SESSION_COMMAND.format(v, int(value))))
+                except Exception as e:
+                    logger.warning('%r while restoring the session variables, invalidating the connection.', e)
+                    try:
+                        conn.invalidate()
+                    except Exception:
+                        pass
+
+    @retry_transient(on_retry=lambda e, self, *args, **kwargs: self.stats.add(retries=1))
+    def __exec_command(self, file_path: str, table_name: str, str_columns: str, load_sql: Optional[str] = None,
+                       fast_load: Optional[bool] = None, sessions: Optional[SessionPool] = None) -> None:
         """Execute upload command.
 
         Args:
             file_path (str): Path of the csv table file.
             table_name (str): Name of table in database.
             str_columns (str): Information of columns that previously saved.
+            load_sql (str): The upload command of a file in another format, see `load_file`.
+                By default it is made from the other arguments.
+            fast_load (bool): Whether to use the fast load profile, `self.fast_load` if None.
+            sessions (SessionPool): The sessions of the call, see `__session_scope`.
 
         Notes:
-            If it fails, try again five times, each interval of three seconds.
+            If it fails with a transient error, e.g. a lost connection or a deadlock, it is tried up to
+            `RETRY_TRIES` times in all, with exponential backoff and jitter between attempts. Other errors
+            are raised at once. With `sessions` it runs on the session of its thread, which is replaced
+            after an error, otherwise on a connection of its own. Either way it can run in several threads.
         """
 
+        conn = self.__connect() if sessions is None else sessions.get()
         try:
-            self.conn = self.engine.connect()
-            modified_str, isnull_str = self.__make_null_str(str_columns)
-            load_sql = text(
-                UPLOAD_COMMAND.format(file_path, UpLoader.WRITE_MODE, table_name, self.terminate, modified_str, isnull_str))
-            self.conn.execute(load_sql)
+            load_sql = load_sql or UPLOAD_COMMAND.format(escape_literal(file_path), UpLoader.WRITE_MODE, table_name,
+                                                         self.terminate, str_columns)
+            with self.__transaction(conn, fast_load), self.stats.phase('load'):
+                conn.execute(text(load_sql))
         except Exception as e:
-            print(e)
+            if sessions is not None:
+                sessions.discard()
             raise e
+        finally:
+            if sessions is None:
+                conn.close()
+        self.stats.add(nbytes=os.path.getsize(file_path), files=1)
+
+    def __exec_batch(self, file_paths: List[str], columns: Dict[str, str]) -> None:
+        """Execute the upload commands of all files in one session and one transaction, with a single COMMIT.
+
+        Args:
+            file_paths (List[str]): Paths of the csv table files.
+            columns (Dict[str, str]): The columns of each file, see `__read_columns`.
+
+        Notes:
+            If any file fails, nothing of the batch is committed, and it is not retried.
+        """
 
-    def execute(self):
+        conn = self.__connect()
+        try:
+            with self.__transaction(conn, True):
+                for file_path in file_paths:
+                    with self.stats.phase('load'):
+                        conn.execute(text(UPLOAD_COMMAND.format(escape_literal(file_path), UpLoader.WRITE_MODE,
+                                                                self.manager.get_table_name(file_path),
+                                                                self.terminate, columns[file_path])))
+                    self.stats.add(nbytes=os.path.getsize(file_path), files=1)
+        finally:
+            conn.close()
+
+    def execute(self, fast_load: Optional[bool] = None):
         """Execute upload command and control the whole process.
 
         The main steps are as follows:
-        1. Iterate over all the files in the folder except `COLUMNS_FILENAME` and append them to the list;
-        2. Upload files from the list via the upload command `LOAD DATA LOCAL INFILE` in MySQL;
-        3. Delete the folder after uploading.
+        1. Iterate over all the files in the folder except the column manifests and the journal, and the ones
+           that the journal records as loaded, and append them to the list;
+        2. Upload files from the list via the upload command `LOAD DATA LOCAL INFILE` in MySQL,
+           in one transaction under the fast load profile, otherwise in lanes planned by `plan_lanes`,
+           `batch_workers` files at a time and at most `table_workers` of them into the same table,
+           recording every committed file in the journal;
+        3. Delete the folder after uploading. If it fails, the folder and the journal are kept, see `resume`.
+
+        Args:
+            fast_load (bool): Whether to use the fast load profile, `self.fast_load` if None.
+
+        Notes:
+            The files of a table load in the order they were written, so under 'REPLACE' mode the row of
+            the last dataframe with a key wins, as it would have in a `load_to` of each dataframe.
+            With `table_workers` above 1 they load in any order, see `UpLoader`. The files of different
+            threads or processes of a batch load one folder after another.
         """
 
-        if not os.path.exists(self.__str_col_path):
+        fast_load = self.fast_load if fast_load is None else fast_load
+        journal = LoadJournal(self.manager.format_path(os.path.join(self.dir, JOURNAL_FILENAME)))
+        done = journal.get_done()
+        for dir_path, dir_names, file_names in os.walk(self.dir):
+            dir_names.sort()
+            for file_name in sorted(file_names, key=UpLoader.__get_file_order):
+                file_path = self.manager.format_path(os.path.join(dir_path, file_name))
+                if not file_name.startswith(COLUMNS_FILENAME) and file_name != JOURNAL_FILENAME and \
+                        file_path not in done:
+                    self.__execute_list.append(file_path)
+
+        if not self.__execute_list:
             return
 
-        self.str_columns = self.manager.pickle_from(self.__str_col_path)
+        table_names = ', '.join(sorted(set(self.manager.get_table_name(p) for p in self.__execute_list)))
+        try:
+            with track(self, 'execute', table_names):
+                for file_path in self.__execute_list:
+                    journal.record(file_path, LoadJournal.PENDING)
+                columns = {p: self.__read_columns(p) for p in self.__execute_list}
+                if fast_load:
+                    try:
+                        self.__exec_batch(self.__execute_list, columns)
+                    except Exception as e:
+                        for file_path in self.__execute_list:
+                            journal.record(file_path, LoadJournal.FAILED, e)
+                        raise e
+                    for file_path in self.__execute_list:
+                        journal.record(file_path, LoadJournal.DONE)
+                else:
+                    files = {}
+                    for file_path in self.__execute_list:
+                        files.setdefault(self.manager.get_table_name(file_path), []).append(
+                            (file_path, os.path.getsize(file_path)))
+                    self.__exec_lanes(plan_lanes(files, self.table_workers), columns, journal)
+        finally:
+            self.__execute_list.clear()
+        self.clear()
 
-        for dir_path, dir_names, file_names in os.walk(self.dir):
-            for file_name in file_names:
-                if file_name != COLUMNS_FILENAME:
-                    self.__execute_list.append(self.manager.format_path(os.path.join(dir_path, file_name)))
+    def __exec_lanes(self, lanes: List[List[str]], columns: Dict[str, str], journal: LoadJournal) -> None:
+        """Load the lanes of files, `batch_workers` at a time, each lane one file after another.
+
+        Args:
+            lanes (List[List[str]]): The lanes, see `plan_lanes`.
+            columns (Dict[str, str]): The columns of each file, see `__read_columns`.
+            journal (LoadJournal): The journal of the batch.
+
+        Raises:
+            Exception: The first error of loading. Once a file fails, no other file is started,
+            and the ones in progress are waited for.
+        """
+
+        failed = threading.Event()
+
+        def _load_lane(lane):
+            for file_path in lane:
+                if failed.is_set():
+                    return
+                try:
+                    self.__exec_command(file_path, self.manager.get_table_name(file_path), columns[file_path],
+                                        fast_load=False, sessions=sessions)
+                except Exception as e:
+                    failed.set()
+                    journal.record(file_path, LoadJournal.FAILED, e)
+                    raise e
+                journal.record(file_path, LoadJournal.DONE)
+
+        with self.__session_scope() as sessions, ThreadPoolExecutor(max(1, self.batch_workers)) as loader:
+            futures = [loader.submit(contextvars.copy_context().run, _load_lane, lane) for lane in lanes]
+            errors = [e for e in (f.exception() for f in futures) if e is not None]
+        if errors:
+            raise errors[0]
+
+    def resume(self) -> None:
+        """Load the spooled files that an earlier `execute` left unloaded, and then clear the folder.
+
+        When `execute` fails, e.g. on a lost connection that outlasts the retries, or its process dies,
+        the spooled files and the journal of the ones already committed are kept in the folder.
+        `resume` loads only the rest, so a failure near the end of a long batch does not mean starting over.
+        It may be called in a new process, with the same `work_dir` (by default the folder of the same script),
+        and should be called before entering `with` again, which clears the folder. A folder that is not
+        resumed within `SPOOL_JOURNAL_STALE_SECONDS` is removed by the sweep of the spool.
+
+        Notes:
+            A file committed right before a crash, whose entry was not yet written, is loaded again.
+            Under 'REPLACE' mode that rewrites the same rows of a table with a primary or unique key.
+        """
+
+        self.execute()
+
+    def __stream_to(self, chunks: Iterable[pandas.DataFrame], table_name: str, str_columns: str, work_dir: str,
+                    fast_load: Optional[bool] = None) -> int:
+        """Upload the dataframes through a named pipe instead of a temporary csv table.
+
+        The encoder writes into the pipe on a producer thread while the server reads from it,
+        so that encoding and loading overlap and nothing is written to disk. All dataframes
+        go into one `LOAD DATA`, and only one of them is held at a time.
+
+        Args:
+            chunks (Iterable[pandas.DataFrame]): The target dataframes, all of the same columns.
+            table_name (str): Name of table in database.
+            str_columns (str): The columns of the dataframes, e.g. "(code, open, time)".
+            work_dir (str): The folder of the pipe, see `__call_dir`.
+            fast_load (bool): Whether to use the fast load profile, `self.fast_load` if None.
+
+        Returns:
+            int: The number of rows loaded.
+
+        Notes:
+            A stream can not be read twice, so the load runs inside a transaction and is not retried.
+            If the encoder fails halfway, the partially loaded rows are rolled back.
+        """
+
+        fifo_path = self.manager.format_path(os.path.join(work_dir, table_name + UpLoader.FILE_SUFFIX))
+        self.manager.make_fifo(fifo_path)
+        errors, rows = [], []
+
+        def _produce():
+            try:
+                rows.append(self.manager.write_chunks_to_csv(fifo_path, chunks, UpLoader.FLOAT_PRECISION, self.stats))
+            except Exception as e:
+                errors.append(e)
+
+        producer = threading.Thread(target=contextvars.copy_context().run, args=(_produce, ), daemon=True)
+        producer.start()
+        conn = self.__connect()
+        try:
+            with self.__transaction(conn, fast_load):
+                try:
+                    with self.stats.phase('load'):
+                        conn.execute(text(UPLOAD_COMMAND.format(escape_literal(fifo_path), UpLoader.WRITE_MODE,
+                                                                table_name, self.terminate, str_columns)))
+                    self.stats.add(files=1)
+                finally:
+                    # If the server never opened the pipe, the producer is still blocked in `open`.
+                    while producer.is_alive():
+                        self.manager.release_fifo(fifo_path)
+                        producer.join(0.1)
+                if errors and not isinstance(errors[0], BrokenPipeError):
+                    raise errors[0]
+        finally:
+            conn.close()
+        return sum(rows)
+
+    def __load_parallel(self, df: pandas.DataFrame, table_name: str, workers: int, chunk_rows: int, work_dir: str,
+                        fast_load: Optional[bool] = None) -> int:
+        """Encode the chunks of the dataframe in worker processes and load them concurrently.
+
+        The columns of the dataframe are copied once into shared memory, see `SharedFrame`, and the
+        worker processes encode ranges of rows from there, so chunks are not pickled to them.
+        Each chunk is loaded as soon as it has been encoded, over at most `workers` sessions, each of
+        which is kept open for all chunks of its thread, and its file is removed once it is loaded.
+        No chunk is encoded while the spooled chunks and its size, estimated by the last encoded chunk,
+        would exceed the budget of the spool, see `SpoolManager.set_budget`.
+
+        Args:
+            df (pandas.DataFrame): The target dataframe.
+            table_name (str): Name of table in database.
+            workers (int): The number of worker processes and of concurrent connections.
+            chunk_rows (int): The number of rows of each chunk.
+            work_dir (str): The folder of the chunks, see `__call_dir`.
+            fast_load (bool): Whether to use the fast load profile, `self.fast_load` if None.
+
+        Returns:
+            int: The number of rows loaded.
+
+        Raises:
+            Exception: The first error of encoding or loading. The chunks that have not started
+            yet are cancelled, the ones in progress are waited for, and the temporary folder and the
+            shared memory are removed, so nothing keeps running after the call returns, even if a worker
+            died. Chunks loaded before the error stay in the table, and loading again in `REPLACE` mode
+            converges to the same state.
+        """
+
+        str_columns = self.__make_str_columns(df)
+        spool = self.manager.spool
+
+        last_size = [0]  # The size of the last encoded chunk, as the estimate of the next one
 
-        for file_path in self.__execute_list:
+        def _encode_and_load(start):
+            # Wait while the spooled chunks would exceed the budget of the spool.
+            reserved = last_size[0]
+            spool.acquire(reserved)
+            path = self.manager.format_path(self.manager.get_unique_path(
+                os.path.join(work_dir, table_name + UpLoader.FILE_SUFFIX)))
+            try:
+                with self.stats.phase('encode'):
+                    rows = encoder.submit(encode_shared, frame.get_task(start, start + chunk_rows), path,
+                                          self.terminate, UpLoader.FLOAT_PRECISION).result()
+                size = last_size[0] = os.path.getsize(path)
+                if size > reserved:
+                    spool.reserve(size - reserved)
+                else:
+                    spool.release(reserved - size)
+                reserved = size
+                self.__exec_command(path, table_name, str_columns, fast_load=fast_load, sessions=sessions)
+            finally:
+                self.manager.remove(path)
+                spool.release(reserved)
+            return rows
+
+        encoders = make_process_pool(workers) if self.executor is None else contextlib.nullcontext(self.executor)
+        with self.__session_scope() as sessions, SharedFrame(df) as frame, encoders as encoder, \
+                ThreadPoolExecutor(workers) as loader:
+            futures = [loader.submit(contextvars.copy_context().run, _encode_and_load, start)
+                       for start in range(0, len(df), chunk_rows)]
+            loaded = 0
             try:
-                self.__exec_command(file_path, self.manager.get_table_name(file_path), self.str_columns)
+                for future in as_completed(futures):
+                    loaded += future.result()
             except Exception as e:
+                for future in futures:
+                    future.cancel()
                 raise e
+        return loaded
+
+    def __load_delta(self, df: pandas.DataFrame, table_name: str, delete_missing: bool,
+                     state_dir: Optional[str], **kwargs) -> None:
+        """Upload only the rows that were inserted or changed since the last successful sync of the table.
+
+        Rows are identified by the primary key of the table and compared by their hashes with a
+        local index (see `DeltaIndex`), which is replaced only after the upload has succeeded.
+
+        Args:
+            df (pandas.DataFrame): The full snapshot of the table.
+            table_name (str): Name of table in database.
+            delete_missing (bool): If True, also delete the rows whose keys are no longer in `df`.
+            state_dir (str): The directory of persistent local state, see `delta.get_state_dir`.
+            **kwargs: The keyword arguments of the upload of the changed rows, see `load_to`.
+
+        Raises:
+            ValueError: If the table has no primary key, or `df` lacks a column of it.
+
+        Notes:
+            The index only knows about changes made through it. After the table was written in
+            another way, call `DeltaIndex(...).reset()` so that the next sync uploads everything.
+        """
+
+        conn = self.__connect()
+        try:
+            keys = get_key_columns(conn, table_name)
+        finally:
+            conn.close()
+        if not keys or not set(keys).issubset(df.columns):
+            raise ValueError('Delta sync needs the primary key {} of table {} in the dataframe.'.format(
+                keys, table_name))
+
+        # Like `REPLACE`, the last of the rows with the same key wins.
+        key_hashes = hash_rows(df[keys])
+        duplicated = pandas.Series(key_hashes).duplicated(keep='last').to_numpy()
+        if duplicated.any():
+            df, key_hashes = df[~duplicated], key_hashes[~duplicated]
+        row_hashes = hash_rows(df)
+
+        index = DeltaIndex(str(self.engine.url), table_name, state_dir)
+        changed, vanished = index.diff(key_hashes, row_hashes)
+        old_keys, old_rows, old_values = index.get_entries(vanished) if len(vanished) else (None, None, None)
+
+        if changed.any():
+            self.__load_full(df[changed], table_name, **kwargs)
+
+        values = df[keys]
+        if old_values is not None and delete_missing:
+            conn = self.__connect()
+            try:
+                with self.__transaction(conn):
+                    for sql, params in make_delete_batches(table_name, old_values, DELETE_BATCH_ROWS):
+                        conn.execute(text(sql), params)
             finally:
-                self.conn.close()
+                conn.close()
+        elif old_values is not None:
+            # The vanished rows stay in the table, so they stay in the index.
+            key_hashes = np.concatenate([key_hashes, old_keys])
+            row_hashes = np.concatenate([row_hashes, old_rows])
+            values = pandas.concat([values, old_values], ignore_index=True)
 
-        self.__execute_list.clear()
-        self.clear()
+        index.save(key_hashes, row_hashes, values)
+
+    def __load_swap(self, df: pandas.DataFrame, table_name: str, **kwargs) -> None:
+        """Load the dataframe into a staging copy of the table, and then swap it with the table.
+
+        The main steps are as follows:
+        1. Take a named lock of the table, so that swaps of the same table wait for each other;
+        2. Create the staging table by `CREATE TABLE ... LIKE`, dropping any left by a crash;
+        3. Load it under the fast load profile, which nobody else reads or locks meanwhile,
+           from a temporary folder of this call only;
+        4. Unless fewer rows were loaded than the dataframe has, swap it with the table by one atomic
+           `RENAME TABLE`, and drop the old table.
 
-    def load_to(self, df: pandas.DataFrame, table_name: str) -> None:
+        Args:
+            df (pandas.DataFrame): The whole new content of the table.
+            table_name (str): Name of table in database.
+            **kwargs: The keyword arguments of the load of the staging table, see `load_to`.
+
+        Raises:
+            TimeoutError: If another swap of the table holds the lock for `SWAP_LOCK_SECONDS`.
+            RuntimeError: If fewer rows were loaded into the staging table than the dataframe has,
+                in which case the table is left as it was.
+
+        Notes:
+            Readers only wait for the rename. `CREATE TABLE ... LIKE` copies columns and indexes,
+            but not foreign keys or triggers, which are lost with the old table.
+            It needs the privileges CREATE, DROP and ALTER on the table, and holds one more
+            connection of the pool for the lock.
+        """
+
+        staging = table_name + SWAP_STAGING_SUFFIX
+        old = table_name + SWAP_OLD_SUFFIX
+        lock = self.__connect()
+        try:
+            with self.stats.phase('lock'):
+                acquired = lock.execute(text(SWAP_LOCK_COMMAND), {'name': table_name,
+                                                                  'timeout': SWAP_LOCK_SECONDS}).scalar()
+            if acquired != 1:
+                raise TimeoutError('Another swap of table {} is still running.'.format(table_name))
+            self.__exec_ddl(DROP_TABLE_COMMAND.format(staging), CREATE_LIKE_COMMAND.format(staging, table_name))
+            try:
+                loaded = self.__load_full(df, staging, fast_load=True, **kwargs)
+                if loaded != len(df):
+                    raise RuntimeError('Only {} of the {} rows were loaded into {}, which is not swapped in.'.format(
+                        loaded, len(df), staging))
+                self.__exec_ddl(DROP_TABLE_COMMAND.format(old), SWAP_COMMAND.format(table_name, staging, old))
+            except Exception as e:
+                try:
+                    self.__exec_ddl(DROP_TABLE_COMMAND.format(staging))
+                except Exception as drop_error:
+                    logger.warning('%r while dropping the staging table %s.', drop_error, staging)
+                raise e
+            self.__exec_ddl(DROP_TABLE_COMMAND.format(old))
+        finally:
+            try:
+                lock.execute(text(SWAP_UNLOCK_COMMAND), {'name': table_name})
+                lock.close()
+            except Exception:
+                # The lock goes with the session, which is not returned to the pool.
+                try:
+                    lock.invalidate()
+                except Exception:
+                    pass
+                lock.close()
+
+    def __exec_ddl(self, *commands: str) -> None:
+        """Execute statements in order over one connection."""
+
+        conn = self.__connect()
+        try:
+            with conn.begin():
+                for command in commands:
+                    conn.execute(text(command))
+        finally:
+            conn.close()
+
+    def load_to(self, df: pandas.DataFrame, table_name: str, stream: bool = False, workers: int = 1,
+                chunk_rows: int = UPLOAD_CHUNK_ROWS, mode: str = 'full', delete_missing: bool = False,
+                state_dir: Optional[str] = None, dedup: bool = False) -> None:
         """Provide the public external method for uploading.
 
         Args:
             df (pandas.DataFrame): The target dataframe.
             table_name (str): Name of table in database.
+            stream (bool): If True, stream the encoded rows to the server through a named pipe,
+                so that upload time is about max(encode, load) instead of their sum.
+                It falls back to the temporary csv table where named pipes are not supported, e.g. Windows.
+            workers (int): If greater than 1, split the dataframe into chunks of `chunk_rows` rows,
+                encode them in `workers` processes and load them over `workers` connections at once.
+            chunk_rows (int): The number of rows of each chunk when `workers` is greater than 1.
+            mode (str): 'full' to upload every row, 'delta' to upload only the rows that changed
+                since the last delta sync of the table, keyed by its primary key, or 'swap' to
+                replace the whole content of the table by loading a staging copy and renaming it.
+            delete_missing (bool): In 'delta' mode, also delete the rows whose keys vanished from `df`.
+            state_dir (str): In 'delta' mode, the directory of the local hash index.
+            dedup (bool): If True, look up the primary and unique keys of the table and drop the rows
+                that a later row of `df` has the same value of every unique key as, before uploading,
+                see `dedup.drop_duplicate_keys`.
+                `REPLACE` then writes each key once instead of deleting and inserting it again.
+                The number of dropped rows is kept in `stats.dropped`.
+
+        Raises:
+            ValueError: If `mode` is unknown.
+
+        Notes:
+            The statistics of the call are kept in `stats`, see `stats.LoadStats`.
         """
 
-        self.clear()
-        self.set_attr_tn(df, table_name)
-        self.make_tmp_table(df)
-        self.execute()
+        if mode not in ('full', 'delta', 'swap'):
+            raise ValueError("`mode` should be 'full', 'delta' or 'swap', not {!r}.".format(mode))
+
+        with track(self, 'load_to', table_name):
+            if dedup:
+                df = self.__drop_duplicates(df, table_name)
+            if mode == 'delta':
+                self.__load_delta(df, table_name, delete_missing, state_dir, stream=stream, workers=workers,
+                                  chunk_rows=chunk_rows)
+            elif mode == 'swap':
+                self.__load_swap(df, table_name, stream=stream, workers=workers, chunk_rows=chunk_rows)
+            else:
+                self.__load_full(df, table_name, stream, workers, chunk_rows)
+
+    def __drop_duplicates(self, df: pandas.DataFrame, table_name: str) -> pandas.DataFrame:
+        """Drop the rows of the dataframe that a later row would replace, by the unique keys of the table."""
+
+        conn = self.__connect()
+        try:
+            with self.stats.phase('schema'):
+                keys = get_unique_keys(conn, table_name)
+        finally:
+            conn.close()
+        with self.stats.phase('dedup'):
+            df, dropped = drop_duplicate_keys(df, keys)
+        self.stats.add(dropped=dropped)
+        return df
+
+    def __load_full(self, df: pandas.DataFrame, table_name: str, stream: bool = False, workers: int = 1,
+                    chunk_rows: int = UPLOAD_CHUNK_ROWS, fast_load: Optional[bool] = None) -> int:
+        """Upload every row of the dataframe in a folder of its own, see `load_to` for the arguments.
+        `fast_load` overrides the profile of the instance, see `__transaction`.
+
+        Returns:
+            int: The number of rows in the files or the stream that were loaded.
+        """
+
+        self.stats.add(rows=len(df))
+        with self.__call_dir() as work_dir:
+            if workers > 1 and len(df) > chunk_rows:
+                return self.__load_parallel(df, table_name, workers, chunk_rows, work_dir, fast_load)
+            if stream and self.manager.can_stream():
+                return self.__stream_to([df], table_name, self.__make_str_columns(df), work_dir, fast_load)
+
+            path = self.manager.format_path(os.path.join(work_dir, table_name + UpLoader.FILE_SUFFIX))
+            self.manager.write_to_csv(path, df, UpLoader.FLOAT_PRECISION, self.stats)
+            self.__exec_command(path, table_name, self.__make_str_columns(df), fast_load=fast_load)
+            return len(df)
+
+    def load_iter(self, chunks: Iterable[pandas.DataFrame], table_name: str, stream: bool = True) -> None:
+        """Upload the dataframes of an iterable, e.g. the chunks of a reader, holding one at a time.
+
+        Args:
+            chunks (Iterable[pandas.DataFrame]): The dataframes, all of the same columns.
+            table_name (str): Name of table in database.
+            stream (bool): If True, stream all dataframes through a named pipe into one `LOAD DATA`,
+                which is committed or rolled back as a whole. Otherwise, or where named pipes are not
+                supported, each dataframe is spooled and loaded on its own, and the ones loaded before
+                an error stay in the table.
+
+        Raises:
+            ValueError: If the columns of a dataframe differ from the ones of the first.
+        """
+
+        chunks = iter(chunks)
+        first = next(chunks, None)
+        if first is None:
+            return
+
+        def _count():
+            for df in itertools.chain([first], chunks):
+                if list(df.columns) != list(first.columns):
+                    raise ValueError('The columns {} differ from the columns {} of the first chunk.'.format(
+                        list(df.columns), list(first.columns)))
+                self.stats.add(rows=len(df))
+                yield df
+
+        str_columns = self.__make_str_columns(first)
+        with track(self, 'load_iter', table_name), self.__call_dir() as work_dir:
+            if stream and self.manager.can_stream():
+                self.__stream_to(_count(), table_name, str_columns, work_dir)
+                return
+            path = self.manager.format_path(os.path.join(work_dir, table_name + UpLoader.FILE_SUFFIX))
+            with self.__session_scope() as sessions:
+                for df in _count():
+                    self.manager.write_to_csv(path, df, UpLoader.FLOAT_PRECISION, self.stats)
+                    try:
+                        self.__exec_command(path, table_name, str_columns, sessions=sessions)
+                    finally:
+                        self.manager.remove(path)
+
+    def load_file(self, path: str, table_name: str, columns: Optional[List[str]] = None, fmt: Optional[str] = None,
+                  header: bool = False, separator: str = FIELD_SEPARATOR, enclosed: str = ENCLOSED_CHAR,
+                  escaped: str = ESCAPED_CHAR, terminate: Optional[str] = None,
+                  chunk_rows: int = UPLOAD_CHUNK_ROWS) -> None:
+        """Upload a csv or Parquet file without reading it into a dataframe first.
+
+        A csv file is handed to `LOAD DATA LOCAL INFILE` as it is. A Parquet file is read in batches
+        of `chunk_rows` rows and streamed like `load_iter`, which needs `pyarrow`.
+
+        Args:
+            path (str): Path to the file.
+            table_name (str): Name of table in database.
+            columns (List[str]): For csv, the table columns of the fields, in the order of the file.
+                If None, the names in the header, or else all columns of the table.
+                For Parquet, the columns to read, which must be named like the table columns.
+                If None, all columns of the file.
+            fmt (str): 'csv' or 'parquet'. If None, it is told by the suffix '.parquet' or '.pq'.
+            header (bool): For csv, whether the first line holds the names of the fields, which is skipped.
+            separator, enclosed, escaped (str): For csv, the field separator, the quote and the escape
+                character. NULL has to be written as `\\N`, an empty field is an empty string (or 0).
+            terminate (str): For csv, the line terminator, by default the one of the system.
+            chunk_rows (int): For Parquet, the number of rows of each batch.
+
+        Raises:
+            ValueError: If `fmt` is unknown.
+        """
+
+        if fmt is None:
+            fmt = 'parquet' if os.path.splitext(path)[1].lower() in ('.parquet', '.pq') else 'csv'
+        if fmt == 'parquet':
+            from pyarrow import parquet
+
+            with track(self, 'load_file', table_name):
+                batches = parquet.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns)
+                self.load_iter((batch.to_pandas() for batch in batches), table_name)
+            return
+        if fmt != 'csv':
+            raise ValueError("`fmt` should be 'csv' or 'parquet', not {!r}.".format(fmt))
+
+        terminate = terminate or self.terminate
+        if columns is None and header:
+            with open(path, newline='', encoding='utf-8') as f:
+                columns = next(csv.reader(f, delimiter=separator, quotechar=enclosed), None)
+        str_columns = '({})'.format(', '.join(columns)) if columns else ''
+        file_path = self.manager.format_path(os.path.abspath(path))
+        separator, enclosed, escaped, terminate = (escape_literal(s) for s in (separator, enclosed, escaped,
+                                                                               terminate))
+        load_sql = FILE_UPLOAD_COMMAND.format(escape_literal(file_path), UpLoader.WRITE_MODE, table_name, separator, enclosed,
+                                              escaped, terminate, 1 if header else 0, str_columns)
+        with track(self, 'load_file', table_name):
+            self.__exec_command(file_path, table_name, str_columns, load_sql)
 
     def batch_load_to(self, df: pandas.DataFrame, table_name: str) -> None:
         """Provide the public external method for batch uploading.
@@ -251,6 +1019,9 @@ class UpLoader:
     def clear(self):
         """Clear temporary folders."""
 
+        self.__parts.clear()
+        self.__last_keys.clear()
+        self.__next_part = itertools.count()
         self.manager.clear([self.dir])
 
 
@@ -260,10 +1031,27 @@ class DownLoader:
     PREFIX = DOWNLOAD_DIR_PREFIX  # Temporary folder name prefix
     FILE_SUFFIX = LOAD_FILE_SUFFIX  # File name suffix, e.g. '.txt' or '.csv'
 
-    def __init__(self, engine: sqlalchemy.engine = None):
+    def __init__(self, engine: sqlalchemy.engine = None, schema_cache: Optional[SchemaCache] = None,
+                 decimal: str = DECIMAL_MODE, result_cache: Optional[ResultCache] = None,
+                 work_dir: Optional[str] = None, hooks: Optional[List[Callable]] = None,
+                 executor: Optional[ProcessPoolExecutor] = None):
         """
         Args:
             engine (sqlalchemy.base.Engine): engine instance by `create_engine` function
+            schema_cache (SchemaCache): The cache of table columns, e.g. `schema.SCHEMA_CACHE` shared by
+                all instances. If None, `SHOW COLUMNS` runs before every download, so that a download always
+                has the current columns. A cached entry is only dropped when it expires, or when an export fails,
+                so after `ALTER TABLE ... ADD COLUMN` the new column is left out until then, unless the cache
+                is created with `validate`.
+            decimal (str): How to read `DECIMAL` columns. 'float' for float64, 'str' for exact strings,
+                or 'scaled' for int64 values multiplied by 10 ** scale.
+            result_cache (ResultCache): If given, results are cached on disk and served from there
+                as long as the version of the table is unchanged, see `ResultCache`, whose
+                `validate='information_schema'` may serve stale results after writes.
+            work_dir (str): The temporary folder, see `UpLoader`.
+            hooks (List[Callable]): Functions called with the `LoadStats` of every call, see `UpLoader`.
+            executor (ProcessPoolExecutor): The processes that parse the ranges of parallel downloads,
+                which are kept for all calls. If None, every call starts `workers` processes, see `make_process_pool`.
         Notes:
             To ensure that this class can normally works, we need to ensure that
             the database is configured by `secure-file-priv=""`
@@ -274,80 +1062,390 @@ class DownLoader:
 
         self.engine = engine
         self.manager = DownLoadManager()
-        self.dir = self.manager.get_dir(DownLoader.PREFIX)
+        self.schema_cache = schema_cache
+        self.decimal = decimal
+        self.result_cache = result_cache
+        self.dir = work_dir or self.manager.get_dir(DownLoader.PREFIX)
         self.child_dir = self.manager.get_child_dir(self.dir)
         self.terminate = self.manager.get_terminate()
-        self.conn = None
+        self.__local = threading.local()
         self.file_path = ''
+        self.hooks = list(hooks or [])
+        self.stats = LoadStats()
+        self.executor = executor
+
+    @property
+    def stats(self) -> LoadStats:
+        """The statistics of the call running in the current context, or else of the last finished call."""
+
+        return get_running(self) or self.__stats
+
+    @stats.setter
+    def stats(self, stats: LoadStats) -> None:
+        self.__stats = stats
+
+    @property
+    def conn(self):
+        """The connection of the running call in the current thread, so that threads never share one."""
+
+        return getattr(self.__local, 'conn', None)
 
-    def __get_columns(self, table_name: str) -> List[Tuple]:
+    @conn.setter
+    def conn(self, conn) -> None:
+        self.__local.conn = conn
+
+    def __connect(self):
+        """Open a connection, counting the time waited for it."""
+
+        with self.stats.phase('connect'):
+            return self.engine.connect()
+
+    def __get_columns(self, table_name: str, names: Optional[List[str]] = None) -> List[Tuple]:
         """Get columns of table in database.
 
         Args:
             table_name (str): Name of table in database.
+            names (List[str]): The columns to download, in this order. If None, all columns.
+                Only these columns are resolved.
 
         Returns:
-            list: A list of tuples, the both of element of which represents
-            the column name and the second the data type respectively.
-            e.g. [('column1', 'char(6)'), ('column2', 'int'), ...]
+            list: A list of tuples, the elements of which represent the column name, its dtype
+            and its select expression respectively.
+            e.g. [('column1', 'object', "CONCAT('~', column1) AS column1"), ('column2', 'Int32', 'column2'), ...]
         """
 
-        # Read from database
-        self.conn = self.engine.connect()
+        # Read from the cache or from database
+        self.conn = self.__connect()
         try:
-            column_schema = list(self.conn.execute(text(COLUMNS_COMMAND.format(table_name))))
+            with self.stats.phase('schema'):
+                if self.schema_cache is None:
+                    column_schema = list(self.conn.execute(text(COLUMNS_COMMAND.format(table_name))))
+                else:
+                    column_schema = self.schema_cache.get_columns(self.conn, table_name)
+            if names is not None:
+                rows = {row[0]: row for row in column_schema}
+                missing = [n for n in names if n not in rows]
+                if missing:
+                    raise ValueError('Columns {} are not in table {}.'.format(missing, table_name))
+                column_schema = [rows[n] for n in names]
         except Exception as e:
-            self.clear()
+            # Nothing was exported yet, and the folder holds the files of other downloads.
+            self.conn.close()
             raise e
 
-        columns = []
-        type_value = 'object'  # default
-
-        for column in column_schema:
-            t = column[1].split('(')[0]  # e.g. `char(6)` -> `char`
-            for type_key in TYPE_MAPPING:
-                types = TYPE_MAPPING[type_key]
-                if t in types:
-                    type_value = type_key
-                    break
-            columns.append((column[0], type_value))
-
-        return columns
+        return resolve_columns(column_schema, self.decimal)
 
-    def __exec_command(self, table_name: str, if_null_str: str) -> None:
+    def __exec_command(self, table_name: str, select_str: str, file_path: str, where_str: str = '',
+                       conn=None, params: Optional[dict] = None) -> None:
         """Execute download command via `SELECT * INTO OUTFILE`
 
         Args:
             table_name (str): Name of table in database.
+            select_str (str): The select expressions.
+            file_path (str): Path of the file that the server writes.
+            where_str (str): An optional clause appended to the command, e.g. " WHERE id < :id LIMIT 100",
+                see `__make_clause`.
+            conn (sqlalchemy.engine.Connection): The connection to use, `self.conn` by default.
+                It is closed afterwards.
+            params (dict): The values of the bound parameters of `where_str`.
+
+        Notes:
+            If it fails, only the file of this call is removed, since other calls, e.g. the other
+            ranges of a parallel download, may be writing or reading theirs in the same folder.
         """
 
-        sql = text(DOWNLOAD_COMMAND.format(if_null_str, self.file_path, self.terminate, table_name))
+        conn = self.conn if conn is None else conn
+        sql = text(DOWNLOAD_COMMAND.format(select_str, file_path, self.terminate, table_name, where_str))
         try:
-            self.conn.execute(sql)
+            with self.stats.phase('export'):
+                conn.execute(sql, params or {})
         except Exception as e:
-            self.clear()
+            # The cached columns may be out of date, e.g. after `ALTER TABLE`.
+            if self.schema_cache is not None:
+                self.schema_cache.invalidate(str(self.engine.url), table_name)
+            self.manager.remove(file_path)
             raise e
-        self.conn.close()
+        finally:
+            conn.close()
+        if os.path.exists(file_path):
+            self.stats.add(nbytes=os.path.getsize(file_path), files=1)
+
+    def __make_select_str(self, columns: List[Tuple]) -> str:
+        """Make the select expressions of the download command.
+
+        Args:
+            columns (List[Tuple]): A list of tuples of the column name, its dtype and its select expression.
+
+        Returns:
+            str: The select expressions, in which strings are prefixed with `STRING_PREFIX`.
+            e.g. "CONCAT('~', code) AS code, open, time"
+        """
+
+        return ', '.join(c[2] for c in columns)
+
+    def __make_clause(self, conditions: List[str], order_by: Optional[str] = None,
+                      limit: Optional[int] = None) -> str:
+        """Make the clause appended to the download command.
+
+        Args:
+            conditions (List[str]): The conditions that rows must all meet. Empty ones are skipped.
+            order_by (str): The `ORDER BY` expressions.
+            limit (int): The maximum number of rows.
+
+        Returns:
+            str: The clause, e.g. " WHERE (date = :date) AND (id < 100) ORDER BY id LIMIT 10".
+
+        Examples:
+            >>> DownLoader()._DownLoader__make_clause(['date = :date', ''], 'time', 10)
+            ' WHERE (date = :date) ORDER BY time LIMIT 10'
+        """
+
+        conditions = [c for c in conditions if c]
+        clause = ' WHERE ' + ' AND '.join('({})'.format(c) for c in conditions) if conditions else ''
+        if order_by:
+            clause += ' ORDER BY ' + order_by
+        if limit is not None:
+            clause += ' LIMIT {:d}'.format(limit)
+        return clause
+
+    def __make_tmp_file_path(self, table_name: str) -> str:
+        """Create working directories, and get a path for the file that the server writes.
+
+        Args:
+            table_name (str): Name of table in database.
+
+        Returns:
+            str: A path to a file that does not exist yet.
+        """
+
+        self.manager.mkdirs([self.dir, self.child_dir])
+        file_path = self.manager.format_path(os.path.join(self.child_dir, table_name + DownLoader.FILE_SUFFIX))
+        return self.manager.get_unique_path(file_path)
+
+    def __make_partitions(self, table_name: str, columns: List[Tuple], workers: int,
+                          where: Optional[str] = None, params: Optional[dict] = None) -> List[str]:
+        """Split the table into ranges of a key column, for downloading in parallel.
+
+        The first column of the primary key is used if it is a selected integer or datetime column,
+        otherwise the first selected integer or datetime column. The range between its minimum
+        and maximum among the rows that meet `where` is split evenly.
+
+        Args:
+            table_name (str): Name of table in database.
+            columns (List[Tuple]): A list of tuples of the column name, its dtype and its select expression.
+            workers (int): The number of ranges.
+            where (str): The condition of the rows to download.
+            params (dict): The values of the bound parameters of `where`.
+
+        Returns:
+            list: The conditions of the ranges, covering NULL keys as well. It is `['']`
+            if the table can not be split.
+        """
 
-    def __convert_type(self, df: pandas.DataFrame, columns: List[Tuple]) -> pandas.DataFrame:
-        """Convert the table to the same type as Pandas based on the field type of the database.
+        dtypes = {c[0]: c[1] for c in columns}
+
+        def _splittable(c):
+            return dtypes.get(c, '').lower().startswith(('int', 'uint', 'datetime64'))
+
+        keys = [c for c in get_key_columns(self.conn, table_name)[:1] if _splittable(c)]
+        candidates = keys or [c[0] for c in columns if _splittable(c[0])]
+        if workers < 2 or not candidates:
+            return ['']
+
+        column = candidates[0]
+        lo, hi = get_column_range(self.conn, table_name, column, where, params)
+        if lo is None:
+            return ['']
+
+        is_datetime = dtypes[column].startswith('datetime64')
+        if is_datetime:
+            lo, hi = pandas.Timestamp(lo).value // 1000, pandas.Timestamp(hi).value // 1000  # microseconds
+        bounds = sorted(set(lo + (hi - lo + 1) * i // workers for i in range(workers + 1)))
+
+        def _literal(v):
+            return "'{}'".format(pandas.Timestamp(v * 1000).isoformat(sep=' ')) if is_datetime else str(v)
+
+        clauses = []
+        for i in range(len(bounds) - 1):
+            conditions = []
+            if i > 0:
+                conditions.append('{} >= {}'.format(column, _literal(bounds[i])))
+            if i < len(bounds) - 2:
+                conditions.append('{} < {}'.format(column, _literal(bounds[i + 1])))
+            clause = ' AND '.join(conditions)
+            if i == 0:
+                clause = '{} IS NULL OR {}'.format(column, clause) if clause else ''
+            clauses.append(clause)
+        return clauses
+
+    def __load_parallel(self, table_name: str, columns: List[Tuple], clauses: List[str],
+                        workers: int, params: Optional[dict] = None) -> pandas.DataFrame:
+        """Export the ranges concurrently over pooled connections and parse them in worker processes.
 
         Args:
-            df (pandas.DataFrame): The dataframe read from the csv file.
-            columns (List[Tuple]): A list of tuples.
+            table_name (str): Name of table in database.
+            columns (List[Tuple]): A list of tuples of the column name, its dtype and its select expression.
+            clauses (List[str]): The where clauses of the ranges, see `__make_clause`.
+            workers (int): The number of worker processes that parse the exported files.
+            params (dict): The values of the bound parameters of the clauses.
 
         Returns:
-            pandas.DataFrame: The converted dataframe.
+            pandas.DataFrame: The fragments concatenated in the order of the ranges.
+
+        Notes:
+            Each range is exported by its own connection, so the result is not one consistent
+            snapshot if the table is written meanwhile. The files of the ranges are removed at the end,
+            also when a range fails, once the other ranges have finished.
+        """
+
+        select_str = self.__make_select_str(columns)
+        paths = [self.__make_tmp_file_path(table_name) for _ in clauses]
+
+        def _export(i):
+            self.__exec_command(table_name, select_str, paths[i], clauses[i], self.__connect(), params)
+            return i
+
+        # The parsers are started before the exporters, and never forked from them.
+        parsers = make_process_pool(workers) if self.executor is None else contextlib.nullcontext(self.executor)
+        try:
+            with parsers as parser, ThreadPoolExecutor(len(clauses)) as exporter:
+                exports = [exporter.submit(contextvars.copy_context().run, _export, i) for i in range(len(clauses))]
+                parses = {}
+                for future in as_completed(exports):
+                    i = future.result()
+                    parses[i] = parser.submit(decode_csv, paths[i], columns)
+                with self.stats.phase('parse'):
+                    frames = [parses[i].result() for i in range(len(clauses))]
+        finally:
+            for path in paths:
+                self.manager.remove(path)
+
+        df = pandas.concat(frames, ignore_index=True)
+        self.stats.add(rows=len(df))
+        return df
+
+    def load_from_iter(self, table_name: str, chunksize: int = READ_CHUNK_ROWS, columns: Optional[List[str]] = None,
+                       where: Optional[str] = None, params: Optional[dict] = None, order_by: Optional[str] = None,
+                       limit: Optional[int] = None) -> Iterator[pandas.DataFrame]:
+        """Download the table as typed dataframes of bounded size.
+
+        The table schema is resolved once, the table is exported once, and the exported file
+        is parsed `chunksize` rows at a time while it is consumed, so memory stays constant
+        no matter how big the table is.
+
+        Args:
+            table_name (str): Name of table in database.
+            chunksize (int): The maximum number of rows of each dataframe.
+            columns, where, params, order_by, limit: See `load_from`.
+
+        Yields:
+            pandas.DataFrame: The next typed fragment of the table.
+
+        Notes:
+            Nothing is executed until the first fragment is requested. The exported file is
+            removed when the iteration finishes or the generator is closed.
         """
-        # Convert a null value to NaN.
-        df.replace('', np.nan, inplace=True)
 
-        for column, t in columns:
-            df[[column]] = df[[column]].astype(t)
+        # The caller may resume the generator in another thread, so it only runs as the call between yields.
+        with track(self, 'load_from_iter', table_name, scoped=False) as stats:
+            file_path = self.__make_tmp_file_path(table_name)
+            with running_call(self, stats):
+                columns = self.__get_columns(table_name, columns)
+                self.__exec_command(table_name, self.__make_select_str(columns), file_path,
+                                    self.__make_clause([where], order_by, limit), params=params)
+            try:
+                for df in self.manager.read_from_csv(file_path, columns, chunksize, stats):
+                    stats.add(rows=len(df))
+                    yield df
+            finally:
+                self.manager.remove(file_path)
+
+    def __load_incremental(self, table_name: str, columns: List[Tuple], column: str, is_batch: bool, workers: int,
+                           where: Optional[str], params: Optional[dict], state_dir: Optional[str]) -> pandas.DataFrame:
+        """Download the rows beyond the high-water mark of the local copy, and merge them into it.
+
+        Args:
+            table_name (str): Name of table in database.
+            columns (List[Tuple]): A list of tuples of the column name, its dtype and its select expression.
+            column (str): The watermark column, e.g. an auto-increment id or an update time.
+            is_batch, workers, where, params: See `load_from`.
+            state_dir (str): The directory of persistent local state, see `delta.get_state_dir`.
+
+        Returns:
+            pandas.DataFrame: The merged copy.
 
+        Notes:
+            With the primary key among the columns, rows at the mark are downloaded again and
+            replace the old ones, so that rows updated within the same second are not missed.
+            Otherwise the newer rows are just appended. Deleted rows are never noticed.
+        """
+
+        names = [c[0] for c in columns]
+        try:
+            if column not in names:
+                raise ValueError('The watermark column {} is not among the columns {}.'.format(column, names))
+            keys = get_key_columns(self.conn, table_name)
+            keys = keys if keys and set(keys).issubset(names) else None
+
+            query = (names, where, sorted((params or {}).items()), self.decimal)
+            cache = IncrementalCache(str(self.engine.url), table_name, column, query, state_dir)
+            old = cache.read()
+            if old is not None and list(old.columns) != names:
+                old = None  # The table has changed
+            mark = cache.get_mark(old)
+        except Exception as e:
+            # `__load` closes the connection otherwise.
+            self.conn.close()
+            raise e
+        if mark is not None:
+            condition = '{} {} :pd2ml_mark'.format(column, '>=' if keys else '>')
+            where = '({}) AND {}'.format(where, condition) if where else condition
+            params = dict(params or {}, pd2ml_mark=mark)
+
+        new = self.__load(table_name, columns, is_batch, workers, where, params)
+        df = cache.merge(old, new, keys)
+        cache.save(df)
         return df
 
-    def load_from(self, table_name: str, is_batch: bool = False) -> pandas.DataFrame:
+    def __load(self, table_name: str, columns: List[Tuple], is_batch: bool = False, workers: int = 1,
+               where: Optional[str] = None, params: Optional[dict] = None, order_by: Optional[str] = None,
+               limit: Optional[int] = None) -> pandas.DataFrame:
+        """Download the resolved columns, with `self.conn` open. See `load_from` for the arguments."""
+
+        if workers > 1 and order_by is None and limit is None:
+            try:
+                clauses = self.__make_partitions(table_name, columns, workers, where, params)
+            except Exception as e:
+                self.conn.close()
+                raise e
+            if len(clauses) > 1:
+                self.conn.close()
+                try:
+                    clauses = [self.__make_clause([where, c]) for c in clauses]
+                    return self.__load_parallel(table_name, columns, clauses, workers, params)
+                finally:
+                    if not is_batch:
+                        self.clear()
+
+        self.file_path = self.__make_tmp_file_path(table_name)
+
+        # NOTE
+        # The null value is written as '\N' in the csv file and parsed as NaN/NaT directly.
+
+        self.__exec_command(table_name, self.__make_select_str(columns), self.file_path,
+                            self.__make_clause([where], order_by, limit), params=params)
+        try:
+            df = self.manager.read_from_csv(self.file_path, columns, stats=self.stats)
+            self.stats.add(rows=len(df))
+            return df
+        finally:
+            if not is_batch:
+                self.clear()
+
+    def load_from(self, table_name: str, is_batch: bool = False, workers: int = 1,
+                  columns: Optional[List[str]] = None, where: Optional[str] = None, params: Optional[dict] = None,
+                  order_by: Optional[str] = None, limit: Optional[int] = None, incremental_on: Optional[str] = None,
+                  state_dir: Optional[str] = None) -> pandas.DataFrame:
         """Execute upload command and control the whole process.
 
         The main steps are as follows:
@@ -359,29 +1457,68 @@ class DownLoader:
             table_name (str): Name of table in database.
             is_batch (bool): If True, use with `with Loader(engine)` statement to batch.
             Otherwise, it represents a single execution.
+            workers (int): If greater than 1, split the table into ranges of its primary key
+                (or an integer/datetime column) and download them in parallel.
+                It is ignored with `order_by` or `limit`, which need a single export.
+            columns (List[str]): The columns to download, in this order. If None, all columns.
+            where (str): The condition of the rows to download, in which values are bound
+                by name, e.g. 'date = :date AND code IN :codes'.
+            params (dict): The values of the bound parameters of `where`, e.g. {'date': '2020-07-01'}.
+            order_by (str): The `ORDER BY` expressions, e.g. 'time DESC'.
+            limit (int): The maximum number of rows.
+            incremental_on (str): A column that only grows, e.g. an auto-increment id or an update time.
+                If given, the result is kept in a local copy (Feather, which needs `pyarrow`), and only
+                the rows beyond its maximum in the copy are downloaded next time and merged into it.
+                It can not be combined with `order_by` or `limit`.
+            state_dir (str): The directory of the local copies, see `delta.get_state_dir`.
 
         Returns:
-            pandas.DataFrame: The final target dataframe.
+            pandas.DataFrame: The final target dataframe. The statistics of the call are kept in `stats`.
+
+        Raises:
+            ValueError: If any of `columns` is not in the table, or `incremental_on` is not among them.
+
+        Notes:
+            `where` and `order_by` are inserted into the SQL as they are, only the values in
+            `params` are escaped.
         """
 
-        self.manager.mkdirs([self.dir, self.child_dir])
-        file_path = self.manager.format_path(os.path.join(self.child_dir, table_name + DownLoader.FILE_SUFFIX))
-        self.file_path = self.manager.get_no_confict_path(file_path)
-        columns = self.__get_columns(table_name)
-        cols = [c[0] for c in columns]
+        if incremental_on is not None and (order_by is not None or limit is not None):
+            raise ValueError('`incremental_on` can not be combined with `order_by` or `limit`.')
 
-        # NOTE
-        # Output a null value as a null character. `null` -> `''`
-        # By default the null value will be written as '\N' in the csv file.
+        with track(self, 'load_from', table_name):
+            return self.__load_from(table_name, is_batch, workers, columns, where, params, order_by, limit,
+                                    incremental_on, state_dir)
 
-        if_null_str = ','.join(map(lambda x: "IFNULL({0}, '') as {0}".format(x), cols))
-        self.__exec_command(table_name, if_null_str)
-        _df = self.manager.read_from_csv(self.file_path, cols)
+    def __load_from(self, table_name: str, is_batch: bool, workers: int, columns: Optional[List[str]],
+                    where: Optional[str], params: Optional[dict], order_by: Optional[str], limit: Optional[int],
+                    incremental_on: Optional[str], state_dir: Optional[str]) -> pandas.DataFrame:
+        """Resolve the columns and download them, see `load_from` for the arguments."""
 
-        if not is_batch:
-            self.clear()
+        columns = self.__get_columns(table_name, columns)
+        if incremental_on is not None:
+            return self.__load_incremental(table_name, columns, incremental_on, is_batch, workers, where, params,
+                                           state_dir)
+        if self.result_cache is None:
+            return self.__load(table_name, columns, is_batch, workers, where, params, order_by, limit)
 
-        return self.__convert_type(_df, columns)
+        # The version is read before the download, so a change meanwhile only makes the next hit a miss.
+        key = (str(self.engine.url), table_name, columns, where, sorted((params or {}).items()), order_by, limit)
+        try:
+            with self.stats.phase('cache'):
+                version = self.result_cache.get_version(self.conn, table_name)
+                df = self.result_cache.get(key, version)
+        except Exception as e:
+            self.conn.close()
+            raise e
+        if df is not None:
+            self.conn.close()
+            # Strings may come back as the string dtype of `pyarrow`
+            changed = {c[0]: c[1] for c in columns if str(df[c[0]].dtype) != c[1]}
+            return df.astype(changed) if changed else df
+        df = self.__load(table_name, columns, is_batch, workers, where, params, order_by, limit)
+        self.result_cache.put(key, version, df)
+        return df
 
     def clear(self):
         """Clear temporary folders."""
@@ -414,21 +1551,65 @@ class Loader(ILoader):
         https://dev.mysql.com/doc/refman/5.7/en/innodb-buffer-pool-resize.html
     """
 
-    def __init__(self, engine: sqlalchemy.engine = None) -> None:
-        """It's made up of two instances of class `UpLoader` and `DownLoader`."""
+    def __init__(self, engine: sqlalchemy.engine = None, fast_load: bool = False,
+                 disable_binlog: bool = False, result_cache: Optional[ResultCache] = None,
+                 hooks: Optional[List[Callable]] = None, batch_workers: int = 1, table_workers: int = 1,
+                 schema_cache: Optional[SchemaCache] = None, decimal: str = DECIMAL_MODE) -> None:
+        """It's made up of two instances of class `UpLoader` and `DownLoader`.
+        See `UpLoader` for `fast_load`, `disable_binlog`, `hooks`, `batch_workers` and `table_workers`,
+        and `DownLoader` for `result_cache`, `schema_cache` and `decimal`.
+        The statistics of the last `load_to` or `load_from` are kept in `stats`."""
 
-        self.__up_loader = UpLoader(engine)
-        self.__down_loader = DownLoader(engine)
+        self.__up_loader = UpLoader(engine, fast_load, disable_binlog, hooks=hooks, batch_workers=batch_workers,
+                                    table_workers=table_workers)
+        self.__down_loader = DownLoader(engine, schema_cache, decimal, result_cache=result_cache, hooks=hooks)
+        self.stats = None
 
-    def load_to(self, df: pandas.DataFrame, table_name: str) -> None:
-        """The single upload to database."""
+    def load_to(self, df: pandas.DataFrame, table_name: str, **kwargs) -> None:
+        """The single upload to database. See `UpLoader.load_to` for the keyword arguments."""
 
-        self.__up_loader.load_to(df, table_name)
+        try:
+            self.__up_loader.load_to(df, table_name, **kwargs)
+        finally:
+            self.stats = self.__up_loader.stats
 
-    def load_from(self, table_name: str) -> pandas.DataFrame:
-        """The single download from database."""
+    def load_iter(self, chunks: Iterable[pandas.DataFrame], table_name: str, **kwargs) -> None:
+        """The upload of an iterable of dataframes, see `UpLoader.load_iter`."""
 
-        return self.__down_loader.load_from(table_name)
+        try:
+            self.__up_loader.load_iter(chunks, table_name, **kwargs)
+        finally:
+            self.stats = self.__up_loader.stats
+
+    def load_file(self, path: str, table_name: str, **kwargs) -> None:
+        """The upload of a csv or Parquet file, see `UpLoader.load_file`."""
+
+        try:
+            self.__up_loader.load_file(path, table_name, **kwargs)
+        finally:
+            self.stats = self.__up_loader.stats
+
+    def load_from(self, table_name: str, **kwargs) -> pandas.DataFrame:
+        """The single download from database. See `DownLoader.load_from` for the keyword arguments."""
+
+        try:
+            return self.__down_loader.load_from(table_name, **kwargs)
+        finally:
+            self.stats = self.__down_loader.stats
+
+    def load_from_iter(self, table_name: str, chunksize: int = READ_CHUNK_ROWS,
+                       **kwargs) -> Iterator[pandas.DataFrame]:
+        """The chunked download from database, see `DownLoader.load_from_iter`."""
+
+        return self.__down_loader.load_from_iter(table_name, chunksize, **kwargs)
+
+    def resume(self) -> None:
+        """Load the files of a failed batch upload that were not loaded, see `UpLoader.resume`."""
+
+        try:
+            self.__up_loader.resume()
+        finally:
+            self.stats = self.__up_loader.stats
 
     def batch_load_to(self, df, table_name):
         """Batch uploading is to write the large dataframe into small dataframes
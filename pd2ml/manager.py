@@ -3,36 +3,205 @@
 """
 
 import os
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 import shutil
+import tempfile
 import threading
+import time
+import uuid
 import sys
 import platform
-import csv
 import pandas
 import pickle
+from .codec import encode_frame, decode_csv
+from .common import UPLOAD_DIR_PREFIX, DOWNLOAD_DIR_PREFIX, SPOOL_DIR_ENV, SPOOL_STALE_SECONDS, \
+    SPOOL_JOURNAL_STALE_SECONDS, UNIQUE_SEP, TRASH_SUFFIX, COLUMNS_FILENAME, JOURNAL_FILENAME
 
-__all__ = ['UpLoadManger', 'DownLoadManager']
+__all__ = ['UpLoadManger', 'DownLoadManager', 'SpoolManager', 'SPOOL']
+
+
+class SpoolManager:
+    """This class manages the root directory of all temporary folders, shared by the whole process.
+
+    It provides:
+    1. A configurable root, e.g. a tmpfs such as '/dev/shm', see `get_root`;
+    2. A soft budget of bytes on disk, which producers wait for before spooling more;
+    3. Removal of folders in a background thread;
+    4. A sweep of the folders left by crashed processes, once per process.
+    """
+
+    def __init__(self, root: Optional[str] = None, budget: Optional[int] = None):
+        """
+        Args:
+            root (str): The root directory. If None, see `get_root`.
+            budget (int): The maximum number of bytes spooled at a time. If None, it is unlimited.
+        """
+
+        self.root = root
+        self.budget = budget
+        self.__used = 0
+        self.__cond = threading.Condition()
+        self.__swept = False
+
+    def set_root(self, root: Optional[str]) -> None:
+        """Set the root directory, e.g. '/dev/shm'. None restores the default."""
+
+        self.root = root
+        self.__swept = False
+
+    def set_budget(self, budget: Optional[int]) -> None:
+        """Set the maximum number of bytes spooled at a time. None means unlimited.
+
+        Only the chunks of parallel uploads (`load_to` with `workers`) are counted and wait for it.
+        The files of batch uploads, streams and downloads are not.
+        """
+
+        with self.__cond:
+            self.budget = budget
+            self.__cond.notify_all()
+
+    def get_root(self) -> str:
+        """Get the root directory.
+
+        In order of precedence: the configured root, the environment variable `PD2ML_SPOOL_DIR`,
+        the directory of the running script if it is a writable file system, or the system
+        temporary directory (e.g. under `python -c`, notebooks or read-only images).
+
+        Notes:
+            `DownLoader` needs the root to be writable by the MySQL server as well.
+        """
+
+        root = self.root or os.environ.get(SPOOL_DIR_ENV)
+        if not root:
+            script = sys.argv[0] if sys.argv else ''
+            parent = os.path.dirname(os.path.abspath(script))
+            root = parent if os.path.isfile(script) and os.access(parent, os.W_OK) else tempfile.gettempdir()
+        if not self.__swept:
+            self.__swept = True
+            self.sweep(root)
+        return root
+
+    def acquire(self, nbytes: int) -> None:
+        """Block while `nbytes` more would exceed the budget, and then account for them.
+
+        Both happen under one lock, so that producers that wait at the same time can not all pass
+        before any of them has accounted for its bytes.
+
+        Args:
+            nbytes (int): The bytes about to be spooled, e.g. an estimate that is corrected by
+                `reserve` or `release` once the file is written.
+
+        Notes:
+            It never blocks when nothing is spooled, so that a single file larger than the budget
+            can still go through.
+        """
+
+        with self.__cond:
+            self.__cond.wait_for(lambda: self.budget is None or self.__used == 0 or
+                                 self.__used + nbytes <= self.budget)
+            self.__used += nbytes
+
+    def reserve(self, nbytes: int) -> None:
+        """Account for bytes that have been spooled."""
+
+        with self.__cond:
+            self.__used += nbytes
+
+    def release(self, nbytes: int) -> None:
+        """Account for bytes that have been removed, and wake up the producers waiting for space."""
+
+        with self.__cond:
+            self.__used = max(self.__used - nbytes, 0)
+            self.__cond.notify_all()
+
+    def remove_tree(self, path: str) -> None:
+        """Remove a directory in the background.
+
+        The directory is renamed first, which is atomic, so that the same path can be reused at once.
+        A renamed directory that is never removed, e.g. because the process exits, is removed by the next sweep.
+        """
+
+        trash = '{}{}{}'.format(path, TRASH_SUFFIX, uuid.uuid4().hex[:8])
+        try:
+            os.rename(path, trash)
+        except FileNotFoundError:
+            return
+        except OSError:
+            trash = path
+        threading.Thread(target=shutil.rmtree, args=(trash, True), daemon=True).start()
+
+    def sweep(self, root: str) -> None:
+        """Remove the temporary folders of crashed processes under the root.
+
+        A folder is stale if it is a renamed folder waiting to be removed, or if it has not been
+        modified for `SPOOL_STALE_SECONDS` and none of the processes that wrote into it is alive.
+        Upload folders with a journal, left by a failed `execute`, are kept for `UpLoader.resume`
+        for `SPOOL_JOURNAL_STALE_SECONDS` instead, so that a batch that is never resumed does not
+        keep its files forever.
+        """
+
+        try:
+            names = os.listdir(root)
+        except OSError:
+            return
+        now = time.time()
+        for name in names:
+            if not name.startswith((UPLOAD_DIR_PREFIX, DOWNLOAD_DIR_PREFIX)):
+                continue
+            path = os.path.join(root, name)
+            try:
+                expiry = SPOOL_JOURNAL_STALE_SECONDS if os.path.exists(os.path.join(path, JOURNAL_FILENAME)) \
+                    else SPOOL_STALE_SECONDS
+                stale = TRASH_SUFFIX in name or (now - os.path.getmtime(path) > expiry and
+                                                 not any(_pid_alive(c.split('_')[0]) for c in os.listdir(path)
+                                                         if not c.startswith(COLUMNS_FILENAME) and
+                                                         c != JOURNAL_FILENAME))
+            except OSError:
+                continue
+            if stale:
+                shutil.rmtree(path, ignore_errors=True)
+
+
+def _pid_alive(pid: str) -> bool:
+    """Whether the process is alive. Anything that is not a pid, or any doubt, counts as alive."""
+
+    if not pid.isdigit():
+        return True
+    if platform.system() == 'Windows':
+        return True  # `os.kill` would terminate the process on Windows
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+SPOOL = SpoolManager()  # The spool of the whole process
 
 
 class FileManager:
     """This class is to manage files during upload and download."""
 
+    spool = SPOOL
+
     def get_current_argv(self) -> str:
         """Get the path to the currently running script."""
 
-        return sys.argv[0]
+        return sys.argv[0] if sys.argv else ''
 
     def get_parent_dir(self) -> str:
-        """Get the directory path of the currently running script."""
+        """Get the directory of temporary folders, see `SpoolManager.get_root`."""
 
-        return os.path.dirname(self.get_current_argv())
+        return self.spool.get_root()
 
     def get_current_name(self):
-        """Get the file name of the currently running script."""
+        """Get the file name of the currently running script, or 'pd2ml' if it is not a script file."""
 
-        return os.path.splitext(os.path.basename(self.get_current_argv()))[0]
+        argv = self.get_current_argv()
+        return os.path.splitext(os.path.basename(argv))[0] if os.path.isfile(argv) else 'pd2ml'
 
     def get_dir(self, prefix: str) -> str:
         """Get the temporary directory path."""
@@ -56,9 +225,11 @@ class FileManager:
         Examples:
             >>> FileManager().get_table_name('/tmp/loader/stock.csv')
             'stock'
+            >>> FileManager().get_table_name('/tmp/loader/stock@3f2a9c1b.csv')
+            'stock'
         """
 
-        return os.path.splitext(os.path.basename(path))[0]
+        return os.path.splitext(os.path.basename(path))[0].split(UNIQUE_SEP)[0]
 
     def get_terminate(self) -> str:
         """Get line breaks depending on the system."""
@@ -71,20 +242,28 @@ class FileManager:
         for d in dirs:
             if not os.path.exists(d):
                 try:
-                    os.mkdir(d)
+                    os.makedirs(d, exist_ok=True)
                 except:
                     pass
 
     def clear(self, dirs: List[str]) -> None:
-        """Clear directories."""
+        """Clear directories, in the background."""
 
         for d in dirs:
             if os.path.exists(d):
                 try:
-                    shutil.rmtree(d)
+                    self.spool.remove_tree(d)
                 except Exception as e:
                     print(e)
 
+    def remove(self, path: str) -> None:
+        """Remove a file if it exists."""
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
     def format_path(self, path: str) -> str:
         """Format the paths uniformly to the Linux style.
 
@@ -95,29 +274,80 @@ class FileManager:
 
         return Path(path).as_posix()
 
-    def get_no_confict_path(self, path: str) -> str:
-        """If a file already exists, add '.1' to the end of the file name
-        until there is no conflict."""
+    def get_unique_path(self, path: str) -> str:
+        """Add a unique token to the file name, so that concurrent calls never share a file.
 
-        while os.path.exists(path):
-            path = path + '.1'
-        return path
+        Examples:
+            >>> FileManager().get_unique_path('/tmp/loader/stock.csv')  # doctest: +SKIP
+            '/tmp/loader/stock@3f2a9c1b0d4e.csv'
+        """
+
+        root, ext = os.path.splitext(path)
+        return '{}{}{}{}'.format(root, UNIQUE_SEP, uuid.uuid4().hex[:12], ext)
 
 
 class UpLoadManger(FileManager):
     """The Class that specifically deal with details of `UpLoader`."""
 
-    def write_to_csv(self, name: str, df: pandas.DataFrame) -> None:
+    def write_to_csv(self, name: str, df: pandas.DataFrame, float_precision: Optional[int] = None,
+                     stats=None) -> None:
         """Write the dataframe into a csv file.
 
         Args:
             name (str): Name of csv file.
             df (pandas.DataFrame): The dataframe to be written.
+            float_precision (int): Number of decimals of floats. If None, use the shortest repr that round-trips.
+            stats (LoadStats): If given, the time of encoding and writing is added to it.
+
+        Notes:
+            The dataframe is encoded column by column, and NaN/NaT are written as `\\N`,
+            which `LOAD DATA` reads as NULL directly.
         """
 
-        with open(name, 'a+', newline='', encoding='utf-8') as f:
-            csv_writer = csv.writer(f)
-            csv_writer.writerows(df.values.tolist())
+        with open(name, 'a', newline='', encoding='utf-8') as f:
+            encode_frame(df, f, self.get_terminate(), float_precision, stats=stats)
+
+    def write_chunks_to_csv(self, name: str, chunks: Iterable[pandas.DataFrame],
+                            float_precision: Optional[int] = None, stats=None) -> int:
+        """Write the dataframes one after another into a csv file, which is opened only once,
+        e.g. a named pipe whose reader would stop at the first close.
+
+        Args:
+            name (str): Name of csv file.
+            chunks (Iterable[pandas.DataFrame]): The dataframes, all of the same columns.
+            float_precision (int): Number of decimals of floats, see `write_to_csv`.
+            stats (LoadStats): If given, the time of encoding and writing is added to it.
+
+        Returns:
+            int: The number of rows written.
+        """
+
+        rows = 0
+        with open(name, 'a', newline='', encoding='utf-8') as f:
+            for df in chunks:
+                rows += encode_frame(df, f, self.get_terminate(), float_precision, stats=stats)
+        return rows
+
+    def can_stream(self) -> bool:
+        """Whether named pipes are supported on this system."""
+
+        return hasattr(os, 'mkfifo')
+
+    def make_fifo(self, path: str) -> None:
+        """Create a named pipe, replacing anything left at the path."""
+
+        if os.path.exists(path):
+            os.remove(path)
+        os.mkfifo(path)
+
+    def release_fifo(self, path: str) -> None:
+        """Open and close the read end of a named pipe once,
+        so that a writer blocked in opening it can go on (and then fail with `BrokenPipeError`)."""
+
+        try:
+            os.close(os.open(path, os.O_RDONLY | os.O_NONBLOCK))
+        except OSError:
+            pass
 
     def pickle_to(self, path: str, s: str) -> None:
         """Write into disk by pickle."""
@@ -136,20 +366,18 @@ class UpLoadManger(FileManager):
 class DownLoadManager(FileManager):
     """The Class that specifically deal with details of `DownLoader`."""
 
-    def read_from_csv(self, path: str, columns: List[str]) -> pandas.DataFrame:
-        """Read from the file and create the dataframe.
+    def read_from_csv(self, path: str, columns: List[Tuple], chunksize: Optional[int] = None, stats=None) \
+            -> Union[pandas.DataFrame, Iterator[pandas.DataFrame]]:
+        """Read from the file and create the typed dataframe.
 
         Args:
             path (str): Path to file.
-            columns (list): List that contains names of columns.
+            columns (List[Tuple]): A list of tuples of the column name, its dtype and its select expression.
+            chunksize (int): If given, read the file as an iterator of dataframes of at most `chunksize` rows.
+            stats (LoadStats): If given, the time of parsing and converting is added to it.
 
         Returns:
-            pandas.DataFrame: The created dataframe from a csv file.
+            pandas.DataFrame or iterator: The created dataframe from a csv file.
         """
 
-        rows = []
-        with open(path, encoding='utf-8') as f:
-            csv_reader = csv.reader(f)
-            for row in csv_reader:
-                rows.append(row)
-        return pandas.DataFrame(rows, columns=columns)
+        return decode_csv(path, columns, chunksize, stats)
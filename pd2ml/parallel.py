@@ -0,0 +1,104 @@
+# coding=utf-8
+"""parallel.py - The loader that encodes in a pool of worker processes, fed through shared memory.
+"""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+import sqlalchemy
+import pandas
+from .common import UPLOAD_CHUNK_ROWS, DECIMAL_MODE
+from .interface import ILoader
+from .loader import UpLoader, DownLoader, make_process_pool
+from .cache import ResultCache
+from .schema import SchemaCache
+
+__all__ = ['ParallelLoader']
+
+
+class ParallelLoader(ILoader):
+    """The implementation class of the interface `ILoader` for large dataframes on many cores.
+
+    It replaces splitting a dataframe and uploading the fragments in a `multiprocessing.Pool`, where
+    every fragment is pickled and copied to a worker only to be encoded there. Instead the columns are
+    copied once into shared memory, see `shared.SharedFrame`, the workers encode ranges of rows from there,
+    and the files are loaded over `workers` sessions as soon as they are encoded. The worker processes are
+    started once and kept for all uploads and downloads until `close`.
+
+    Examples:
+        >>> with ParallelLoader(engine, workers=8) as loader:  # doctest: +SKIP
+        ...     loader.load_to(df, 'stock')
+        ...     df = loader.load_from('stock')
+    """
+
+    def __init__(self, engine: sqlalchemy.engine = None, workers: Optional[int] = None,
+                 chunk_rows: int = UPLOAD_CHUNK_ROWS, fast_load: bool = False, disable_binlog: bool = False,
+                 result_cache: Optional[ResultCache] = None, hooks: Optional[List[Callable]] = None,
+                 schema_cache: Optional[SchemaCache] = None, decimal: str = DECIMAL_MODE):
+        """
+        Args:
+            engine (sqlalchemy.base.Engine): engine instance by `create_engine` function.
+                Its pool should hold at least `workers` connections, see `session.make_engine`.
+            workers (int): The number of worker processes and of concurrent connections,
+                the number of CPUs by default.
+            chunk_rows (int): The number of rows of each chunk.
+            fast_load, disable_binlog, hooks: See `UpLoader`.
+            result_cache, schema_cache, decimal: See `DownLoader`.
+        """
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.__executor = make_process_pool(self.workers)
+        self.__up_loader = UpLoader(engine, fast_load, disable_binlog, hooks=hooks, executor=self.__executor)
+        self.__down_loader = DownLoader(engine, schema_cache, decimal, result_cache=result_cache, hooks=hooks,
+                                        executor=self.__executor)
+        self.stats = None
+
+    def load_to(self, df: pandas.DataFrame, table_name: str, **kwargs) -> None:
+        """Upload the dataframe in parallel. See `UpLoader.load_to` for the keyword arguments.
+
+        If a worker process dies, e.g. killed for lack of memory, the call fails with `BrokenProcessPool`,
+        the shared memory is removed, and a new pool of workers is started for the next call.
+        """
+
+        kwargs.setdefault('workers', self.workers)
+        kwargs.setdefault('chunk_rows', self.chunk_rows)
+        try:
+            self.__up_loader.load_to(df, table_name, **kwargs)
+        except BrokenProcessPool as e:
+            self.__renew_pool()
+            raise e
+        finally:
+            self.stats = self.__up_loader.stats
+
+    def load_from(self, table_name: str, **kwargs) -> pandas.DataFrame:
+        """Download the table in parallel, parsing in the same worker processes.
+        See `DownLoader.load_from` for the keyword arguments."""
+
+        kwargs.setdefault('workers', self.workers)
+        try:
+            return self.__down_loader.load_from(table_name, **kwargs)
+        except BrokenProcessPool as e:
+            self.__renew_pool()
+            raise e
+        finally:
+            self.stats = self.__down_loader.stats
+
+    def __renew_pool(self) -> None:
+        """Replace a pool whose worker died with a new one."""
+
+        self.__executor.shutdown(wait=False)
+        self.__executor = self.__up_loader.executor = self.__down_loader.executor = make_process_pool(self.workers)
+
+    def close(self) -> None:
+        """Stop the worker processes and clear the temporary folders."""
+
+        self.__executor.shutdown()
+        self.__up_loader.clear()
+        self.__down_loader.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
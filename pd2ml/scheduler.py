@@ -0,0 +1,69 @@
+# coding=utf-8
+"""scheduler.py - Plans the spooled files of a batch upload into lanes that load concurrently.
+"""
+
+import heapq
+from typing import Dict, List, Tuple
+
+__all__ = ['balance', 'plan_lanes']
+
+
+def balance(files: List[Tuple[str, int]], lanes: int) -> List[List[str]]:
+    """Distribute files into lanes of about equal total size, each lane in the order of `files`.
+
+    Largest files first, each file goes to the lane with the smallest total so far (the LPT rule),
+    which keeps the largest lane within 4/3 of the best possible one. Within a lane the files keep
+    their order, so a single lane is `files` itself.
+
+    Args:
+        files (List[Tuple[str, int]]): The paths of the files, in the order to load them, and their sizes in bytes.
+        lanes (int): The maximum number of lanes.
+
+    Returns:
+        list: The non-empty lanes, each a list of paths.
+
+    Examples:
+        >>> balance([('a', 1), ('b', 5), ('c', 4)], 2)
+        [['b'], ['a', 'c']]
+        >>> balance([('a', 1), ('b', 5), ('c', 4)], 1)
+        [['a', 'b', 'c']]
+    """
+
+    heap = [(0, i, []) for i in range(max(1, min(lanes, len(files))))]
+    for index, (path, size) in sorted(enumerate(files), key=lambda f: (-f[1][1], f[0])):
+        total, i, lane = heapq.heappop(heap)
+        lane.append((index, path))
+        heapq.heappush(heap, (total + size, i, lane))
+    return [[path for _, path in sorted(lane)] for _, _, lane in sorted(heap, key=lambda h: h[1]) if lane]
+
+
+def plan_lanes(files: Dict[str, List[Tuple[str, int]]], table_workers: int) -> List[List[str]]:
+    """Plan the files of several tables into lanes, so that tables load concurrently.
+
+    The files of each table are balanced into at most `table_workers` lanes, so that no more than
+    `table_workers` of them load into the same table at once, and the lanes of all tables are
+    ordered by size, largest first, so that a pool of workers that takes them in order finishes
+    them at about the same time. With `table_workers` of 1, every table has one lane that loads
+    its files in the given order; above 1, files of the same table in different lanes load in any order.
+
+    Args:
+        files (Dict[str, List[Tuple[str, int]]]): The paths and sizes of the files of each table,
+            in the order to load them.
+        table_workers (int): The maximum number of files that load into one table at once.
+
+    Returns:
+        list: The lanes, each a list of paths of one table that load one after another.
+
+    Examples:
+        >>> plan_lanes({'stock': [('s1', 6), ('s2', 8)], 'fund': [('f1', 9)]}, 1)
+        [['s1', 's2'], ['f1']]
+        >>> plan_lanes({'stock': [('s1', 6), ('s2', 8)], 'fund': [('f1', 9)]}, 2)
+        [['f1'], ['s2'], ['s1']]
+    """
+
+    lanes = []
+    for table_files in files.values():
+        sizes = dict(table_files)
+        for lane in balance(table_files, table_workers):
+            lanes.append((sum(sizes[p] for p in lane), lane))
+    return [lane for _, lane in sorted(lanes, key=lambda l: -l[0])]
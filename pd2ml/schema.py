@@ -0,0 +1,179 @@
+# coding=utf-8
+"""schema.py - Queries about the metadata of tables in database.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import text
+from typing import Any, List, Optional, Tuple
+from .common import KEYS_COMMAND, RANGE_COMMAND, COLUMNS_COMMAND, TABLE_VERSION_COMMAND, CHECKSUM_COMMAND, \
+    SCHEMA_CACHE_TTL, SCHEMA_CACHE_SIZE
+
+__all__ = ['get_key_columns', 'get_unique_keys', 'get_column_range', 'get_table_version', 'SchemaCache', 'SCHEMA_CACHE']
+
+
+def get_key_columns(conn, table_name: str, key_name: str = 'PRIMARY') -> List[str]:
+    """Get the columns of an index of the table, in the order of the index.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): An open connection.
+        table_name (str): Name of table in database.
+        key_name (str): Name of the index. The primary key is named 'PRIMARY'.
+
+    Returns:
+        list: The column names, or an empty list if there is no such index.
+    """
+
+    rows = conn.execute(text(KEYS_COMMAND.format(table_name)))
+    # Columns of `SHOW KEYS`: Table, Non_unique, Key_name, Seq_in_index, Column_name, ...
+    keys = sorted((row[3], row[4]) for row in rows if row[2] == key_name)
+    return [column for _, column in keys]
+
+
+def get_unique_keys(conn, table_name: str) -> 'OrderedDict[str, List[str]]':
+    """Get the columns of every unique index of the table, the primary key first.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): An open connection.
+        table_name (str): Name of table in database.
+
+    Returns:
+        OrderedDict: The names of the indexes and their columns in the order of the index,
+        e.g. OrderedDict([('PRIMARY', ['code', 'time']), ('uk_isin', ['isin', 'time'])]).
+        Indexes on expressions, whose `Column_name` is NULL, are left out.
+    """
+
+    rows = conn.execute(text(KEYS_COMMAND.format(table_name)))
+    # Columns of `SHOW KEYS`: Table, Non_unique, Key_name, Seq_in_index, Column_name, ...
+    keys = OrderedDict()
+    for row in rows:
+        if int(row[1]) == 0:
+            keys.setdefault(row[2], []).append((row[3], row[4]))
+    return OrderedDict((name, [column for _, column in sorted(keys[name])])
+                       for name in sorted(keys, key=lambda k: k != 'PRIMARY')
+                       if all(column is not None for _, column in keys[name]))
+
+
+def get_column_range(conn, table_name: str, column: str, where: Optional[str] = None,
+                     params: Optional[dict] = None) -> Tuple[Any, Any]:
+    """Get the minimum and the maximum of a column.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): An open connection.
+        table_name (str): Name of table in database.
+        column (str): Name of the column.
+        where (str): An optional condition of the rows, with parameters bound by name.
+        params (dict): The values of the bound parameters of `where`.
+
+    Returns:
+        tuple: `(min, max)`, both of which are None for an empty table.
+    """
+
+    where_str = ' WHERE ' + where if where else ''
+    row = conn.execute(text(RANGE_COMMAND.format(column, table_name, where_str)), params or {}).fetchone()
+    return row[0], row[1]
+
+
+def get_table_version(conn, table_name: str, validate: str = 'information_schema') -> Any:
+    """Get a cheap fingerprint of the table, which changes when the table changes.
+
+    Args:
+        conn (sqlalchemy.engine.Connection): An open connection.
+        table_name (str): Name of table in database, optionally qualified by the database name.
+        validate (str): 'information_schema' to read `CREATE_TIME` and `UPDATE_TIME` from
+            `information_schema.TABLES`, or 'checksum' to run `CHECKSUM TABLE`.
+
+    Returns:
+        The fingerprint, which is only meant to be compared for equality.
+
+    Raises:
+        ValueError: If `validate` is unknown.
+    """
+
+    if validate == 'information_schema':
+        schema, _, name = table_name.rpartition('.')
+        row = conn.execute(text(TABLE_VERSION_COMMAND.format('DATABASE()' if not schema else ':schema')),
+                           {'schema': schema, 'name': name}).fetchone()
+        return tuple(row) if row is not None else None
+    if validate == 'checksum':
+        row = conn.execute(text(CHECKSUM_COMMAND.format(table_name))).fetchone()
+        return row[1] if row is not None else None
+    raise ValueError("`validate` should be 'information_schema' or 'checksum', not {!r}.".format(validate))
+
+
+class SchemaCache:
+    """A thread-safe cache of the `SHOW COLUMNS` rows of tables, keyed by (engine URL, table name).
+
+    Entries expire after `ttl` seconds and the least recently used ones are evicted beyond `max_entries`.
+    If `validate` is set, an unexpired entry is only used after a cheap fingerprint of the table
+    (see `get_table_version`) has been compared with the one stored along with it.
+    """
+
+    def __init__(self, ttl: float = SCHEMA_CACHE_TTL, max_entries: int = SCHEMA_CACHE_SIZE,
+                 validate: Optional[str] = None):
+        """
+        Args:
+            ttl (float): Seconds an entry lives. 0 disables the cache.
+            max_entries (int): The maximum number of entries.
+            validate (str): None, 'information_schema' or 'checksum'.
+        """
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.validate = validate
+        self.__entries = OrderedDict()  # key -> (rows, version, expires_at)
+        self.__lock = threading.Lock()
+
+    def get_columns(self, conn, table_name: str) -> List[Tuple]:
+        """Get the `SHOW COLUMNS` rows of the table, from the cache if it is still fresh.
+
+        Args:
+            conn (sqlalchemy.engine.Connection): An open connection, which is used on a miss.
+            table_name (str): Name of table in database.
+
+        Returns:
+            list: A list of tuples `(Field, Type, Null, Key, Default, Extra)`.
+        """
+
+        key = (str(conn.engine.url), table_name)
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry[2] <= now:
+                del self.__entries[key]
+                entry = None
+
+        version = None
+        if self.validate is not None and self.ttl > 0:
+            version = get_table_version(conn, table_name, self.validate)
+        if entry is not None and entry[1] == version:
+            with self.__lock:
+                if key in self.__entries:
+                    self.__entries.move_to_end(key)
+            return entry[0]
+
+        rows = [tuple(row) for row in conn.execute(text(COLUMNS_COMMAND.format(table_name)))]
+        if self.ttl > 0:
+            with self.__lock:
+                self.__entries[key] = (rows, version, now + self.ttl)
+                self.__entries.move_to_end(key)
+                while len(self.__entries) > self.max_entries:
+                    self.__entries.popitem(last=False)
+        return rows
+
+    def invalidate(self, url: Optional[str] = None, table_name: Optional[str] = None) -> None:
+        """Drop the entries of an engine URL and/or a table, or all entries if both are None.
+
+        Args:
+            url (str): The engine URL, i.e. `str(engine.url)`.
+            table_name (str): Name of table in database.
+        """
+
+        with self.__lock:
+            for key in list(self.__entries):
+                if (url is None or key[0] == url) and (table_name is None or key[1] == table_name):
+                    del self.__entries[key]
+
+
+SCHEMA_CACHE = SchemaCache()  # A cache that `DownLoader` instances can share, which none uses by default
@@ -0,0 +1,154 @@
+# coding=utf-8
+"""shared.py - Hands the columns of a dataframe to worker processes through shared memory, without pickling them.
+"""
+
+import numpy as np
+import pandas
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+from .codec import encode_frame
+
+__all__ = ['SharedFrame', 'encode_shared']
+
+_ALIGN = 64  # Byte alignment of each buffer in the segment
+
+
+def _get_buffers(s: pandas.Series) -> Optional[Tuple[np.ndarray, Optional[np.ndarray]]]:
+    """Get the values and the NULL mask of a column that can be placed in shared memory, or None if it can not.
+
+    Numbers, booleans and naive datetimes of numpy dtypes are placed as they are, and the nullable
+    dtypes ('Int64', 'Float64', 'boolean', ...) as their values and their mask. Other columns, e.g. strings,
+    categories or datetimes with time zones, are sent to the workers by pickling.
+    """
+
+    if isinstance(s.dtype, np.dtype):
+        return (s.to_numpy(), None) if s.dtype.kind in 'iufbmM' else None
+    if isinstance(s.array, (pandas.arrays.IntegerArray, pandas.arrays.FloatingArray, pandas.arrays.BooleanArray)):
+        return s.array._data, s.array._mask
+    return None
+
+
+class SharedFrame:
+    """The columns of a dataframe, copied once into one segment of shared memory.
+
+    Worker processes attach to the segment with `encode_shared` and view ranges of rows without
+    copying them, so that a chunk costs a few bytes of pickling instead of its size. The segment is
+    removed by `close`, or at the end of the `with` block, also when a worker fails or dies. If the
+    owning process is killed, the resource tracker of `multiprocessing` removes it.
+
+    Examples:
+        >>> with SharedFrame(df) as frame:  # doctest: +SKIP
+        ...     executor.submit(encode_shared, frame.get_task(0, 100000), 'stock@0.csv').result()
+    """
+
+    def __init__(self, df: pandas.DataFrame):
+        """
+        Args:
+            df (pandas.DataFrame): The dataframe, which is not modified.
+        """
+
+        self.__df = df
+        layout, buffers, size = [], [], 0
+        for i in range(df.shape[1]):
+            found = _get_buffers(df.iloc[:, i])
+            if found is None:
+                layout.append((df.columns[i], None, -1, -1))
+                continue
+            values, mask = found
+            offsets = []
+            for buffer in (values, mask):
+                if buffer is None:
+                    offsets.append(-1)
+                    continue
+                size = -(-size // _ALIGN) * _ALIGN
+                offsets.append(size)
+                buffers.append((size, np.ascontiguousarray(buffer)))
+                size += buffer.nbytes
+            layout.append((df.columns[i], str(df.dtypes.iloc[i]), offsets[0], offsets[1]))
+
+        self.__shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            for offset, buffer in buffers:
+                np.ndarray(buffer.shape, buffer.dtype, self.__shm.buf, offset)[:] = buffer
+        except Exception as e:
+            self.close()
+            raise e
+        self.__pickled = [i for i, c in enumerate(layout) if c[1] is None]
+        self.spec = {'name': self.__shm.name, 'rows': len(df), 'columns': layout}
+
+    def get_task(self, start: int, stop: int) -> tuple:
+        """Get the picklable description of the rows in `[start, stop)`, see `encode_shared`.
+
+        Columns that are not in shared memory are sliced and included.
+        """
+
+        pickled = self.__df.iloc[start:stop, self.__pickled] if self.__pickled else None
+        return self.spec, start, stop, pickled
+
+    def close(self) -> None:
+        """Remove the segment. It can be called more than once."""
+
+        if self.__shm is None:
+            return
+        shm, self.__shm = self.__shm, None
+        try:
+            shm.close()
+        finally:
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _attach(shm: shared_memory.SharedMemory, spec: dict, start: int, stop: int,
+            pickled: Optional[pandas.DataFrame]) -> pandas.DataFrame:
+    """View the rows in `[start, stop)` of the segment as a dataframe, without copying them."""
+
+    rows = spec['rows']
+    data, j = {}, 0
+    for i, (name, dtype, offset, mask_offset) in enumerate(spec['columns']):
+        if dtype is None:
+            data[i] = pickled.iloc[:, j].reset_index(drop=True)
+            j += 1
+            continue
+        dtype = pandas.api.types.pandas_dtype(dtype)
+        numpy_dtype = dtype.numpy_dtype if hasattr(dtype, 'numpy_dtype') else dtype
+        values = np.ndarray((rows, ), numpy_dtype, shm.buf, offset)[start:stop]
+        if mask_offset >= 0:
+            mask = np.ndarray((rows, ), np.bool_, shm.buf, mask_offset)[start:stop]
+            values = dtype.construct_array_type()(values, mask, copy=False)
+        data[i] = pandas.Series(values, dtype=dtype, copy=False)
+    df = pandas.DataFrame(data, copy=False)
+    df.columns = [c[0] for c in spec['columns']]
+    return df
+
+
+def encode_shared(task: tuple, path: str, terminate: str = '\n', float_precision: Optional[int] = None) -> int:
+    """Encode a range of rows of a `SharedFrame` into a csv file, in a worker process.
+
+    Args:
+        task (tuple): The range, see `SharedFrame.get_task`.
+        path (str): Path of the csv file, which is appended to.
+        terminate (str): Line terminator.
+        float_precision (int): Number of decimals of floats, see `UpLoadManger.write_to_csv`.
+
+    Returns:
+        int: The number of rows written.
+    """
+
+    spec, start, stop, pickled = task
+    shm = shared_memory.SharedMemory(spec['name'])
+    try:
+        df = _attach(shm, spec, start, stop, pickled)
+        with open(path, 'a', newline='', encoding='utf-8') as f:
+            rows = encode_frame(df, f, terminate, float_precision)
+        del df
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # A view is still referenced, the mapping goes when it is collected.
+    return rows
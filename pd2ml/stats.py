@@ -0,0 +1,255 @@
+# coding=utf-8
+"""stats.py - Statistics of the phases of uploads and downloads, and the hooks that receive them.
+"""
+
+import contextlib
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional, Tuple
+
+__all__ = ['LoadStats', 'LoggingHook', 'MetricsHook', 'add_hook', 'remove_hook', 'track']
+
+logger = logging.getLogger('pd2ml')
+
+_HOOKS = []  # The hooks of all loaders, see `add_hook`
+_RUNNING = contextvars.ContextVar('pd2ml_running', default=None)  # The stats of the running calls, by id of the owner
+
+
+class LoadStats:
+    """The statistics of one call of `UpLoader` or `DownLoader`.
+
+    Phases of uploads are 'encode', 'write' (into the spool or a pipe), 'connect' and 'load',
+    'schema' and 'dedup' with `dedup`, and 'lock' in the 'swap' mode;
+    phases of downloads are 'schema', 'connect', 'export', 'parse' and 'convert'. Phases that run in
+    several threads at once are summed over the threads, so they may add up to more than `elapsed`.
+    Phases that run in worker processes are measured as the time waited for them.
+
+    Attributes:
+        operation (str): e.g. 'load_to' or 'load_from'.
+        table_name (str): Name of table in database.
+        phases (OrderedDict): Seconds spent in each phase, in the order the phases first ran.
+        rows (int): The number of rows transferred.
+        bytes (int): The size of the spooled or exported files.
+        files (int): The number of files loaded or exported.
+        retries (int): The number of retries of loading a file after a transient error.
+        dropped (int): The number of rows dropped before uploading, which a later row would have replaced.
+        elapsed (float): Seconds of the whole call.
+        error (str): The error that ended the call, if any.
+    """
+
+    def __init__(self, operation: str = '', table_name: str = ''):
+        self.operation = operation
+        self.table_name = table_name
+        self.phases = OrderedDict()
+        self.rows = 0
+        self.bytes = 0
+        self.files = 0
+        self.retries = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+        self.error = None
+        self.__started = time.perf_counter()
+        self.__lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the `with` block to the phase."""
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """Add seconds to the phase."""
+
+        with self.__lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add(self, rows: int = 0, nbytes: int = 0, files: int = 0, retries: int = 0, dropped: int = 0) -> None:
+        """Add to the counters."""
+
+        with self.__lock:
+            self.rows += rows
+            self.bytes += nbytes
+            self.files += files
+            self.retries += retries
+            self.dropped += dropped
+
+    def start(self) -> None:
+        """Start the clock of the call."""
+
+        self.__started = time.perf_counter()
+
+    def finish(self) -> None:
+        """Stop the clock of the call."""
+
+        self.elapsed = time.perf_counter() - self.__started
+
+    def to_dict(self) -> dict:
+        """Get the statistics as a plain dict, e.g. for JSON."""
+
+        return {'operation': self.operation, 'table_name': self.table_name, 'phases': dict(self.phases),
+                'rows': self.rows, 'bytes': self.bytes, 'files': self.files, 'retries': self.retries,
+                'dropped': self.dropped, 'elapsed': self.elapsed, 'error': self.error}
+
+    def __repr__(self):
+        phases = ', '.join('{}={:.3f}s'.format(k, v) for k, v in self.phases.items())
+        dropped = ', {} dropped'.format(self.dropped) if self.dropped else ''
+        return '<LoadStats {} {}: {} rows{}, {} bytes, {} files, {} retries in {:.3f}s ({})>'.format(
+            self.operation, self.table_name, self.rows, dropped, self.bytes, self.files, self.retries, self.elapsed,
+            phases)
+
+
+class LoggingHook:
+    """A hook that logs the statistics of every call as one line."""
+
+    def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO):
+        """
+        Args:
+            log (logging.Logger): The logger, the 'pd2ml' logger by default.
+            level (int): The level of the lines.
+        """
+
+        self.log = log or logger
+        self.level = level
+
+    def __call__(self, stats: LoadStats) -> None:
+        self.log.log(self.level, '%r', stats)
+
+
+class MetricsHook:
+    """A hook that accumulates the statistics into Prometheus-style counters, labelled by operation and table.
+
+    Counters are `pd2ml_calls_total`, `pd2ml_errors_total`, `pd2ml_rows_total`, `pd2ml_bytes_total`,
+    `pd2ml_files_total`, `pd2ml_retries_total`, `pd2ml_dropped_total`, `pd2ml_seconds_total` and `pd2ml_phase_seconds_total`,
+    the last of which is labelled by phase as well. `render` gives them in the text exposition format,
+    e.g. to be served on a metrics endpoint or pushed to a gateway.
+    """
+
+    def __init__(self):
+        self.counters = {}  # (name, labels) -> value
+        self.__lock = threading.Lock()
+
+    def __inc(self, name: str, labels: Tuple[Tuple[str, str], ...], value: float) -> None:
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def __call__(self, stats: LoadStats) -> None:
+        labels = (('operation', stats.operation), ('table', stats.table_name))
+        with self.__lock:
+            self.__inc('pd2ml_calls_total', labels, 1)
+            self.__inc('pd2ml_errors_total', labels, 1 if stats.error else 0)
+            self.__inc('pd2ml_rows_total', labels, stats.rows)
+            self.__inc('pd2ml_bytes_total', labels, stats.bytes)
+            self.__inc('pd2ml_files_total', labels, stats.files)
+            self.__inc('pd2ml_retries_total', labels, stats.retries)
+            self.__inc('pd2ml_dropped_total', labels, stats.dropped)
+            self.__inc('pd2ml_seconds_total', labels, stats.elapsed)
+            for phase, seconds in stats.phases.items():
+                self.__inc('pd2ml_phase_seconds_total', labels + (('phase', phase), ), seconds)
+
+    def render(self) -> str:
+        """Render the counters in the Prometheus text exposition format."""
+
+        with self.__lock:
+            items = sorted(self.counters.items())
+        lines, typed = [], set()
+        for (name, labels), value in items:
+            if name not in typed:
+                typed.add(name)
+                lines.append('# TYPE {} counter'.format(name))
+            label_str = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                                 for k, v in labels)
+            lines.append('{}{{{}}} {}'.format(name, label_str, value))
+        return '\n'.join(lines) + '\n'
+
+
+def add_hook(hook: Callable[[LoadStats], None]) -> None:
+    """Register a hook that is called with the statistics at the end of every call of every loader."""
+
+    _HOOKS.append(hook)
+
+
+def remove_hook(hook: Callable[[LoadStats], None]) -> None:
+    """Unregister a hook."""
+
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+def _emit(stats: LoadStats, hooks: Iterable[Callable[[LoadStats], None]]) -> None:
+    """Call the hooks with the statistics. A failing hook is logged and never fails the call."""
+
+    for hook in list(hooks) + list(_HOOKS):
+        try:
+            hook(stats)
+        except Exception:
+            logger.exception('The stats hook %r failed.', hook)
+
+
+def get_running(owner) -> Optional[LoadStats]:
+    """Get the statistics of the call of the owner that runs in the current context, if any."""
+
+    running = _RUNNING.get()
+    return running.get(id(owner)) if running else None
+
+
+@contextlib.contextmanager
+def running_call(owner, stats: LoadStats):
+    """Make the statistics the ones of the running call of the owner in the `with` block, see `get_running`.
+
+    The state is kept in a context variable, so that calls in other threads are not affected. Threads
+    that work for the call get it by running in a copy of the context, see `contextvars.copy_context`.
+    The block must not span a `yield` of a generator, whose caller may resume it in another context.
+    """
+
+    token = _RUNNING.set({**(_RUNNING.get() or {}), id(owner): stats})
+    try:
+        yield stats
+    finally:
+        _RUNNING.reset(token)
+
+
+@contextlib.contextmanager
+def track(owner, operation: str, table_name: str, scoped: bool = True):
+    """Collect the statistics of a call into a new `LoadStats`, and emit them to the hooks at the end,
+    when they also become `owner.stats`.
+
+    A call nested in another call of the same owner in the same context, e.g. a delta upload that
+    uploads the changed rows, adds to the statistics of the outer call. Calls of the same owner in
+    other threads are not nested, each has statistics of its own.
+
+    Args:
+        owner: The loader, which has the attributes `stats` and `hooks`.
+        operation (str): Name of the call.
+        table_name (str): Name of table in database.
+        scoped (bool): Whether the `with` block runs as the running call of the owner, see `running_call`.
+            A generator that yields within the block passes False, and uses `running_call` around the
+            parts between its yields.
+    """
+
+    stats = get_running(owner)
+    if stats is not None:
+        yield stats
+        return
+
+    stats = LoadStats(operation, table_name)
+    stats.start()
+    try:
+        if scoped:
+            with running_call(owner, stats):
+                yield stats
+        else:
+            yield stats
+    except Exception as e:
+        stats.error = repr(e)
+        raise e
+    finally:
+        stats.finish()
+        owner.stats = stats
+        _emit(stats, owner.hooks)
@@ -0,0 +1,248 @@
+# coding=utf-8
+"""testing.py - Vectorized generation of synthetic tables, for load testing at scale.
+"""
+
+import os
+import numpy as np
+import pandas
+from typing import Iterator, List, Optional, Sequence
+from .common import UPLOAD_CHUNK_ROWS, LOAD_FILE_SUFFIX
+from .manager import UpLoadManger
+
+__all__ = ['ColumnSpec', 'STOCK_COLUMNS', 'make_frame', 'iter_frames', 'make_ddl', 'write_spool']
+
+_LETTERS = np.frombuffer(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789', dtype=np.uint8)
+
+_SQL_TYPES = {'int': 'BIGINT', 'float': 'DOUBLE', 'bool': 'TINYINT(1)', 'date': 'DATE', 'datetime': 'DATETIME'}
+
+
+class ColumnSpec:
+    """The specification of a column of random values.
+
+    Values are generated for ranges of rows at a time, so that a table of any size can be
+    generated in chunks. Values depend only on the seed, the column and the range.
+    """
+
+    KINDS = ('int', 'float', 'str', 'bool', 'date', 'datetime')
+
+    def __init__(self, name: str, kind: str, null_ratio: float = 0.0, cardinality: Optional[int] = None,
+                 unique: bool = False, low: float = 0, high: float = 1000000, decimals: Optional[int] = None,
+                 min_length: int = 1, max_length: int = 16, start: str = '2000-01-01', end: str = '2020-12-31'):
+        """
+        Args:
+            name (str): Name of the column.
+            kind (str): One of 'int', 'float', 'str', 'bool', 'date' and 'datetime'.
+            null_ratio (float): The probability of a value being NULL.
+            cardinality (int): If given, values are drawn from this many distinct values.
+            unique (bool): If True, every row has a distinct value, e.g. for a primary key.
+                Integers count up from `low`, strings are zero-padded numbers, and datetimes
+                count up by seconds from `start`.
+            low, high (float): The range of numbers, `[low, high)`.
+            decimals (int): If given, floats are rounded to this many decimals.
+            min_length, max_length (int): The range of lengths of strings, both inclusive.
+            start, end (str): The range of dates and datetimes, `[start, end)`.
+
+        Raises:
+            ValueError: If `kind` is unknown, or `unique` is combined with `null_ratio` or `cardinality`.
+        """
+
+        if kind not in ColumnSpec.KINDS:
+            raise ValueError('`kind` should be one of {}, not {!r}.'.format(ColumnSpec.KINDS, kind))
+        if unique and (null_ratio or cardinality):
+            raise ValueError('A unique column can not have NULL values or a cardinality.')
+        self.name = name
+        self.kind = kind
+        self.null_ratio = null_ratio
+        self.cardinality = cardinality
+        self.unique = unique
+        self.low = low
+        self.high = high
+        self.decimals = decimals
+        self.min_length = min_length
+        self.max_length = max_length
+        self.start = np.datetime64(start, 's')
+        self.end = np.datetime64(end, 's')
+
+    def __draw(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """Draw n random values, with repetition."""
+
+        if self.kind == 'int':
+            return rng.integers(int(self.low), int(self.high), n, dtype=np.int64)
+        if self.kind == 'float':
+            values = self.low + rng.random(n) * (self.high - self.low)
+            return values.round(self.decimals) if self.decimals is not None else values
+        if self.kind == 'bool':
+            return rng.random(n) < 0.5
+        if self.kind == 'str':
+            lengths = rng.integers(self.min_length, self.max_length + 1, n)
+            chars = _LETTERS[rng.integers(0, len(_LETTERS), (n, self.max_length))]
+            chars[np.arange(self.max_length) >= lengths[:, None]] = 0  # Trailing NUL bytes are dropped
+            return chars.view('S{}'.format(self.max_length)).ravel().astype(str).astype(object)
+        span = (self.end - self.start).astype(np.int64)
+        if self.kind == 'date':
+            days = rng.integers(0, max(span // 86400, 1), n).astype('timedelta64[D]')
+            return (self.start.astype('datetime64[D]') + days).astype('datetime64[ns]')
+        return (self.start + rng.integers(0, span, n).astype('timedelta64[s]')).astype('datetime64[ns]')
+
+    def __sequence(self, start: int, stop: int) -> np.ndarray:
+        """The distinct values of the rows in `[start, stop)`."""
+
+        rows = np.arange(start, stop, dtype=np.int64)
+        if self.kind == 'int':
+            return int(self.low) + rows
+        if self.kind == 'float':
+            return self.low + rows.astype(np.float64)
+        if self.kind == 'str':
+            width = max(self.max_length, len(str(stop)))
+            return np.char.zfill(rows.astype(str), width).astype(object)
+        if self.kind == 'date':
+            return (self.start.astype('datetime64[D]') + rows.astype('timedelta64[D]')).astype('datetime64[ns]')
+        if self.kind == 'datetime':
+            return (self.start + rows.astype('timedelta64[s]')).astype('datetime64[ns]')
+        raise ValueError('A {} column can not be unique.'.format(self.kind))
+
+    def generate(self, seed: int, index: int, start: int, stop: int) -> pandas.Series:
+        """Generate the values of the rows in `[start, stop)`.
+
+        Args:
+            seed (int): The seed of the table.
+            index (int): The position of the column in the table, so that columns differ.
+            start, stop (int): The range of rows.
+
+        Returns:
+            pandas.Series: The values, in a nullable dtype if there are NULL values.
+        """
+
+        n = stop - start
+        rng = np.random.default_rng([seed, index, start])
+        if self.unique:
+            values = self.__sequence(start, stop)
+        elif self.cardinality is not None:
+            # The pool of distinct values is the same for every range.
+            pool = self.__draw(np.random.default_rng([seed, index]), self.cardinality)
+            values = pool[rng.integers(0, self.cardinality, n)]
+        else:
+            values = self.__draw(rng, n)
+
+        s = pandas.Series(values, name=self.name)
+        if self.null_ratio:
+            mask = rng.random(n) < self.null_ratio
+            if self.kind == 'int':
+                s = s.astype('Int64')
+            elif self.kind == 'bool':
+                s = s.astype('boolean')
+            s = s.mask(mask)
+        return s
+
+    def get_sql_type(self) -> str:
+        """Get the MySQL type of the column."""
+
+        if self.kind == 'str':
+            return 'CHAR({})'.format(self.max_length) if self.min_length == self.max_length \
+                else 'VARCHAR({})'.format(self.max_length)
+        return _SQL_TYPES[self.kind]
+
+
+# A table like `examples/stock.csv`, of 900 codes and daily prices
+STOCK_COLUMNS = [
+    ColumnSpec('code', 'str', cardinality=900, min_length=6, max_length=6),
+    ColumnSpec('open', 'float', low=5, high=100, decimals=2),
+    ColumnSpec('close', 'float', low=5, high=100, decimals=2),
+    ColumnSpec('high', 'float', low=5, high=105, decimals=2),
+    ColumnSpec('low', 'float', low=4, high=100, decimals=2),
+    ColumnSpec('time', 'date', start='1990-01-01', end='2021-01-01'),
+]
+
+
+def make_frame(columns: Sequence[ColumnSpec], rows: int, seed: int = 0, start: int = 0) -> pandas.DataFrame:
+    """Generate a dataframe.
+
+    Args:
+        columns (Sequence[ColumnSpec]): The columns.
+        rows (int): The number of rows.
+        seed (int): The seed, so that the same arguments give the same dataframe.
+        start (int): The position of the first row in the whole table, see `iter_frames`.
+
+    Returns:
+        pandas.DataFrame: The dataframe.
+
+    Examples:
+        >>> make_frame([ColumnSpec('id', 'int', unique=True), ColumnSpec('v', 'float', null_ratio=0.5)], 3).shape
+        (3, 2)
+    """
+
+    return pandas.DataFrame({c.name: c.generate(seed, i, start, start + rows) for i, c in enumerate(columns)})
+
+
+def iter_frames(columns: Sequence[ColumnSpec], rows: int, chunk_rows: int = UPLOAD_CHUNK_ROWS,
+                seed: int = 0) -> Iterator[pandas.DataFrame]:
+    """Generate a table of any size as dataframes of at most `chunk_rows` rows.
+
+    Unique columns stay unique across the chunks, and the pools of columns with a cardinality
+    are shared by the chunks.
+    """
+
+    for start in range(0, rows, chunk_rows):
+        yield make_frame(columns, min(chunk_rows, rows - start), seed, start)
+
+
+def make_ddl(table_name: str, columns: Sequence[ColumnSpec], primary_key: Optional[Sequence[str]] = None,
+             indexes: Sequence[Sequence[str]] = (), if_not_exists: bool = True) -> str:
+    """Make the `CREATE TABLE` statement of a table of the columns.
+
+    Args:
+        table_name (str): Name of table in database.
+        columns (Sequence[ColumnSpec]): The columns.
+        primary_key (Sequence[str]): The columns of the primary key. If None, the unique columns.
+            Columns are `NOT NULL` unless they have a `null_ratio`, so that they are downloaded
+            into the same dtypes as `make_frame` generates.
+        indexes (Sequence[Sequence[str]]): The columns of each secondary index.
+        if_not_exists (bool): Whether to add `IF NOT EXISTS`.
+
+    Returns:
+        str: The statement.
+
+    Examples:
+        >>> make_ddl('t', [ColumnSpec('id', 'int', unique=True), ColumnSpec('name', 'str', max_length=8)])
+        'CREATE TABLE IF NOT EXISTS t (id BIGINT NOT NULL, name VARCHAR(8) NOT NULL, PRIMARY KEY (id)) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4'
+    """
+
+    if primary_key is None:
+        primary_key = [c.name for c in columns if c.unique]
+    keys = set(primary_key)
+    defs = ['{} {} {}'.format(c.name, c.get_sql_type(), 'NULL' if c.null_ratio and c.name not in keys else 'NOT NULL')
+            for c in columns]
+    if primary_key:
+        defs.append('PRIMARY KEY ({})'.format(', '.join(primary_key)))
+    for i, index in enumerate(indexes):
+        defs.append('KEY idx_{} ({})'.format(i, ', '.join(index)))
+    return 'CREATE TABLE {}{} ({}) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4'.format(
+        'IF NOT EXISTS ' if if_not_exists else '', table_name, ', '.join(defs))
+
+
+def write_spool(table_name: str, columns: Sequence[ColumnSpec], rows: int, directory: str,
+                chunk_rows: int = UPLOAD_CHUNK_ROWS, seed: int = 0) -> List[str]:
+    """Generate a table straight into files in the format of `LOAD DATA`, one per chunk.
+
+    Memory is bounded by one chunk, so tables of any size can be generated.
+
+    Args:
+        table_name (str): Name of table in database, which names the files, e.g. 'stock@3f2a9c1b0d4e.csv'.
+        columns (Sequence[ColumnSpec]): The columns.
+        rows (int): The number of rows.
+        directory (str): The directory of the files, which is created if needed.
+        chunk_rows (int): The number of rows of each file.
+        seed (int): The seed.
+
+    Returns:
+        list: The paths of the files, in the order of the rows.
+    """
+
+    manager = UpLoadManger()
+    manager.mkdirs([directory])
+    paths = []
+    for df in iter_frames(columns, rows, chunk_rows, seed):
+        path = manager.format_path(manager.get_unique_path(os.path.join(directory, table_name + LOAD_FILE_SUFFIX)))
+        manager.write_to_csv(path, df)
+        paths.append(path)
+    return paths
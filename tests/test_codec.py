@@ -0,0 +1,81 @@
+# coding=utf-8
+"""test_codec.py - Round trips of the encoder of uploads and the decoder of downloads.
+"""
+
+import numpy as np
+import pandas
+import pytest
+from pd2ml.codec import encode_frame, decode_csv
+from pd2ml.common import STRING_PREFIX
+
+
+def _round_trip(tmp_path, df: pandas.DataFrame, dtypes: dict, **kwargs) -> pandas.DataFrame:
+    """Encode the dataframe as a file of `LOAD DATA` and decode it as if the server had exported it."""
+
+    exported = df.copy()
+    for name, dtype in dtypes.items():
+        if dtype in ('object', 'category'):
+            exported[name] = STRING_PREFIX + exported[name].astype(object).where(exported[name].notna(), None)
+    path = str(tmp_path / 'stock.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        encode_frame(exported, f, **kwargs)
+    return decode_csv(path, [(name, dtype, name) for name, dtype in dtypes.items()])
+
+
+def test_round_trip_of_typed_columns(tmp_path):
+    df = pandas.DataFrame({
+        'code': ['600000', '', 'N', 'a,b', 'say "hi"', 'back\\slash', 'two\nlines', None],
+        'volume': pandas.array([1, -2, 3, None, 5, 6, 7, 8], dtype='Int64'),
+        'price': [1.5, np.nan, 0.1, 1e-10, -3.25, 2.0, 1 / 3, 7.0],
+        'flag': [True, False, True, False, True, False, True, False],
+        'time': pandas.to_datetime(['2020-07-01 09:30:00', None, '2020-07-01 09:30:00.000001', '2020-07-02',
+                                    '2020-07-03', '2020-07-04', '2020-07-05', '2020-07-06'], format='ISO8601'),
+        'elapsed': pandas.to_timedelta(['01:02:03', '-00:00:01', None, '100:00:00', '0', '0', '0', '00:00:00.5']),
+    })
+    dtypes = {'code': 'object', 'volume': 'Int64', 'price': 'float64', 'flag': 'bool',
+              'time': 'datetime64[ns]', 'elapsed': 'timedelta64[ns]'}
+    result = _round_trip(tmp_path, df, dtypes)
+
+    assert result['code'].tolist()[:-1] == df['code'].tolist()[:-1]
+    assert pandas.isna(result['code'].iloc[-1])
+    pandas.testing.assert_series_equal(result['volume'], df['volume'])
+    pandas.testing.assert_series_equal(result['price'], df['price'])
+    pandas.testing.assert_series_equal(result['flag'], df['flag'])
+    pandas.testing.assert_series_equal(result['time'], df['time'].astype('datetime64[ns]'))
+    pandas.testing.assert_series_equal(result['elapsed'], df['elapsed'].astype('timedelta64[ns]'))
+
+
+def test_float_precision():
+    import io
+
+    f = io.StringIO()
+    encode_frame(pandas.DataFrame({'v': [1.23456, np.nan]}), f, float_precision=2)
+    assert f.getvalue() == '1.23\n\\N\n'
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'empty.csv'
+    path.write_bytes(b'')
+    df = decode_csv(str(path), [('code', 'object', 'code'), ('v', 'float64', 'v')])
+    assert list(df.columns) == ['code', 'v'] and len(df) == 0
+
+
+@pytest.mark.parametrize('chunksize', [None, 2])
+def test_nul_characters(tmp_path, chunksize):
+    path = tmp_path / 'nul.csv'
+    # As the server writes them: NUL as `\0`, and a backslash followed by `0` as `\\0`.
+    path.write_bytes(b'"~a\\0b",1\n"~x\\\\0",\\N\n"~y\\\n\\0",3\n')
+    columns = [('s', 'object', 's'), ('i', 'Int64', 'i')]
+    result = decode_csv(str(path), columns, chunksize)
+    if chunksize is not None:
+        result = pandas.concat(list(result), ignore_index=True)
+    assert result['s'].tolist() == ['a\x00b', 'x\\0', 'y\n\x00']
+    assert result['i'].tolist() == [1, pandas.NA, 3]
+
+
+def test_no_nul_leaves_file(tmp_path):
+    path = tmp_path / 'plain.csv'
+    content = b'"~a\\\\b",1\n'
+    path.write_bytes(content)
+    assert decode_csv(str(path), [('s', 'object', 's'), ('i', 'int64', 'i')])['s'].tolist() == ['a\\b']
+    assert path.read_bytes() == content
@@ -0,0 +1,56 @@
+# coding=utf-8
+"""test_dedup.py - Dropping the rows that a later row of the same upload would replace.
+"""
+
+import numpy as np
+import pandas
+from pd2ml.dedup import drop_duplicate_keys
+
+PRIMARY = {'PRIMARY': ['code', 'time']}
+
+
+def test_keeps_last_row_of_primary_key():
+    df = pandas.DataFrame({'code': ['a', 'b', 'a', 'a'], 'time': [1, 1, 1, 2], 'v': [1, 2, 3, 4]})
+    result, dropped = drop_duplicate_keys(df, PRIMARY)
+    assert dropped == 1 and result['v'].tolist() == [2, 3, 4]
+
+
+def test_same_object_without_duplicates():
+    df = pandas.DataFrame({'code': ['a', 'b'], 'time': [1, 1]})
+    result, dropped = drop_duplicate_keys(df, PRIMARY)
+    assert dropped == 0 and result is df
+
+
+def test_secondary_key_differs():
+    # Row 0 collides with row 2 on the primary key but not on `uk_isin`, and with row 1 on `uk_isin`,
+    # so what REPLACE leaves depends on row 1 being loaded in between: leave it to the server.
+    df = pandas.DataFrame({'code': ['a', 'b', 'a'], 'time': [1, 1, 1], 'isin': ['x', 'x', 'y']})
+    result, dropped = drop_duplicate_keys(df, dict(PRIMARY, uk_isin=['isin']))
+    assert dropped == 0 and result is df
+
+
+def test_all_keys_equal():
+    df = pandas.DataFrame({'code': ['a', 'a', 'b'], 'time': [1, 1, 1], 'isin': ['x', 'x', 'z'], 'v': [1, 2, 3]})
+    result, dropped = drop_duplicate_keys(df, dict(PRIMARY, uk_isin=['isin']))
+    assert dropped == 1 and result['v'].tolist() == [2, 3]
+
+
+def test_null_never_collides():
+    # Without the primary key, rows collide only on `uk_isin`, where NULL is never equal.
+    df = pandas.DataFrame({'isin': [None, None, 'x', 'x'], 'v': [1, 2, 3, 4]})
+    result, dropped = drop_duplicate_keys(df, {'PRIMARY': ['id'], 'uk_isin': ['isin']})
+    assert dropped == 1 and result['v'].tolist() == [1, 2, 4]
+
+
+def test_null_in_secondary_key_with_primary_key():
+    df = pandas.DataFrame({'code': ['a', 'a'], 'time': [1, 1], 'isin': [np.nan, np.nan], 'v': [1, 2]})
+    result, dropped = drop_duplicate_keys(df, dict(PRIMARY, uk_isin=['isin']))
+    assert dropped == 1 and result['v'].tolist() == [2]
+
+
+def test_no_key_in_dataframe():
+    df = pandas.DataFrame({'v': [1, 1]})
+    for keys in ({'PRIMARY': ['id']}, {}):
+        result, dropped = drop_duplicate_keys(df, keys)
+        assert dropped == 0 and result is df
+
@@ -0,0 +1,88 @@
+# coding=utf-8
+"""test_delta.py - The local hash index of delta sync, and its saves interrupted by a crash.
+"""
+
+import os
+import numpy as np
+import pandas
+import pytest
+from pd2ml.delta import DeltaIndex, hash_rows
+
+
+def _save(index: DeltaIndex, df: pandas.DataFrame) -> None:
+    index.save(hash_rows(df[['code']]), hash_rows(df), df[['code']])
+
+
+def test_diff_and_entries(tmp_path):
+    index = DeltaIndex('mysql://db', 'stock', str(tmp_path))
+    assert not index.exists()
+    _save(index, pandas.DataFrame({'code': ['a', 'b', 'c'], 'v': [1, 2, 3]}))
+
+    df = pandas.DataFrame({'code': ['a', 'c', 'd'], 'v': [1, 4, 5]})
+    changed, vanished = index.diff(hash_rows(df[['code']]), hash_rows(df))
+    assert changed.tolist() == [False, True, True]
+    assert index.get_entries(vanished)[2]['code'].tolist() == ['b']
+
+
+def test_crash_before_switch_keeps_old_version(tmp_path, monkeypatch):
+    index = DeltaIndex('mysql://db', 'stock', str(tmp_path))
+    _save(index, pandas.DataFrame({'code': ['a', 'b'], 'v': [1, 2]}))
+
+    replace = os.replace
+
+    def _crash(src, dst):
+        if os.path.basename(dst) == DeltaIndex.CURRENT_FN:
+            raise KeyboardInterrupt('killed')
+        replace(src, dst)
+
+    monkeypatch.setattr(os, 'replace', _crash)
+    with pytest.raises(KeyboardInterrupt):
+        _save(index, pandas.DataFrame({'code': ['x', 'y', 'z'], 'v': [7, 8, 9]}))
+    monkeypatch.undo()
+
+    df = pandas.DataFrame({'code': ['a'], 'v': [1]})
+    changed, vanished = DeltaIndex('mysql://db', 'stock', str(tmp_path)).diff(hash_rows(df[['code']]), hash_rows(df))
+    assert changed.tolist() == [False]
+    assert index.get_entries(vanished)[2]['code'].tolist() == ['b']
+
+    # The next save removes what the crash left behind.
+    _save(index, df)
+    versions = [n for n in os.listdir(index.dir) if n.startswith(DeltaIndex.VERSION_PREFIX)]
+    assert len(versions) == 2 and not [n for n in os.listdir(index.dir) if n.endswith('.tmp')]
+
+
+def test_entries_of_version_compared(tmp_path):
+    index = DeltaIndex('mysql://db', 'stock', str(tmp_path))
+    _save(index, pandas.DataFrame({'code': ['a', 'b'], 'v': [1, 2]}))
+    df = pandas.DataFrame({'code': ['a'], 'v': [1]})
+    _, vanished = index.diff(hash_rows(df[['code']]), hash_rows(df))
+
+    # Another process saves a version between the comparison and the look-up.
+    _save(DeltaIndex('mysql://db', 'stock', str(tmp_path)), pandas.DataFrame({'code': ['c'], 'v': [3]}))
+    assert index.get_entries(vanished)[2]['code'].tolist() == ['b']
+
+
+def test_index_of_older_version(tmp_path):
+    index = DeltaIndex('mysql://db', 'stock', str(tmp_path))
+    os.makedirs(index.dir)
+    df = pandas.DataFrame({'code': ['a', 'b'], 'v': [1, 2]})
+    keys, rows = hash_rows(df[['code']]), hash_rows(df)
+    order = np.argsort(keys, kind='stable')
+    np.save(os.path.join(index.dir, DeltaIndex.KEYS_FN), keys[order])
+    np.save(os.path.join(index.dir, DeltaIndex.ROWS_FN), rows[order])
+    df[['code']].iloc[order].reset_index(drop=True).to_pickle(os.path.join(index.dir, DeltaIndex.VALUES_FN))
+
+    assert index.exists()
+    assert not index.diff(keys, rows)[0].any()
+    _save(index, df)
+    assert not index.diff(keys, rows)[0].any()
+    # Like a replaced version, the files are left for readers still on them until the next save.
+    _save(index, df)
+    assert not os.path.exists(os.path.join(index.dir, DeltaIndex.KEYS_FN))
+
+
+def test_reset(tmp_path):
+    index = DeltaIndex('mysql://db', 'stock', str(tmp_path))
+    _save(index, pandas.DataFrame({'code': ['a'], 'v': [1]}))
+    index.reset()
+    assert not index.exists() and os.listdir(index.dir) == []
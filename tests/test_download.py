@@ -0,0 +1,52 @@
+# coding=utf-8
+"""test_download.py - Downloads that fail before exporting, on an engine that stands in for MySQL.
+"""
+
+import asyncio
+import pytest
+import sqlalchemy
+from pd2ml import AsyncLoader, Loader, ParallelLoader
+from pd2ml.loader import DownLoader
+
+
+@pytest.fixture
+def engine():
+    """A SQLite engine with one table, whose `SHOW COLUMNS` is answered like MySQL's."""
+
+    engine = sqlalchemy.create_engine('sqlite://')
+
+    @sqlalchemy.event.listens_for(engine, 'before_cursor_execute', retval=True)
+    def _rewrite(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SHOW COLUMNS FROM stock'):
+            return "SELECT 'code', 'varchar(8)', 'NO', 'PRI', NULL, ''", parameters
+        return statement, parameters
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize('table_name, columns, error', [
+    ('stock', ['code', 'missing'], ValueError),
+    ('fund', None, sqlalchemy.exc.OperationalError),
+])
+def test_schema_error_keeps_folder(engine, tmp_path, table_name, columns, error):
+    work_dir = tmp_path / 'spool'
+    other = work_dir / '1_2' / 'stock@0.csv'  # The file of another download in the same folder
+    other.parent.mkdir(parents=True)
+    other.write_bytes(b'"~a"\n')
+
+    with pytest.raises(error):
+        DownLoader(engine, work_dir=str(work_dir)).load_from(table_name, columns=columns)
+    assert other.exists()
+
+
+def test_decimal_reaches_downloader(engine):
+    loader = Loader(engine, decimal='str')
+    assert loader._Loader__down_loader.decimal == 'str'
+    with ParallelLoader(engine, workers=1, decimal='scaled') as loader:
+        assert loader._ParallelLoader__down_loader.decimal == 'scaled'
+    loader = AsyncLoader(engine, decimal='str')
+    try:
+        assert loader._AsyncLoader__make_down_loader().decimal == 'str'
+    finally:
+        asyncio.run(loader.close())
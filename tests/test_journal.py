@@ -0,0 +1,101 @@
+# coding=utf-8
+"""test_journal.py - The load journal, the classification of transient errors and their retries.
+"""
+
+import os
+import time
+import pytest
+import sqlalchemy
+from pd2ml import journal
+from pd2ml.journal import LoadJournal, is_transient, retry_transient
+from pd2ml.manager import SpoolManager
+from pd2ml.common import UPLOAD_DIR_PREFIX, JOURNAL_FILENAME, SPOOL_STALE_SECONDS, SPOOL_JOURNAL_STALE_SECONDS
+
+
+def _operational_error(code: int) -> sqlalchemy.exc.OperationalError:
+    return sqlalchemy.exc.OperationalError('LOAD DATA ...', {}, Exception(code, 'message'))
+
+
+def test_last_entry_wins(tmp_path):
+    j = LoadJournal(str(tmp_path / JOURNAL_FILENAME))
+    a, b = str(tmp_path / '1_2' / 'stock@0.csv'), str(tmp_path / '1_2' / 'fund@0.csv')
+    for path in (a, b):
+        j.record(path, LoadJournal.PENDING)
+    j.record(a, LoadJournal.DONE)
+    j.record(b, LoadJournal.FAILED, RuntimeError('boom'))
+
+    assert j.is_done(a) and not j.is_done(b)
+    assert j.get_done() == {a.replace('\\', '/')}
+    assert j.summary() == {'done': 1, 'failed': 1}
+    assert list(j.read()) == ['1_2/stock@0.csv', '1_2/fund@0.csv']
+
+
+def test_truncated_line_is_ignored(tmp_path):
+    j = LoadJournal(str(tmp_path / JOURNAL_FILENAME))
+    a, b = str(tmp_path / 'stock@0.csv'), str(tmp_path / 'stock@1.csv')
+    j.record(a, LoadJournal.DONE)
+    j.record(b, LoadJournal.DONE)
+    # A crash while the last entry was written leaves half a line.
+    with open(j.path, 'rb+') as f:
+        f.truncate(os.path.getsize(j.path) - 10)
+
+    assert j.get_done() == {a.replace('\\', '/')}
+    j.record(b, LoadJournal.DONE)
+    assert j.is_done(b)
+
+
+def test_missing_journal(tmp_path):
+    j = LoadJournal(str(tmp_path / JOURNAL_FILENAME))
+    assert not j.exists() and j.get_done() == set() and j.summary() == {}
+
+
+@pytest.mark.parametrize('error, expected', [
+    (_operational_error(2013), True),  # Lost connection during query
+    (_operational_error(1213), True),  # Deadlock
+    (_operational_error(1205), True),  # Lock wait timeout
+    (_operational_error(1146), False),  # Table doesn't exist
+    (_operational_error(1064), False),  # Syntax error
+    (ConnectionResetError(), True),
+    (sqlalchemy.exc.TimeoutError(), True),
+    (ValueError('bad value'), False),
+    (sqlalchemy.exc.InvalidRequestError('already begun'), False),
+])
+def test_is_transient(error, expected):
+    assert is_transient(error) is expected
+
+
+def test_retry_transient(monkeypatch):
+    monkeypatch.setattr(journal, 'get_backoff', lambda *args: 0)
+    calls, retries = [], []
+
+    @retry_transient(tries=3, on_retry=lambda e, *args: retries.append(args))
+    def load(code):
+        calls.append(code)
+        raise _operational_error(code)
+
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        load(2013)
+    assert len(calls) == 3 and retries == [(2013, ), (2013, )]
+
+    calls.clear(), retries.clear()
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        load(1064)
+    assert len(calls) == 1 and retries == []
+
+
+def test_sweep_keeps_journaled_folders_longer(tmp_path):
+    def _make(name, age, with_journal):
+        path = tmp_path / (UPLOAD_DIR_PREFIX + name)
+        (path / '999999999_1').mkdir(parents=True)  # The folder of a dead process
+        if with_journal:
+            (path / JOURNAL_FILENAME).write_text('')
+        then = time.time() - age
+        os.utime(str(path), (then, then))
+        return path
+
+    old = _make('old', SPOOL_STALE_SECONDS + 60, False)
+    resumable = _make('resumable', SPOOL_STALE_SECONDS + 60, True)
+    abandoned = _make('abandoned', SPOOL_JOURNAL_STALE_SECONDS + 60, True)
+    SpoolManager().sweep(str(tmp_path))
+
+    assert not old.exists() and resumable.exists() and not abandoned.exists()
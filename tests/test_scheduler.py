@@ -0,0 +1,45 @@
+# coding=utf-8
+"""test_scheduler.py - The lanes of the spooled files of a batch upload.
+"""
+
+import pytest
+from pd2ml.scheduler import balance, plan_lanes
+
+
+def test_one_lane_keeps_order():
+    files = [('stock@0', 1), ('stock@1', 9), ('stock@2', 5), ('stock@10', 7)]
+    assert balance(files, 1) == [['stock@0', 'stock@1', 'stock@2', 'stock@10']]
+
+
+@pytest.mark.parametrize('lanes', [2, 3, 8])
+def test_lanes_keep_order(lanes):
+    files = [('f{}'.format(i), size) for i, size in enumerate([3, 9, 1, 4, 4, 7, 2, 8])]
+    result = balance(files, lanes)
+
+    assert len(result) == min(lanes, len(files))
+    assert sorted(p for lane in result for p in lane) == sorted(p for p, _ in files)
+    for lane in result:
+        assert lane == sorted(lane, key=lambda p: int(p[1:]))
+
+
+def test_lanes_are_balanced():
+    sizes = dict(a=5, b=4, c=3, d=3, e=1)
+    totals = [sum(sizes[p] for p in lane) for lane in balance(list(sizes.items()), 2)]
+    assert sorted(totals) == [8, 8]
+
+
+def test_plan_lanes_at_one_table_worker():
+    files = {'stock': [('s0', 1), ('s1', 9), ('s2', 5)], 'fund': [('f0', 2), ('f1', 20)]}
+    lanes = plan_lanes(files, 1)
+    assert lanes == [['f0', 'f1'], ['s0', 's1', 's2']]
+
+
+def test_plan_lanes_limits_table_workers():
+    files = {'stock': [('s{}'.format(i), 1) for i in range(6)], 'fund': [('f0', 10)]}
+    lanes = plan_lanes(files, 2)
+    assert lanes[0] == ['f0'] and len(lanes) == 3
+    assert all(lane == sorted(lane) for lane in lanes)
+
+
+def test_empty():
+    assert balance([], 4) == [] and plan_lanes({}, 2) == []
@@ -0,0 +1,154 @@
+# coding=utf-8
+"""test_session.py - Sessions reused by the files of an upload, on an engine that stands in for MySQL.
+"""
+
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas
+import pytest
+import sqlalchemy
+from pd2ml import loader as loader_module
+from pd2ml.common import TRASH_SUFFIX
+from pd2ml.loader import UpLoader
+
+
+@pytest.fixture
+def engine():
+    """A SQLite engine whose statements are recorded, and the MySQL ones replaced by no-ops,
+    so that the transactions are handled by SQLAlchemy as they would be for MySQL."""
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    engine.statements = []
+    engine.loaded = []  # The table and the size of the file of every `LOAD DATA`, which fails if it is gone
+    engine.load_seconds = 0
+
+    @sqlalchemy.event.listens_for(engine, 'before_cursor_execute', retval=True)
+    def _rewrite(conn, cursor, statement, parameters, context, executemany):
+        engine.statements.append(' '.join(statement.split()))
+        if statement.startswith('SELECT @@'):
+            return 'SELECT ' + ', '.join(['1'] * statement.count('@@')), parameters
+        if statement.startswith('LOAD DATA'):
+            path = re.sub(r'\\(.)', r'\1', re.search(r"INFILE '((?:[^'\\]|\\.)*)'", statement).group(1))
+            engine.loaded.append((re.search(r'INTO TABLE (\S+)', statement).group(1), os.path.getsize(path)))
+            time.sleep(engine.load_seconds)
+            return 'SELECT 1', parameters
+        if re.match(r'\s*(SET SESSION|SELECT (GET|RELEASE)_LOCK|CREATE TABLE|DROP TABLE|RENAME TABLE)', statement):
+            return 'SELECT 1', ()
+        return statement, parameters
+
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize('fast_load', [False, True])
+def test_files_on_one_session(engine, tmp_path, fast_load):
+    loader = UpLoader(engine, fast_load=fast_load, work_dir=str(tmp_path / 'spool'))
+    chunks = [pandas.DataFrame({'code': ['a', 'b'], 'v': [1, 2]}), pandas.DataFrame({'code': ['c'], 'v': [3]})]
+    loader.load_iter(chunks, 'stock', stream=False)
+
+    loads = [s for s in engine.statements if s.startswith('LOAD DATA')]
+    assert len(loads) == 2 and loader.stats.files == 2 and loader.stats.rows == 3
+    if fast_load:
+        restored = [s for s in engine.statements if s.startswith('SET SESSION') and s.endswith('= 1')]
+        assert len(restored) == 2 * 3
+
+
+def test_parallel_chunks_on_one_session(engine, tmp_path):
+    with ThreadPoolExecutor(2) as encoders:
+        loader = UpLoader(engine, fast_load=True, work_dir=str(tmp_path / 'spool'), executor=encoders)
+        loader.load_to(pandas.DataFrame({'v': range(10)}), 'stock', workers=2, chunk_rows=2)
+
+    assert len([s for s in engine.statements if s.startswith('LOAD DATA')]) == 5
+    assert loader.stats.files == 5 and loader.stats.retries == 0
+
+
+def _loaded_parts(engine, table_name=''):
+    return [int(re.search(r'@(\d+)\.csv', s).group(1)) for s in engine.statements
+            if s.startswith('LOAD DATA') and 'INTO TABLE ' + table_name in s]
+
+
+def test_batch_files_load_in_order_written(engine, tmp_path, monkeypatch):
+    monkeypatch.setattr(loader_module, 'BATCH_FILE_BYTES', 1)  # A file per dataframe
+    with UpLoader(engine, work_dir=str(tmp_path / 'spool')) as loader:
+        for i in range(12):
+            loader.batch_load_to(pandas.DataFrame({'code': ['a'], 'v': [i]}), 'stock')
+    assert _loaded_parts(engine) == list(range(12))
+
+
+def test_switching_columns_starts_a_file(engine, tmp_path):
+    with UpLoader(engine, work_dir=str(tmp_path / 'spool')) as loader:
+        loader.batch_load_to(pandas.DataFrame({'code': ['a'], 'v': [1]}), 'stock')
+        loader.batch_load_to(pandas.DataFrame({'code': ['b'], 'v': [2]}), 'stock')
+        loader.batch_load_to(pandas.DataFrame({'code': ['a']}), 'stock')
+        loader.batch_load_to(pandas.DataFrame({'code': ['a'], 'v': [3]}), 'stock')
+        loader.batch_load_to(pandas.DataFrame({'v': [4]}), 'fund')
+    assert sorted(_loaded_parts(engine)) == [0, 1, 2, 3]
+    assert _loaded_parts(engine, 'stock') == [0, 1, 2]
+
+
+@pytest.mark.parametrize('same_instance', [False, True])
+def test_concurrent_swaps(engine, tmp_path, same_instance):
+    engine.load_seconds = 0.2
+    work_dir = str(tmp_path / 'spool')  # Shared, like the default folder of a script
+    loaders = [UpLoader(engine, work_dir=work_dir)] * 2 if same_instance else \
+        [UpLoader(engine, work_dir=work_dir) for _ in range(2)]
+    frames = {'stock': pandas.DataFrame({'v': range(3)}), 'fund': pandas.DataFrame({'v': range(5)})}
+    with ThreadPoolExecutor(2) as swaps:
+        futures = [swaps.submit(loader.load_to, frames[t], t, mode='swap') for loader, t in zip(loaders, frames)]
+        for future in futures:
+            future.result()
+
+    assert sorted(t for t, _ in engine.loaded) == ['fund__pd2ml_new', 'stock__pd2ml_new']
+    assert all(size > 0 for _, size in engine.loaded)
+    assert len([s for s in engine.statements if s.startswith('RENAME TABLE')]) == 2
+    # Renamed folders are removed in the background, see `FileManager.clear`
+    assert not [n for n in os.listdir(str(tmp_path)) if n.startswith('spool@') and TRASH_SUFFIX not in n]
+
+
+def test_swap_aborts_on_missing_rows(engine, tmp_path, monkeypatch):
+    loader = UpLoader(engine, work_dir=str(tmp_path / 'spool'))
+    monkeypatch.setattr(loader, '_UpLoader__load_full', lambda df, table_name, **kwargs: 0)
+    with pytest.raises(RuntimeError):
+        loader.load_to(pandas.DataFrame({'v': range(3)}), 'stock', mode='swap')
+    assert not [s for s in engine.statements if s.startswith('RENAME TABLE')]
+    assert engine.statements[-2] == 'DROP TABLE IF EXISTS stock__pd2ml_new'
+
+
+def test_concurrent_calls_on_one_loader(engine, tmp_path):
+    engine.load_seconds = 0.2
+    emitted = []
+    loader = UpLoader(engine, work_dir=str(tmp_path / 'spool'), hooks=[emitted.append])
+    with ThreadPoolExecutor(2) as calls:
+        for future in [calls.submit(loader.load_to, pandas.DataFrame({'v': range(n)}), 'stock') for n in (3, 5)]:
+            future.result()
+
+    assert sorted((s.rows, s.files) for s in emitted) == [(3, 1), (5, 1)]
+    assert loader.stats in emitted
+
+
+def test_concurrent_calls_keep_their_sessions(engine, tmp_path):
+    engine.load_seconds = 0.1
+    checkouts, checkins = [], []
+    sqlalchemy.event.listen(engine, 'checkout', lambda *args: checkouts.append(1))
+    sqlalchemy.event.listen(engine, 'checkin', lambda *args: checkins.append(1))
+    loader = UpLoader(engine, work_dir=str(tmp_path / 'spool'))
+    chunks = {'stock': [pandas.DataFrame({'v': [1]})], 'fund': [pandas.DataFrame({'v': [i]}) for i in range(4)]}
+    with ThreadPoolExecutor(2) as calls:
+        futures = [calls.submit(loader.load_iter, c, t, stream=False) for t, c in chunks.items()]
+        for future in futures:
+            future.result()
+
+    assert sorted(t for t, _ in engine.loaded) == ['fund'] * 4 + ['stock']
+    assert len(checkouts) == 2  # One session per call, which the other call did not close
+    assert len(checkins) == 2
+
+
+def test_load_file_with_quotes_in_path(engine, tmp_path):
+    folder = tmp_path / "it's :x"
+    folder.mkdir()
+    path = folder / 'back\\slash.csv'
+    path.write_text('a,1\n')
+    UpLoader(engine, work_dir=str(tmp_path / 'spool')).load_file(str(path), 'stock', columns=['code', 'v'])
+    assert engine.loaded == [('stock', 4)]
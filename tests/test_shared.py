@@ -0,0 +1,73 @@
+# coding=utf-8
+"""test_shared.py - Chunks encoded from shared memory are the same as the file of `write_to_csv`.
+"""
+
+import numpy as np
+import pandas
+import pytest
+from pd2ml.manager import UpLoadManger
+from pd2ml.shared import SharedFrame, encode_shared
+
+
+def _make_frame(rows: int) -> pandas.DataFrame:
+    df = pandas.DataFrame({
+        'i': np.arange(rows),
+        'u8': np.arange(rows, dtype='uint8'),
+        'f': np.linspace(0, 1, rows),
+        'flag': np.arange(rows) % 3 == 0,
+        'I': pandas.array([1, None] * (rows // 2), dtype='Int64'),
+        'F': pandas.array([1.5, None] * (rows // 2), dtype='Float64'),
+        'b': pandas.array([True, None] * (rows // 2), dtype='boolean'),
+        's': ['a"b', None] * (rows // 2),
+        'c': pandas.Categorical(['x', 'y'] * (rows // 2)),
+        't': pandas.date_range('2020-07-01 09:30', periods=rows, freq='37min'),
+        'tz': pandas.date_range('2020-07-01 09:30', periods=rows, freq='h', tz='Asia/Shanghai'),
+        'td': pandas.to_timedelta(np.arange(rows), 's'),
+    }, index=np.arange(rows) * 2)
+    df.loc[df.index[1], 'f'] = np.nan
+    df.loc[df.index[2], 't'] = pandas.NaT
+    return df
+
+
+@pytest.mark.parametrize('float_precision', [None, 6])
+@pytest.mark.parametrize('bounds', [[0, 10], [0, 3, 7, 10], [0, 1, 2, 10]])
+def test_same_as_write_to_csv(tmp_path, float_precision, bounds):
+    df = _make_frame(10)
+    manager = UpLoadManger()
+    expected, path = str(tmp_path / 'expected.csv'), str(tmp_path / 'stock@0.csv')
+    manager.write_to_csv(expected, df, float_precision)
+
+    with SharedFrame(df) as frame:
+        rows = [encode_shared(frame.get_task(start, stop), path, manager.get_terminate(), float_precision)
+                for start, stop in zip(bounds, bounds[1:])]
+
+    assert rows == [stop - start for start, stop in zip(bounds, bounds[1:])]
+    with open(expected, 'rb') as f, open(path, 'rb') as g:
+        assert g.read() == f.read()
+
+
+def test_only_pickled_columns(tmp_path):
+    df = pandas.DataFrame({'s': ['a', 'b', None]})
+    path = str(tmp_path / 'stock@0.csv')
+    with SharedFrame(df) as frame:
+        assert encode_shared(frame.get_task(1, 3), path) == 2
+    with open(path, 'rb') as f:
+        assert f.read() == b'"b"\n\\N\n'
+
+
+def test_midnight_chunk(tmp_path):
+    # Every chunk uses the coarsest unit that loses nothing, so a chunk of midnights is written as dates,
+    # which `LOAD DATA` reads into a `DATETIME` as the same value.
+    df = pandas.DataFrame({'t': pandas.to_datetime(['2020-07-01', '2020-07-01 09:30'], format='ISO8601')})
+    path = str(tmp_path / 'stock@0.csv')
+    with SharedFrame(df) as frame:
+        for start in range(2):
+            encode_shared(frame.get_task(start, start + 1), path)
+    with open(path, 'rb') as f:
+        assert f.read() == b'2020-07-01\n2020-07-01 09:30:00\n'
+
+
+def test_close_twice():
+    frame = SharedFrame(_make_frame(4))
+    frame.close()
+    frame.close()
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""test_stats.py - The statistics of calls, nested, concurrent and in the threads that work for them.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pd2ml.stats import LoadStats, get_running, track
+
+
+class _Owner:
+    """A loader as far as `track` is concerned, which keeps the stats it emits."""
+
+    def __init__(self):
+        self.stats = LoadStats()
+        self.emitted = []
+        self.hooks = [self.emitted.append]
+
+
+def test_nested_call_adds_to_outer():
+    owner = _Owner()
+    with track(owner, 'load_to', 'stock') as outer:
+        outer.add(rows=1)
+        with track(owner, 'execute', 'stock') as inner:
+            inner.add(rows=2)
+        assert inner is outer
+    assert owner.stats is outer and outer.rows == 3
+    assert owner.emitted == [outer] and get_running(owner) is None
+
+
+def test_concurrent_calls_are_separate():
+    owner = _Owner()
+    barrier = threading.Barrier(2)
+
+    def _call(rows):
+        with track(owner, 'load_to', 'stock') as stats:
+            barrier.wait()
+            stats.add(rows=rows)
+            barrier.wait()
+        return stats
+
+    with ThreadPoolExecutor(2) as calls:
+        results = list(calls.map(_call, [3, 5]))
+
+    assert results[0] is not results[1]
+    assert sorted(s.rows for s in results) == [3, 5] and sorted(s.rows for s in owner.emitted) == [3, 5]
+    assert owner.stats in results
+
+
+def test_worker_threads_in_copied_context():
+    owner = _Owner()
+    with track(owner, 'load_to', 'stock') as stats, ThreadPoolExecutor(2) as workers:
+        for future in [workers.submit(contextvars.copy_context().run, lambda: get_running(owner).add(files=1))
+                       for _ in range(4)]:
+            future.result()
+        assert workers.submit(get_running, owner).result() is None
+    assert stats.files == 4